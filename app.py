@@ -1,24 +1,59 @@
 # app.py
-from flask import Flask, render_template, request
+from flask import Flask, render_template, request, jsonify
 import os
-import mysql.connector
-
-# If you are using Qiskit
-from qiskit_aer import AerSimulator
 
 # ---- Import your local modules ----
 # These filenames should match your actual files.
-from quantum_random import quantum_random_bitstring
-from qnn_model import build_qnn_circuit
-from password_generation import bits_to_password, sha3_hash_password
+from entropy_pool import quantum_random_bitstring, get_default_pool, pool_stats
+from fused_pipeline import run_fused_qnn, SEED_BITS
+from qnn_backends import DEFAULT_BACKEND, set_default_backend
+from simulation_planner import plan_qnn_simulation, SimulationBudgetError
+from password_generation import bits_to_password, sha3_hash_password, batch_bit_budget
 from validation import validate_password_against_common_patterns
+from pattern_matcher import find_embedded_patterns
+from breach_filter import BREACH_FILTER_FILE
+from breach_store import breach_status, BREACH_STORE_FILE
 from qkd_simulation import simulate_qkd
 
 # (NEW) Import simplified entropy functions
 from entropy_utils import calculate_classical_entropy, calculate_quantum_entropy
+from persistence import ConnectionPool, PersistenceError, create_backend, create_writer
 
 app = Flask(__name__)
 
+# Simulator backend for the QRNG + QNN circuits:
+# 'numpy' (lightweight, never imports qiskit) or 'aer' (Qiskit Aer)
+app.config['QNN_BACKEND'] = DEFAULT_BACKEND  # QNN_BACKEND env var, see qnn_backends.py
+set_default_backend(app.config['QNN_BACKEND'])
+
+# Simulation budget per request; oversized num_qubits are 'downgrade'd
+# (fewer qubits, more shots) or 'reject'ed
+app.config['QNN_MEMORY_BUDGET_MB'] = int(os.environ.get('QNN_MEMORY_BUDGET_MB', 256))
+app.config['QNN_TIME_BUDGET_S'] = float(os.environ.get('QNN_TIME_BUDGET_S', 2.0))
+app.config['QNN_OVER_BUDGET'] = os.environ.get('QNN_OVER_BUDGET', 'downgrade')
+# Widest circuit ever planned; larger num_qubits are handled as over budget.
+# Unset: the bits one password needs (at least simulation_planner.MAX_QUBITS),
+# so e.g. one 84-qubit shot for 12 characters is planned as requested
+app.config['QNN_MAX_QUBITS'] = int(os.environ['QNN_MAX_QUBITS']) if os.environ.get('QNN_MAX_QUBITS') else None
+app.config['MAX_PASSWORD_LENGTH'] = int(os.environ.get('MAX_PASSWORD_LENGTH', 256))
+
+# Breach corpora indexes: Bloom filter (python breach_filter.py) and exact
+# sorted digest store (python breach_store.py); missing files are skipped
+app.config['BREACH_FILTER_FILE'] = os.environ.get('BREACH_FILTER_FILE', BREACH_FILTER_FILE)
+app.config['BREACH_STORE_FILE'] = os.environ.get('BREACH_STORE_FILE', BREACH_STORE_FILE)
+
+# Database: 'mysql' (db_config below) or 'sqlite' (stand-in file for local
+# runs/tests). Rows are written behind the request, in batches, through a
+# bounded connection pool (persistence.py)
+app.config['DB_BACKEND'] = os.environ.get('DB_BACKEND', 'mysql')
+app.config['DB_SQLITE_FILE'] = os.environ.get('DB_SQLITE_FILE', 'quantum_passwords.sqlite3')
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 4))
+app.config['DB_BATCH_SIZE'] = int(os.environ.get('DB_BATCH_SIZE', 100))
+app.config['DB_FLUSH_SECONDS'] = float(os.environ.get('DB_FLUSH_SECONDS', 0.5))
+
+# Start filling the QRNG pool now so the first requests don't wait on Aer
+get_default_pool()
+
 # Database configuration
 db_config = {
     'host': 'localhost',
@@ -27,16 +62,17 @@ db_config = {
     'database': 'quantum_passwords'
 }
 
+db_pool = ConnectionPool(create_backend(app.config['DB_BACKEND'], db_config, app.config['DB_SQLITE_FILE']),
+                         size=app.config['DB_POOL_SIZE'])
+password_writer = create_writer(db_pool, 'passwords2', ('hashed_password',),
+                                batch_size=app.config['DB_BATCH_SIZE'],
+                                flush_seconds=app.config['DB_FLUSH_SECONDS'])
+
 def insert_password(hashed_password):
+    # Queued; the write-behind thread inserts it with the next batch
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-        query = "INSERT INTO passwords2 (hashed_password) VALUES (%s)"
-        cursor.execute(query, (hashed_password,))
-        conn.commit()
-        cursor.close()
-        conn.close()
-    except mysql.connector.Error as err:
+        password_writer.submit((hashed_password,))
+    except PersistenceError as err:
         print(f"Error: {err}")
 
 @app.route('/')
@@ -62,9 +98,15 @@ def generate_password():
     # -------------------------------
     # 1) Gather parameters from form
     # -------------------------------
-    num_qubits = int(request.form.get('num_qubits', 8))
-    shots = int(request.form.get('shots', 1))
-    password_length = int(request.form.get('password_length', 12))
+    try:
+        num_qubits = int(request.form.get('num_qubits', 8))
+        password_length = int(request.form.get('password_length', 12))
+    except ValueError:
+        return "Invalid input: qubits and password length must be integers.", 400
+    if num_qubits < 1 or password_length < 1:
+        return "Invalid input: qubits and password length must be at least 1.", 400
+    if password_length > app.config['MAX_PASSWORD_LENGTH']:
+        return f"Invalid input: password length must be at most {app.config['MAX_PASSWORD_LENGTH']}.", 400
 
     # Checkboxes for character sets
     include_lowercase = (request.form.get('include_lowercase') == 'yes')
@@ -81,7 +123,6 @@ def generate_password():
     process_log = "=== Quantum Password Generation ===\n\n"
     process_log += f"User Inputs:\n"
     process_log += f" - Qubits: {num_qubits}\n"
-    process_log += f" - Shots: {shots}\n"
     process_log += f" - Password Length: {password_length}\n"
     process_log += f" - Include Lowercase: {include_lowercase}\n"
     process_log += f" - Include Uppercase: {include_uppercase}\n"
@@ -91,35 +132,8 @@ def generate_password():
     process_log += f" - Validate Common Patterns?: {validate_common}\n"
     process_log += f" - QKD Simulation?: {qkd_sim}\n\n"
 
-    # ------------------------------------------------
-    # 2) Build QNN circuit & measure to get random bits
-    # ------------------------------------------------
-    process_log += "[Step] Generating quantum-random seed...\n"
-    seed_bits = quantum_random_bitstring(num_bits=16)  # Or whatever size you want
-    process_log += f"Quantum Random Seed (16 bits): {seed_bits}\n"
-
-    # Build your QNN circuit
-    process_log += "[Step] Building QNN circuit...\n"
-    qnn_circuit = build_qnn_circuit(num_qubits=num_qubits, random_seed=seed_bits)
-
-    # Add measurement to each qubit
-    measure_circuit = qnn_circuit.copy()
-    for i in range(num_qubits):
-        measure_circuit.measure(i, i)
-
-    # Run the circuit
-    process_log += "[Step] Simulating circuit...\n"
-    simulator = AerSimulator()
-    job = simulator.run(measure_circuit, shots=shots)
-    result = job.result()
-    counts = result.get_counts(measure_circuit)
-
-    # If multiple shots, pick the outcome with highest frequency
-    best_outcome = max(counts, key=counts.get)
-    process_log += f"Measured State with Highest Frequency: {best_outcome}\n\n"
-
     # -----------------------------------------------------
-    # 3) Construct symbol set from user character choices
+    # 2) Construct symbol set from user character choices
     # -----------------------------------------------------
     chosen_symbols = ""
     if include_lowercase:
@@ -136,11 +150,59 @@ def generate_password():
         chosen_symbols = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
         process_log += "[WARN] No character sets chosen! Fallback to alphanumeric.\n"
 
+    # ------------------------------------------------
+    # 3) Build QNN circuit & measure to get random bits
+    # ------------------------------------------------
+    # Seed generation and the QNN run as ONE simulator invocation
+    # (fused_pipeline.run_fused_qnn): every shot draws its own 16-bit seed
+    # and feeds it into the QNN. On exact backends the seeds come from the
+    # entropy pool and outcomes from each seed's cached distribution instead.
+    # The fused circuit is planned first (statevector / MPS / stabilizer within budget).
+    process_log += "[Step] Generating quantum-random seeds + simulating QNN circuit (fused)...\n"
+    # Rejection sampling drops out-of-range values, so harvest the bits the
+    # API budgets for one password; bits_to_password tops up from the pool
+    harvest_bits = batch_bit_budget(1, password_length, chosen_symbols)
+    needed_shots = -(-harvest_bits // num_qubits)
+    try:
+        plan = plan_qnn_simulation(
+            num_qubits, None, needed_shots,
+            max_memory_bytes=app.config['QNN_MEMORY_BUDGET_MB'] * 1024 * 1024,
+            max_seconds=app.config['QNN_TIME_BUDGET_S'],
+            on_over_budget=app.config['QNN_OVER_BUDGET'],
+            fused=True, seed_bits=SEED_BITS,
+            max_qubits=app.config['QNN_MAX_QUBITS'], total_bits=harvest_bits,
+        )
+    except SimulationBudgetError as err:
+        return f"Request rejected: {err}", 400
+    process_log += (f"[Plan] {plan['method']} on '{plan['backend']}' backend "
+                    f"(~{plan['est_memory_bytes'] / 2**20:.1f} MB, ~{plan['est_seconds'] * 1000:.1f} ms)\n")
+    if plan['downgraded']:
+        reason = (f"the {plan['max_qubits']}-qubit limit (QNN_MAX_QUBITS)" if plan['limited_by'] == 'max_qubits'
+                  else "the simulation budget")
+        process_log += (f"[WARN] {num_qubits} qubits exceed {reason}; "
+                        f"using {plan['num_qubits']} qubits x {plan['shots']} shots.\n")
+    fused = run_fused_qnn(plan['num_qubits'], plan['shots'], backend=plan['backend'],
+                          seed_source=quantum_random_bitstring)
+    process_log += f"[Fused] {fused['method']}, {fused['simulator_jobs']} simulator job(s)\n"
+    process_log += f"Quantum Random Seeds ({SEED_BITS} bits per shot): {' '.join(map(str, fused['seeds']))}\n"
+    shot_bits = fused['outcomes']
+    measured_bits = fused['bits']
+    process_log += f"Harvested {len(shot_bits)} shot(s): {measured_bits}\n\n"
+
     # ----------------------------------------------------------------
     # 4) Convert bits -> password (7 bits per character recommended)
     # ----------------------------------------------------------------
     process_log += "[Step] Generating final password...\n"
-    password = bits_to_password(best_outcome, password_length, chosen_symbols)
+    topped_up = []
+
+    def pool_top_up(num_bits):
+        topped_up.append(num_bits)
+        return quantum_random_bitstring(num_bits)
+
+    password = bits_to_password(measured_bits, password_length, chosen_symbols, more_bits=pool_top_up)
+    if topped_up:
+        process_log += (f"[Pool] Rejection sampling used up the {len(measured_bits)} harvested bits; "
+                        f"topped up {sum(topped_up)} bits from the entropy pool.\n")
     process_log += f"Initial Password: {password}\n"
 
     # --------------------------------
@@ -159,9 +221,16 @@ def generate_password():
     validation_message = ""
     if validate_common:
         is_common = validate_password_against_common_patterns(password)
+        breached = breach_status(password, app.config['BREACH_FILTER_FILE'], app.config['BREACH_STORE_FILE'])
+        embedded = find_embedded_patterns(password)  # substrings, case/leetspeak-insensitive
         validation_message = (
             "WARNING: Password is in the known common patterns!"
             if is_common else
+            f"WARNING: Password appears in the breach corpora ({breached})!"
+            if breached else
+            "WARNING: Password contains common pattern(s): "
+            + ", ".join(f"'{m['matched']}' ~ {m['pattern']} at {m['start']}" for m in embedded)
+            if embedded else
             "OK: Password is not found in common patterns."
         )
         process_log += f"Validation: {validation_message}\n"
@@ -204,6 +273,13 @@ def generate_password():
         quantum_entropy=quantum_entropy
     )
 
+@app.route('/entropy_pool')
+def entropy_pool_stats():
+    """
+    Reports fill level, refill rate and miss counters of the QRNG pool.
+    """
+    return jsonify(pool_stats())
+
 if __name__ == '__main__':
     # Run the Flask app in debug mode (or production if you prefer).
     app.run(debug=True)
\ No newline at end of file
@@ -1,17 +1,76 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, abort, stream_template
+import math
+import csv
+import io
+import json
 import os
-import mysql.connector
-from qiskit_aer import AerSimulator
-from quantum_random import quantum_random_bitstring
-from qnn_model import build_qnn_circuit
-from password_generation import bits_to_password, sha3_hash_password
+from entropy_pool import quantum_random_bitstring, get_default_pool, pool_stats
+from fused_pipeline import run_fused_qnn, SEED_BITS
+from qnn_backends import DEFAULT_BACKEND, set_default_backend
+from simulation_planner import plan_qnn_simulation, SimulationBudgetError, MAX_QUBITS
+from password_generation import bits_to_password, sha3_hash_password, iter_password_batches, batch_bit_budget
 from validation import validate_password_against_common_patterns
+from pattern_matcher import find_embedded_patterns
+from breach_filter import BREACH_FILTER_FILE
+from breach_store import breach_status, BREACH_STORE_FILE
 from qkd_simulation import simulate_qkd
 from entropy_utils import calculate_classical_entropy, calculate_quantum_entropy
+from persistence import ConnectionPool, PersistenceError, create_backend, create_writer, fetch_keyset_page, iter_keyset
+from role_cache import RoleCache
+from password_stats import create_stats, password_buckets
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # Secure session management
 
+# Simulator backend for the QRNG + QNN circuits: 'numpy' or 'aer'
+app.config['QNN_BACKEND'] = DEFAULT_BACKEND  # QNN_BACKEND env var, see qnn_backends.py
+set_default_backend(app.config['QNN_BACKEND'])
+
+# Simulation budget per request; oversized num_qubits are 'downgrade'd
+# (fewer qubits, more shots) or 'reject'ed
+app.config['QNN_MEMORY_BUDGET_MB'] = int(os.environ.get('QNN_MEMORY_BUDGET_MB', 256))
+app.config['QNN_TIME_BUDGET_S'] = float(os.environ.get('QNN_TIME_BUDGET_S', 2.0))
+app.config['QNN_OVER_BUDGET'] = os.environ.get('QNN_OVER_BUDGET', 'downgrade')
+# Widest circuit ever planned; larger num_qubits are handled as over budget.
+# Unset: the bits one password needs (at least simulation_planner.MAX_QUBITS),
+# so e.g. one 84-qubit shot for 12 characters is planned as requested
+app.config['QNN_MAX_QUBITS'] = int(os.environ['QNN_MAX_QUBITS']) if os.environ.get('QNN_MAX_QUBITS') else None
+app.config['MAX_PASSWORD_LENGTH'] = int(os.environ.get('MAX_PASSWORD_LENGTH', 256))
+
+# Breach corpora indexes: Bloom filter (python breach_filter.py) and exact
+# sorted digest store (python breach_store.py); missing files are skipped
+app.config['BREACH_FILTER_FILE'] = os.environ.get('BREACH_FILTER_FILE', BREACH_FILTER_FILE)
+app.config['BREACH_STORE_FILE'] = os.environ.get('BREACH_STORE_FILE', BREACH_STORE_FILE)
+
+# Database: 'mysql' (db_config below) or 'sqlite' (stand-in file for local
+# runs/tests). Rows are written behind the request, in batches, through a
+# bounded connection pool (persistence.py)
+app.config['DB_BACKEND'] = os.environ.get('DB_BACKEND', 'mysql')
+app.config['DB_SQLITE_FILE'] = os.environ.get('DB_SQLITE_FILE', 'quantum_passwords.sqlite3')
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 4))
+app.config['DB_BATCH_SIZE'] = int(os.environ.get('DB_BATCH_SIZE', 100))
+app.config['DB_FLUSH_SECONDS'] = float(os.environ.get('DB_FLUSH_SECONDS', 0.5))
+
+# Summary statistics (password_stats.py): kept in memory, added to the
+# password_stats table every STATS_FLUSH_SECONDS
+app.config['STATS_FLUSH_SECONDS'] = float(os.environ.get('STATS_FLUSH_SECONDS', 5.0))
+
+# Role lookups: trusted from the signed session / in-process cache for this long
+app.config['ROLE_CACHE_TTL_S'] = float(os.environ.get('ROLE_CACHE_TTL_S', 60))
+app.config['ROLE_CACHE_SIZE'] = int(os.environ.get('ROLE_CACHE_SIZE', 10000))
+
+# Admin dashboard: rows per page (keyset pagination on passwords3.id)
+app.config['ADMIN_PAGE_SIZE'] = int(os.environ.get('ADMIN_PAGE_SIZE', 100))
+app.config['ADMIN_MAX_PAGE_SIZE'] = int(os.environ.get('ADMIN_MAX_PAGE_SIZE', 1000))
+
+# Bulk API (/api/v1/passwords): request limits and passwords per fused QNN run
+app.config['API_MAX_COUNT'] = int(os.environ.get('API_MAX_COUNT', 10000))
+app.config['API_MAX_LENGTH'] = int(os.environ.get('API_MAX_LENGTH', 256))
+app.config['API_BATCH_SIZE'] = int(os.environ.get('API_BATCH_SIZE', 256))
+
+# Start filling the QRNG pool now so the first requests don't wait on Aer
+get_default_pool()
+
 # Database configuration
 db_config = {
     'host': 'localhost',
@@ -20,32 +79,64 @@ db_config = {
     'database': 'quantum_passwords'
 }
 
-# Helper function to insert passwords into the database
-def insert_password(hashed_password, user_id, shared_key=None):
+db_pool = ConnectionPool(create_backend(app.config['DB_BACKEND'], db_config, app.config['DB_SQLITE_FILE']),
+                         size=app.config['DB_POOL_SIZE'])
+# Created before the writer, so at exit the writer drains first and its rows are flushed as stats
+password_stats = create_stats(db_pool, flush_seconds=app.config['STATS_FLUSH_SECONDS'])
+password_writer = create_writer(db_pool, 'passwords3', ('user_id', 'hashed_password', 'shared_key'),
+                                batch_size=app.config['DB_BATCH_SIZE'],
+                                flush_seconds=app.config['DB_FLUSH_SECONDS'],
+                                on_written=password_stats.add_written)
+PH = db_pool.backend.placeholder  # query parameter marker of the backend
+PASSWORD_COLUMNS = ('id', 'user_id', 'hashed_password', 'shared_key', 'created_at')
+
+# Character classes of the API charset policy (same sets as the form)
+CHARSETS = {
+    'lowercase': "abcdefghijklmnopqrstuvwxyz",
+    'uppercase': "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    'digits': "0123456789",
+    'symbols': "!@#$%^&*()-_=+",
+}
+
+# Helper function to insert passwords into the database (queued, written in batches).
+# With the plaintext and its symbol-set size, the summary statistics are updated
+# too, once the row has been committed (the plaintext is not queued).
+def insert_password(hashed_password, user_id, shared_key=None, password=None, char_space=None):
+    buckets = None
+    if password is not None:
+        buckets = password_buckets(user_id, password, char_space or len(set(password)), shared_key)
     try:
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-        query = "INSERT INTO passwords3 (user_id, hashed_password, shared_key) VALUES (%s, %s, %s)"
-        cursor.execute(query, (user_id, hashed_password, shared_key))
-        conn.commit()
-        cursor.close()
-        conn.close()
-    except mysql.connector.Error as err:
+        password_writer.submit((user_id, hashed_password, shared_key), buckets)
+    except PersistenceError as err:
         print(f"Error: {err}")
 
-# Helper function to check user role (admin/user)
-def check_role():
-    if 'user_id' in session:
-        user_id = session['user_id']
-        conn = mysql.connector.connect(**db_config)
+def load_role(user_id):
+    with db_pool.connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT role FROM users WHERE id = %s", (user_id,))
+        cursor.execute(f"SELECT role FROM users WHERE id = {PH}", (user_id,))
         role = cursor.fetchone()
         cursor.close()
-        conn.close()
-        return role[0] if role else 'user'
+    return role[0] if role else 'user'
+
+role_cache = RoleCache(load_role, ttl=app.config['ROLE_CACHE_TTL_S'], maxsize=app.config['ROLE_CACHE_SIZE'])
+
+# Helper function to check user role (admin/user); usually answered by the
+# session stamp or the role cache, without a DB round trip
+def check_role():
+    if 'user_id' in session:
+        return role_cache.get_role(session['user_id'], session)
     return 'guest'
 
+# Call after authenticating a user: stores the id and role in the signed session
+def login_user(user_id, role=None):
+    if role is None:
+        role = load_role(user_id)
+    role_cache.stamp(session, user_id, role)
+
+# Call after changing a user's role (None: every user)
+def invalidate_role(user_id=None):
+    role_cache.invalidate(user_id)
+
 @app.route('/')
 def index():
     """Renders the index page with the form for password generation inputs."""
@@ -56,9 +147,15 @@ def generate_password():
     """Handles form submissions from index.html for password generation."""
     # Gather parameters from form
     qkd_results = None 
-    num_qubits = int(request.form.get('num_qubits', 8))
-    shots = int(request.form.get('shots', 1))
-    password_length = int(request.form.get('password_length', 12))
+    try:
+        num_qubits = int(request.form.get('num_qubits', 8))
+        password_length = int(request.form.get('password_length', 12))
+    except ValueError:
+        return "Invalid input: qubits and password length must be integers.", 400
+    if num_qubits < 1 or password_length < 1:
+        return "Invalid input: qubits and password length must be at least 1.", 400
+    if password_length > app.config['MAX_PASSWORD_LENGTH']:
+        return f"Invalid input: password length must be at most {app.config['MAX_PASSWORD_LENGTH']}.", 400
 
     include_lowercase = (request.form.get('include_lowercase') == 'yes')
     include_uppercase = (request.form.get('include_uppercase') == 'yes')
@@ -73,31 +170,7 @@ def generate_password():
     process_log = "=== Quantum Password Generation ===\n\n"
 
     # Step 1: Gather user inputs for QNN and password parameters
-    process_log += f"User Inputs: {num_qubits} qubits, {shots} shots, {password_length} password length\n"
-
-    # Generate quantum-random seed
-    process_log += "[Step] Generating quantum-random seed...\n"
-    seed_bits = quantum_random_bitstring(num_bits=16)
-    process_log += f"Quantum Random Seed (16 bits): {seed_bits}\n"
-
-    # Build QNN circuit
-    process_log += "[Step] Building QNN circuit...\n"
-    qnn_circuit = build_qnn_circuit(num_qubits=num_qubits, random_seed=seed_bits)
-
-    # Run the QNN circuit
-    measure_circuit = qnn_circuit.copy()
-    for i in range(num_qubits):
-        measure_circuit.measure(i, i)
-
-    # Simulate the circuit to generate random bits
-    process_log += "[Step] Simulating circuit...\n"
-    simulator = AerSimulator()
-    job = simulator.run(measure_circuit, shots=shots)
-    result = job.result()
-    counts = result.get_counts(measure_circuit)
-
-    best_outcome = max(counts, key=counts.get)
-    process_log += f"Measured State: {best_outcome}\n\n"
+    process_log += f"User Inputs: {num_qubits} qubits, {password_length} password length\n"
 
     # Step 2: Create a symbol set based on user selections
     chosen_symbols = ""
@@ -114,9 +187,51 @@ def generate_password():
         chosen_symbols = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
         process_log += "[WARN] No character sets chosen! Defaulting to alphanumeric.\n"
 
+    # Generate the quantum-random seeds and run the QNN as one fused
+    # simulator invocation (see fused_pipeline.run_fused_qnn), planned within budget
+    process_log += "[Step] Generating quantum-random seeds + simulating circuit (fused)...\n"
+    # Rejection sampling drops out-of-range values, so harvest the bits the
+    # API budgets for one password; bits_to_password tops up from the pool
+    harvest_bits = batch_bit_budget(1, password_length, chosen_symbols)
+    needed_shots = -(-harvest_bits // num_qubits)
+    try:
+        plan = plan_qnn_simulation(
+            num_qubits, None, needed_shots,
+            max_memory_bytes=app.config['QNN_MEMORY_BUDGET_MB'] * 1024 * 1024,
+            max_seconds=app.config['QNN_TIME_BUDGET_S'],
+            on_over_budget=app.config['QNN_OVER_BUDGET'],
+            fused=True, seed_bits=SEED_BITS,
+            max_qubits=app.config['QNN_MAX_QUBITS'], total_bits=harvest_bits,
+        )
+    except SimulationBudgetError as err:
+        return f"Request rejected: {err}", 400
+    process_log += (f"[Plan] {plan['method']} on '{plan['backend']}' backend "
+                    f"(~{plan['est_memory_bytes'] / 2**20:.1f} MB, ~{plan['est_seconds'] * 1000:.1f} ms)\n")
+    if plan['downgraded']:
+        reason = (f"the {plan['max_qubits']}-qubit limit (QNN_MAX_QUBITS)" if plan['limited_by'] == 'max_qubits'
+                  else "the simulation budget")
+        process_log += (f"[WARN] {num_qubits} qubits exceed {reason}; "
+                        f"using {plan['num_qubits']} qubits x {plan['shots']} shots.\n")
+    fused = run_fused_qnn(plan['num_qubits'], plan['shots'], backend=plan['backend'],
+                          seed_source=quantum_random_bitstring)
+    process_log += f"[Fused] {fused['method']}, {fused['simulator_jobs']} simulator job(s)\n"
+    process_log += f"Quantum Random Seeds ({SEED_BITS} bits per shot): {' '.join(map(str, fused['seeds']))}\n"
+    shot_bits = fused['outcomes']
+    measured_bits = fused['bits']
+    process_log += f"Measured States ({len(shot_bits)} shots): {measured_bits}\n\n"
+
     # Step 3: Generate final password from bits
     process_log += "[Step] Generating final password...\n"
-    password = bits_to_password(best_outcome, password_length, chosen_symbols)
+    topped_up = []
+
+    def pool_top_up(num_bits):
+        topped_up.append(num_bits)
+        return quantum_random_bitstring(num_bits)
+
+    password = bits_to_password(measured_bits, password_length, chosen_symbols, more_bits=pool_top_up)
+    if topped_up:
+        process_log += (f"[Pool] Rejection sampling used up the {len(measured_bits)} harvested bits; "
+                        f"topped up {sum(topped_up)} bits from the entropy pool.\n")
     process_log += f"Initial Password: {password}\n"
 
     # Step 4: Apply SHA-3 hashing if needed
@@ -133,17 +248,27 @@ def generate_password():
         if qkd_sim:
             process_log += "[Step] Running QKD Simulation...\n"
             qkd_results = simulate_qkd(password, num_qubits=96)  # 96 qubits for QKD simulation
-            shared_key = qkd_results['shared_key']
+            shared_key = str(qkd_results['shared_key'])
             process_log += f"QKD Simulation completed. Shared Key: {shared_key}\n"
 
         # Insert into the database with optional QKD shared key
-        insert_password(hashed_password, user_id, shared_key)
+        insert_password(hashed_password, user_id, shared_key, password=password, char_space=len(chosen_symbols))
 
     # Step 6: Validate password against common patterns
     validation_message = ""
     if validate_common:
         is_common = validate_password_against_common_patterns(password)
-        validation_message = "WARNING: Password is in common patterns!" if is_common else "OK: Password is unique."
+        breached = breach_status(password, app.config['BREACH_FILTER_FILE'], app.config['BREACH_STORE_FILE'])
+        embedded = find_embedded_patterns(password)  # substrings, case/leetspeak-insensitive
+        if is_common:
+            validation_message = "WARNING: Password is in common patterns!"
+        elif breached:
+            validation_message = f"WARNING: Password appears in breach corpora ({breached})!"
+        elif embedded:
+            validation_message = "WARNING: Password contains common pattern(s): " + ", ".join(
+                f"'{m['matched']}' ~ {m['pattern']} at {m['start']}" for m in embedded)
+        else:
+            validation_message = "OK: Password is unique."
 
     # Step 7: Calculate entropy values
     classical_entropy = calculate_classical_entropy(password_length, len(chosen_symbols))
@@ -162,20 +287,171 @@ def generate_password():
         quantum_entropy=quantum_entropy
     )
 
-# Admin route to view stored passwords (accessible only by admin)
+# Bulk generation API for provisioning jobs. JSON body:
+#   count (1..API_MAX_COUNT), length (default 12), charset (list of CHARSETS
+#   names, default letters + digits), num_qubits (default 8), sha3 (bool:
+#   add the hash and store it for the logged-in user), validate (bool)
+# Passwords are produced in batches of API_BATCH_SIZE, each from one fused
+# QNN run, and streamed as NDJSON (one object per password) while they are
+# generated; with Accept: application/json a single JSON document is returned.
+@app.route('/api/v1/passwords', methods=['POST'])
+def api_generate_passwords():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({'error': 'Expected a JSON object.'}), 400
+    try:
+        count = int(body.get('count', 1))
+        length = int(body.get('length', 12))
+        num_qubits = int(body.get('num_qubits', 8))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'count, length and num_qubits must be integers.'}), 400
+    if not 1 <= count <= app.config['API_MAX_COUNT']:
+        return jsonify({'error': f"count must be between 1 and {app.config['API_MAX_COUNT']}."}), 400
+    if not 1 <= length <= app.config['API_MAX_LENGTH']:
+        return jsonify({'error': f"length must be between 1 and {app.config['API_MAX_LENGTH']}."}), 400
+    if num_qubits < 1:
+        return jsonify({'error': 'num_qubits must be at least 1.'}), 400
+    charset = body.get('charset', ['lowercase', 'uppercase', 'digits'])
+    if not isinstance(charset, list) or not charset or any(name not in CHARSETS for name in charset):
+        return jsonify({'error': f"charset must be a non-empty list of: {', '.join(CHARSETS)}."}), 400
+    symbols = "".join(CHARSETS[name] for name in CHARSETS if name in charset)
+    apply_sha3 = bool(body.get('sha3', False))
+    validate_common = bool(body.get('validate', False))
+    user_id = session.get('user_id', None)
+
+    # One plan for every batch, so an over-budget request fails before streaming starts
+    batch_size = min(count, app.config['API_BATCH_SIZE'])
+    batch_bits = batch_bit_budget(batch_size, length, symbols)
+    try:
+        plan = plan_qnn_simulation(
+            num_qubits, None, math.ceil(batch_bits / num_qubits),
+            max_memory_bytes=app.config['QNN_MEMORY_BUDGET_MB'] * 1024 * 1024,
+            max_seconds=app.config['QNN_TIME_BUDGET_S'],
+            on_over_budget=app.config['QNN_OVER_BUDGET'],
+            fused=True, seed_bits=SEED_BITS,
+            # Cap at one password's bits: batch_bits would allow absurd widths
+            max_qubits=app.config['QNN_MAX_QUBITS'] or max(MAX_QUBITS, length * 7), total_bits=batch_bits,
+        )
+    except SimulationBudgetError as err:
+        return jsonify({'error': f"Request rejected: {err}"}), 400
+
+    # Never more shots than the plan was checked for; a short batch is
+    # topped up from the entropy pool by generate_passwords
+    def qnn_bits(num_bits):
+        shots = min(math.ceil(num_bits / plan['num_qubits']), plan['shots'])
+        return run_fused_qnn(plan['num_qubits'], shots, backend=plan['backend'],
+                             seed_source=quantum_random_bitstring)['bits']
+
+    def records():
+        index = 0
+        for batch in iter_password_batches(count, length, symbols, bit_source=qnn_bits, batch_size=batch_size):
+            for password in batch:
+                record = {'index': index, 'password': password}
+                if apply_sha3:
+                    record['hashed_password'] = sha3_hash_password(password)
+                    if user_id:
+                        insert_password(record['hashed_password'], user_id, password=password,
+                                        char_space=len(symbols))
+                if validate_common:
+                    record['common'] = validate_password_against_common_patterns(password)
+                    record['breached'] = breach_status(password, app.config['BREACH_FILTER_FILE'],
+                                                       app.config['BREACH_STORE_FILE'])
+                    record['embedded'] = [m['pattern'] for m in find_embedded_patterns(password)]
+                yield record
+                index += 1
+
+    entropy = calculate_classical_entropy(length, len(symbols))
+    headers = {
+        'X-Password-Entropy-Bits': f"{entropy:.2f}",
+        'X-QNN-Plan': f"{plan['method']} on {plan['backend']}, {plan['num_qubits']} qubits",
+    }
+    best = request.accept_mimetypes.best_match(['application/x-ndjson', 'application/json'],
+                                               default='application/x-ndjson')
+    if best == 'application/json':
+        return jsonify({'count': count, 'length': length, 'symbols': len(symbols),
+                        'entropy_bits': entropy, 'passwords': list(records())}), 200, headers
+    return app.response_class((json.dumps(record) + "\n" for record in records()),
+                              mimetype='application/x-ndjson', headers=headers)
+
+# Admin route to view stored passwords (accessible only by admin).
+# Pages: ?after=<id> / ?before=<id> (&limit=n); ?stream=1 renders the whole
+# table chunk by chunk while rows are read in keyset batches.
 @app.route('/admin')
 def admin_dashboard():
     if check_role() != 'admin':
         return redirect(url_for('index'))  # Redirect to home if not admin
 
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM passwords3")
-    passwords = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    if request.args.get('stream') == '1':
+        rows = iter_keyset(db_pool, 'passwords3', PASSWORD_COLUMNS)
+        return app.response_class(stream_template('admin_dashboard.html', passwords=rows, streaming=True))
 
-    return render_template('admin_dashboard.html', passwords=passwords)
+    limit = request.args.get('limit', app.config['ADMIN_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['ADMIN_MAX_PAGE_SIZE']))
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+    passwords, has_more = fetch_keyset_page(db_pool, 'passwords3', PASSWORD_COLUMNS, limit,
+                                            after=after, before=None if after is not None else before)
+    backwards = after is None and before is not None
+    next_after = passwords[-1][0] if passwords and (has_more or backwards) else None
+    prev_before = passwords[0][0] if passwords and (has_more if backwards else after is not None) else None
+
+    return render_template('admin_dashboard.html', passwords=passwords, streaming=False, limit=limit,
+                           next_after=next_after, prev_before=prev_before)
+
+# Admin export of passwords3 as NDJSON or CSV, streamed in keyset batches
+@app.route('/admin/export.<fmt>')
+def admin_export(fmt):
+    if check_role() != 'admin':
+        return redirect(url_for('index'))
+    if fmt not in ('ndjson', 'csv'):
+        abort(404)
+    rows = iter_keyset(db_pool, 'passwords3', PASSWORD_COLUMNS)
+
+    def ndjson():
+        for row in rows:
+            yield json.dumps(dict(zip(PASSWORD_COLUMNS, row)), default=str) + "\n"
+
+    def csv_lines():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(PASSWORD_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    if fmt == 'ndjson':
+        return app.response_class(ndjson(), mimetype='application/x-ndjson')
+    return app.response_class(csv_lines(), mimetype='text/csv',
+                              headers={'Content-Disposition': 'attachment; filename=passwords3.csv'})
+
+# Admin route for the summary statistics (maintained on insert, no table scan);
+# ?top_users=n sizes the most-active-users list, ?user_id=<id> adds one user's count
+@app.route('/admin/stats')
+def admin_stats():
+    if check_role() != 'admin':
+        return redirect(url_for('index'))
+    stats = password_stats.snapshot(top_users=request.args.get('top_users', 20, type=int))
+    user_id = request.args.get('user_id')
+    if user_id is not None:
+        stats['user'] = {'user_id': user_id, 'count': password_stats.count('user', user_id)}
+    return jsonify(stats)
+
+# Admin route to inspect the QRNG pool (fill level, refill rate, misses)
+@app.route('/admin/entropy_pool')
+def admin_entropy_pool():
+    if check_role() != 'admin':
+        return redirect(url_for('index'))
+    return jsonify(pool_stats())
+
+# Admin route to inspect the write-behind queue and connection pool
+@app.route('/admin/db')
+def admin_db():
+    if check_role() != 'admin':
+        return redirect(url_for('index'))
+    return jsonify({'writer': password_writer.stats(), 'pool': db_pool.stats(), 'role_cache': role_cache.stats()})
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,188 @@
+# bitbuffer.py
+"""
+Compact bit buffer shared by the QRNG, QNN, password and QKD stages.
+
+Randomness used to travel between modules as Python strings of '0'/'1'
+characters: one byte per bit, parsed character by character. A BitBuffer
+keeps the bits packed 8 per byte (most significant bit first, as
+np.packbits) on top of any bytes-like object or NumPy uint8 array, without
+copying it. Slicing returns views on the same memory at any bit offset.
+
+String adapters exist only for the edges (templates, logs, Aer's text
+output): str(buffer) gives the '0'/'1' text, BitBuffer.from_bitstring()
+parses it, and a buffer compares and hashes equal to its text.
+"""
+
+import numpy as np
+
+
+class BitBuffer:
+    """
+    Immutable, packed sequence of bits. Indexing returns 0/1, slicing
+    with step 1 returns a zero-copy BitBuffer view.
+    """
+
+    __slots__ = ("_data", "_offset", "_length")
+
+    def __init__(self, data=b"", num_bits=None, offset=0):
+        """
+        :param data: packed bits (bytes, bytearray, memoryview or NumPy array);
+                     NumPy arrays are reinterpreted as raw bytes, not copied
+        :param num_bits: number of valid bits (default: everything after `offset`)
+        :param offset: position of the first valid bit in `data`
+        """
+        if isinstance(data, np.ndarray):
+            data = np.ascontiguousarray(data).reshape(-1).view(np.uint8)
+        else:
+            data = np.frombuffer(data, dtype=np.uint8)
+        available = data.size * 8 - offset
+        if num_bits is None:
+            num_bits = available
+        if offset < 0 or not 0 <= num_bits <= available:
+            raise ValueError(f"{num_bits} bits at offset {offset} exceed the {data.size}-byte buffer.")
+        self._data = data
+        self._offset = offset
+        self._length = num_bits
+
+    # ------------------------------
+    # Constructors
+    # ------------------------------
+    @classmethod
+    def from_bitstring(cls, text):
+        """Parses a '0'/'1' string (e.g. Aer memory) in one vectorized pass."""
+        bits = np.frombuffer(text.encode("ascii"), dtype=np.uint8) - ord("0")
+        if bits.size and bits.max() > 1:
+            raise ValueError("Bitstrings may only contain '0' and '1'.")
+        return cls(np.packbits(bits), bits.size)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Packs an array-like of single bits (0/1 or bool)."""
+        bits = np.asarray(bits, dtype=bool).reshape(-1)
+        return cls(np.packbits(bits), bits.size)
+
+    @classmethod
+    def from_uints(cls, values, width):
+        """
+        Packs unsigned integers as consecutive `width`-bit big-endian fields,
+        i.e. the same bits as "".join(format(v, f"0{width}b") for v in values).
+        """
+        values = np.asarray(values).reshape(-1)
+        if width in (8, 16, 32, 64):
+            return cls(values.astype(f">u{width // 8}"), values.size * width)
+        shifts = np.arange(width - 1, -1, -1, dtype=np.uint64)
+        bits = (values.astype(np.uint64)[:, None] >> shifts) & 1
+        return cls.from_bits(bits)
+
+    @classmethod
+    def concat(cls, buffers):
+        """Joins buffers (or anything as_bitbuffer accepts) into a new buffer."""
+        buffers = [as_bitbuffer(b) for b in buffers]
+        if all(b._offset % 8 == 0 and b._length % 8 == 0 for b in buffers):
+            return cls(b"".join(b.to_bytes() for b in buffers))
+        bits = np.concatenate([b.to_array() for b in buffers]) if buffers else np.empty(0, np.uint8)
+        return cls.from_bits(bits)
+
+    # ------------------------------
+    # Sequence protocol
+    # ------------------------------
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return BitBuffer.from_bits(self.to_array()[key])
+            return BitBuffer(self._data, max(0, stop - start), self._offset + start)
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("BitBuffer index out of range")
+        position = self._offset + key
+        return int(self._data[position >> 3] >> (7 - (position & 7))) & 1
+
+    def __iter__(self):
+        return iter(self.to_array().tolist())
+
+    def __add__(self, other):
+        return BitBuffer.concat([self, other])
+
+    def __radd__(self, other):
+        return BitBuffer.concat([other, self])
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            return self.to_bitstring() == other
+        if isinstance(other, BitBuffer):
+            return self._length == other._length and np.array_equal(self.to_array(), other.to_array())
+        return NotImplemented
+
+    def __hash__(self):
+        # Equal to the hash of the '0'/'1' text, so buffers and strings mix as dict keys
+        return hash(self.to_bitstring())
+
+    # ------------------------------
+    # Conversions
+    # ------------------------------
+    def to_array(self):
+        """Unpacked bits as a uint8 array of 0/1 (one byte per bit)."""
+        first = self._offset >> 3
+        last = (self._offset + self._length + 7) >> 3
+        start = self._offset & 7
+        return np.unpackbits(self._data[first:last])[start:start + self._length]
+
+    def packed(self):
+        """
+        Packed bits as a uint8 array (zero-padded last byte). A view on the
+        underlying memory when the buffer is byte-aligned, else a copy.
+        """
+        if self._offset % 8 == 0 and self._length % 8 == 0:
+            first = self._offset >> 3
+            return self._data[first:first + self._length // 8]
+        return np.packbits(self.to_array())
+
+    def to_bytes(self):
+        return self.packed().tobytes()
+
+    __bytes__ = to_bytes
+
+    def to_uints(self, width):
+        """Splits the bits into `width`-bit big-endian unsigned integers (tail dropped)."""
+        count = self._length // width
+        bits = self.to_array()[:count * width].reshape(count, width).astype(np.uint64)
+        return bits @ (np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64))
+
+    def uint(self, start, width):
+        """Unsigned integer value of the `width` bits starting at `start`."""
+        return int(self[start:start + width].to_uints(width)[0]) if width else 0
+
+    def count_ones(self):
+        return int(np.count_nonzero(self.to_array()))
+
+    def to_bitstring(self):
+        """'0'/'1' text of the bits, for templates and logs."""
+        return (self.to_array() + ord("0")).tobytes().decode("ascii")
+
+    __str__ = to_bitstring
+
+    def __repr__(self):
+        text = self.to_bitstring()
+        if len(text) > 64:
+            text = text[:64] + "..."
+        return f"BitBuffer('{text}', {self._length} bits)"
+
+
+def as_bitbuffer(bits):
+    """
+    Coerces random bits to a BitBuffer: BitBuffers pass through, '0'/'1'
+    strings are parsed, bool arrays are single bits, and bytes-like
+    objects or uint8 arrays are taken as packed bits.
+    """
+    if isinstance(bits, BitBuffer):
+        return bits
+    if isinstance(bits, str):
+        return BitBuffer.from_bitstring(bits)
+    if isinstance(bits, np.ndarray) and bits.dtype == np.bool_:
+        return BitBuffer.from_bits(bits)
+    return BitBuffer(bits)
@@ -0,0 +1,207 @@
+# breach_filter.py
+"""
+Compact, memory-mapped Bloom filter over the full breach corpora
+(rockyou / HIBP / crackstation dataset files read by pattern_finder.py).
+
+A Python set of hundreds of millions of passwords does not fit in memory,
+so `build_breach_filter` streams the corpora once into a blocked Bloom
+filter file sized for a configurable false-positive rate (~2 bytes per
+password at 0.1%). All probe bits of a password live in one 64-byte block,
+so a lookup touches a single page. `BreachFilter` mmaps the file read-only:
+every worker process shares the same page-cache pages and nothing is
+loaded up front.
+
+A hit means "probably breached" (false positives at the configured rate);
+a miss is always correct.
+
+Usage:
+  python breach_filter.py [fp_rate]
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+
+import numpy as np
+
+from pattern_finder import DATASET_FILES, iter_passwords_from_txt
+
+BREACH_FILTER_FILE = "breach_filter.bin"
+
+DEFAULT_FP_RATE = 0.001
+
+# File layout: 64-byte header, then `num_blocks` blocks of BLOCK_BYTES
+_MAGIC = b"QPBLOOM1"
+_HEADER = struct.Struct("<8sIIQQd")  # magic, block_bytes, num_probes, num_blocks, num_items, fp_rate
+_HEADER_BYTES = 64
+BLOCK_BYTES = 64
+_BLOCK_BITS = BLOCK_BYTES * 8
+_PROBE_BITS = 9  # log2(_BLOCK_BITS): one probe = 9 bits of the digest
+_MAX_PROBES = (256 - 64) // _PROBE_BITS  # digest bits left after the block index
+
+# Passwords hashed per vectorized insert while building
+_BUILD_BATCH = 65536
+
+
+def _digest(password):
+    return hashlib.blake2b(password.encode("utf-8"), digest_size=32).digest()
+
+
+def filter_parameters(num_items, fp_rate=DEFAULT_FP_RATE):
+    """
+    Sizes the filter: number of probes k and of 64-byte blocks.
+    Uses the classic m = -n ln(p) / ln(2)^2 plus 20%, which absorbs the
+    uneven load of a blocked filter for rates down to ~1e-4.
+    :return: (num_probes, num_blocks)
+    """
+    if not 0 < fp_rate < 1:
+        raise ValueError("fp_rate must be between 0 and 1.")
+    num_items = max(num_items, 1)
+    num_bits = -num_items * math.log(fp_rate) / math.log(2) ** 2 * 1.2
+    num_probes = min(_MAX_PROBES, max(1, round(-math.log2(fp_rate))))
+    return num_probes, max(1, math.ceil(num_bits / _BLOCK_BITS))
+
+
+def _probe_positions(digests, num_probes, num_blocks):
+    """
+    Vectorized probe positions for a batch of 32-byte digests.
+    :return: (block index per digest, (n, num_probes) bit offsets inside the block)
+    """
+    raw = np.frombuffer(b"".join(digests), dtype="<u8").reshape(-1, 4)
+    blocks = raw[:, 0] % np.uint64(num_blocks)
+    bits = np.empty((raw.shape[0], num_probes), dtype=np.uint64)
+    for probe in range(num_probes):
+        start = 64 + probe * _PROBE_BITS
+        word, shift = divmod(start, 64)
+        value = raw[:, word] >> np.uint64(shift)
+        if shift + _PROBE_BITS > 64:
+            value |= raw[:, word + 1] << np.uint64(64 - shift)
+        bits[:, probe] = value & np.uint64(_BLOCK_BITS - 1)
+    return blocks, bits
+
+
+def build_breach_filter(sources=DATASET_FILES, output_file=BREACH_FILTER_FILE,
+                        fp_rate=DEFAULT_FP_RATE, expected_items=None):
+    """
+    Compiles the corpora into a blocked Bloom filter file.
+
+    :param sources: text files with one password per line
+    :param output_file: filter file to write
+    :param fp_rate: target false-positive rate
+    :param expected_items: number of passwords; counted in a first pass when omitted
+    :return: dict with num_items, num_blocks, num_probes and file_bytes
+    """
+    if expected_items is None:
+        expected_items = sum(1 for path in sources for _ in iter_passwords_from_txt(path, compiled=True))
+    num_probes, num_blocks = filter_parameters(expected_items, fp_rate)
+
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, BLOCK_BYTES, num_probes, num_blocks, 0, fp_rate)
+                .ljust(_HEADER_BYTES, b"\0"))
+        f.truncate(_HEADER_BYTES + num_blocks * BLOCK_BYTES)
+
+    # The bit array is written through a memory map: the OS pages it, not the heap
+    table = np.memmap(tmp_file, dtype=np.uint8, mode="r+", offset=_HEADER_BYTES,
+                      shape=(num_blocks * BLOCK_BYTES,))
+    num_items = 0
+    batch = []
+
+    def flush():
+        blocks, bits = _probe_positions(batch, num_probes, num_blocks)
+        byte_index = blocks[:, None] * np.uint64(BLOCK_BYTES) + (bits >> np.uint64(3))
+        masks = (np.uint64(1) << (bits & np.uint64(7))).astype(np.uint8)
+        np.bitwise_or.at(table, byte_index.ravel().astype(np.intp), masks.ravel())
+        batch.clear()
+
+    for path in sources:
+        for password in iter_passwords_from_txt(path, compiled=True):
+            batch.append(_digest(password))
+            num_items += 1
+            if len(batch) == _BUILD_BATCH:
+                flush()
+    if batch:
+        flush()
+    table.flush()
+    del table
+
+    with open(tmp_file, "r+b") as f:
+        f.write(_HEADER.pack(_MAGIC, BLOCK_BYTES, num_probes, num_blocks, num_items, fp_rate))
+    os.replace(tmp_file, output_file)
+
+    info = {
+        "num_items": num_items,
+        "num_blocks": num_blocks,
+        "num_probes": num_probes,
+        "file_bytes": _HEADER_BYTES + num_blocks * BLOCK_BYTES,
+    }
+    print(f"[INFO] Wrote breach filter '{output_file}': {num_items} passwords, "
+          f"{info['file_bytes'] / 2**20:.1f} MB, {num_probes} probes, target FP rate {fp_rate:g}")
+    return info
+
+
+class BreachFilter:
+    """
+    Read-only view of a filter file. Membership checks read one 64-byte
+    block straight from the shared mapping.
+    """
+
+    def __init__(self, filter_file=BREACH_FILTER_FILE):
+        with open(filter_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, block_bytes, self.num_probes, self.num_blocks, self.num_items, self.fp_rate = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or block_bytes != BLOCK_BYTES:
+            self._map.close()
+            raise ValueError(f"Not a breach filter file: {filter_file}")
+        if len(self._map) < _HEADER_BYTES + self.num_blocks * BLOCK_BYTES:
+            self._map.close()
+            raise ValueError(f"Truncated breach filter file: {filter_file}")
+        self.filter_file = filter_file
+
+    def __contains__(self, password):
+        digest = int.from_bytes(_digest(password), "little")
+        block = (digest & 0xFFFFFFFFFFFFFFFF) % self.num_blocks
+        start = _HEADER_BYTES + block * BLOCK_BYTES
+        bits = int.from_bytes(self._map[start:start + BLOCK_BYTES], "little")
+        digest >>= 64
+        for _ in range(self.num_probes):
+            if not (bits >> (digest & (_BLOCK_BITS - 1))) & 1:
+                return False
+            digest >>= _PROBE_BITS
+        return True
+
+    def contains_many(self, passwords):
+        """
+        :param passwords: iterable of passwords
+        :return: list of booleans, True where the password is probably breached
+        """
+        return [password in self for password in passwords]
+
+    def close(self):
+        self._map.close()
+
+
+_filters = {}
+_filters_lock = threading.Lock()
+
+
+def get_breach_filter(filter_file=BREACH_FILTER_FILE):
+    """
+    Returns the shared BreachFilter of `filter_file`, or None if the file
+    has not been built (the apps then skip the breach check).
+    """
+    key = os.path.abspath(filter_file)
+    with _filters_lock:
+        breach_filter = _filters.get(key)
+        if breach_filter is None and os.path.isfile(filter_file):
+            breach_filter = _filters[key] = BreachFilter(filter_file)
+        return breach_filter
+
+
+if __name__ == "__main__":
+    build_breach_filter(fp_rate=float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FP_RATE)
@@ -0,0 +1,248 @@
+# breach_store.py
+"""
+Exact breach lookups against a sorted file of fixed-width binary digests.
+
+`build_digest_store` hashes every password of the breach corpora (SHA-1,
+as used by HIBP, or SHA3-256, as in password_generation.sha3_hash_password),
+sorts the digests with an external merge sort (bounded memory, sorted runs
+on disk), drops duplicates and writes:
+
+  header (64 bytes) | fan-out table: 2**16 + 1 uint64 offsets, one bucket
+  per 2-byte digest prefix | sorted digests
+
+`DigestStore` mmaps the file and binary-searches only the bucket of the
+digest's prefix (np.searchsorted on a zero-copy view), so an exact check
+against a billion-entry corpus reads a handful of pages and copies nothing.
+HIBP's "SHA1:count" hash lists can be imported directly.
+
+It complements breach_filter.py: the Bloom filter rules out most passwords
+cheaply, and the store confirms the rest exactly (see breach_status).
+
+Usage:
+  python breach_store.py [sha1|sha3_256]
+"""
+
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from pattern_finder import DATASET_FILES, iter_passwords_from_txt
+from breach_filter import BREACH_FILTER_FILE, get_breach_filter
+
+BREACH_STORE_FILE = "breach_store.bin"
+
+ALGORITHMS = {"sha1": 20, "sha3_256": 32}
+
+_MAGIC = b"QPDIGST1"
+_HEADER = struct.Struct("<8s16sIQI")  # magic, algorithm, digest_size, count, fanout_bits
+_HEADER_BYTES = 64
+FANOUT_BITS = 16
+
+# Digests per sorted run while building (32 MB of SHA3-256 digests)
+RUN_ITEMS = 1 << 20
+
+
+def digest_password(password, algorithm="sha1"):
+    """Binary digest of a password as stored in the file."""
+    return hashlib.new(algorithm, password.encode("utf-8")).digest()
+
+
+def _iter_digests(sources, algorithm, hibp_hash_files):
+    for path in sources:
+        for password in iter_passwords_from_txt(path, compiled=True):
+            yield digest_password(password, algorithm)
+    for path in hibp_hash_files:
+        # HIBP "Pwned Passwords" lines: 40 hex chars of SHA-1, optionally ":count"
+        for line in iter_passwords_from_txt(path):
+            yield bytes.fromhex(line.split(":", 1)[0])
+
+
+def _write_sorted_runs(digests, digest_size, run_dir):
+    runs, batch = [], []
+
+    def flush():
+        block = np.unique(np.frombuffer(b"".join(batch), dtype=f"S{digest_size}"))
+        path = os.path.join(run_dir, f"run{len(runs):05d}.bin")
+        block.tofile(path)
+        runs.append(path)
+        batch.clear()
+
+    for digest in digests:
+        batch.append(digest)
+        if len(batch) == RUN_ITEMS:
+            flush()
+    if batch:
+        flush()
+    return runs
+
+
+def _read_run(path, digest_size, records_per_read=65536):
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(digest_size * records_per_read)
+            if not block:
+                return
+            for start in range(0, len(block), digest_size):
+                yield block[start:start + digest_size]
+
+
+def build_digest_store(sources=DATASET_FILES, output_file=BREACH_STORE_FILE,
+                       algorithm="sha1", hibp_hash_files=()):
+    """
+    Converts breach lists into a sorted, de-duplicated digest file.
+
+    :param sources: text files with one plain-text password per line
+    :param output_file: store file to write
+    :param algorithm: 'sha1' (HIBP-compatible) or 'sha3_256'
+    :param hibp_hash_files: HIBP SHA-1 hash lists ("HASH:count"), sha1 only
+    :return: dict with count and file_bytes
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}'. Choose from: {', '.join(ALGORITHMS)}")
+    if hibp_hash_files and algorithm != "sha1":
+        raise ValueError("HIBP hash lists can only be imported into a sha1 store.")
+    digest_size = ALGORITHMS[algorithm]
+    fanout_size = (1 << FANOUT_BITS) + 1
+    data_offset = _HEADER_BYTES + fanout_size * 8
+
+    tmp_file = output_file + ".tmp"
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file))) as run_dir:
+        runs = _write_sorted_runs(_iter_digests(sources, algorithm, hibp_hash_files), digest_size, run_dir)
+
+        # k-way merge of the sorted runs, dropping duplicates across runs
+        count = 0
+        previous = None
+        with open(tmp_file, "wb") as out:
+            out.write(b"\0" * data_offset)
+            merged = heapq.merge(*(_read_run(path, digest_size) for path in runs))
+            pending = []
+            for digest in merged:
+                if digest != previous:
+                    pending.append(digest)
+                    previous = digest
+                    if len(pending) == 65536:
+                        out.write(b"".join(pending))
+                        count += len(pending)
+                        pending.clear()
+            out.write(b"".join(pending))
+            count += len(pending)
+
+    # Fan-out table: cumulative digest count per 2-byte prefix
+    counts = np.zeros(1 << FANOUT_BITS, dtype=np.uint64)
+    if count:
+        table = np.memmap(tmp_file, dtype=np.uint8, mode="r", offset=data_offset,
+                          shape=(count, digest_size))
+        for start in range(0, count, RUN_ITEMS):
+            prefix = table[start:start + RUN_ITEMS, :2].astype(np.uint32)
+            counts += np.bincount((prefix[:, 0] << 8) | prefix[:, 1],
+                                  minlength=1 << FANOUT_BITS).astype(np.uint64)
+        del table
+    fanout = np.zeros(fanout_size, dtype="<u8")
+    np.cumsum(counts, out=fanout[1:])
+
+    with open(tmp_file, "r+b") as out:
+        out.write(_HEADER.pack(_MAGIC, algorithm.encode("ascii"), digest_size, count, FANOUT_BITS))
+        out.seek(_HEADER_BYTES)
+        out.write(fanout.tobytes())
+    os.replace(tmp_file, output_file)
+
+    info = {"count": count, "file_bytes": data_offset + count * digest_size}
+    print(f"[INFO] Wrote {algorithm} digest store '{output_file}': {count} unique digests, "
+          f"{info['file_bytes'] / 2**20:.1f} MB from {len(runs)} sorted run(s)")
+    return info
+
+
+class DigestStore:
+    """
+    Read-only, memory-mapped view of a digest store file.
+    """
+
+    def __init__(self, store_file=BREACH_STORE_FILE):
+        with open(store_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, algorithm, self.digest_size, self.count, fanout_bits = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or fanout_bits != FANOUT_BITS:
+            self._map.close()
+            raise ValueError(f"Not a digest store file: {store_file}")
+        self.algorithm = algorithm.rstrip(b"\0").decode("ascii")
+        self.store_file = store_file
+
+        fanout_size = (1 << FANOUT_BITS) + 1
+        # Zero-copy views on the mapping
+        self._fanout = np.frombuffer(self._map, dtype="<u8", count=fanout_size, offset=_HEADER_BYTES)
+        self._digests = np.frombuffer(self._map, dtype=f"S{self.digest_size}", count=self.count,
+                                      offset=_HEADER_BYTES + fanout_size * 8)
+
+    def contains_digest(self, digest):
+        """True if the binary digest is in the store."""
+        prefix = (digest[0] << 8) | digest[1]
+        low, high = int(self._fanout[prefix]), int(self._fanout[prefix + 1])
+        bucket = self._digests[low:high]
+        index = int(np.searchsorted(bucket, digest))
+        # Compare raw bytes: NumPy drops trailing NULs when it returns an "S" scalar
+        return index < bucket.size and bucket[index:index + 1].tobytes() == digest
+
+    def contains_hex(self, hexdigest):
+        """True if the hex digest (e.g. a stored sha3_hash_password value) is in the store."""
+        return self.contains_digest(bytes.fromhex(hexdigest))
+
+    def __contains__(self, password):
+        return self.contains_digest(digest_password(password, self.algorithm))
+
+    def contains_many(self, passwords):
+        """
+        Vectorized exact check of a batch of passwords.
+        :return: list of booleans in input order
+        """
+        queries = np.array([digest_password(p, self.algorithm) for p in passwords],
+                           dtype=f"S{self.digest_size}")
+        if not self.count or not queries.size:
+            return [False] * queries.size
+        index = np.minimum(np.searchsorted(self._digests, queries), self.count - 1)
+        return (self._digests[index] == queries).tolist()
+
+    def close(self):
+        self._fanout = self._digests = None
+        self._map.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_digest_store(store_file=BREACH_STORE_FILE):
+    """
+    Returns the shared DigestStore of `store_file`, or None if it has not been built.
+    """
+    key = os.path.abspath(store_file)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None and os.path.isfile(store_file):
+            store = _stores[key] = DigestStore(store_file)
+        return store
+
+
+def breach_status(password, filter_file=BREACH_FILTER_FILE, store_file=BREACH_STORE_FILE):
+    """
+    Combines both indexes: the Bloom filter answers definite misses, the
+    digest store (when built) confirms hits exactly.
+    :return: 'confirmed', 'probable' (filter hit, no store) or None
+    """
+    breach_filter = get_breach_filter(filter_file)
+    if breach_filter is not None and password not in breach_filter:
+        return None
+    store = get_digest_store(store_file)
+    if store is not None:
+        return "confirmed" if password in store else None
+    return "probable" if breach_filter is not None else None
+
+
+if __name__ == "__main__":
+    build_digest_store(algorithm=sys.argv[1] if len(sys.argv) > 1 else "sha1")
@@ -0,0 +1,237 @@
+# entropy_pool.py
+"""
+Keeps a buffer of quantum-random bits topped up on a background thread,
+so request handlers can draw seed bits without waiting on the simulator.
+
+The refill thread wakes up when the buffer drops below `low_watermark`
+and harvests blocks of QRNG bits until it reaches `high_watermark`.
+Each block is a single multi-shot run of the QRNG circuit on the
+configured simulator backend (qnn_backends.py).
+If a caller asks for more bits than are buffered, the missing bits are
+harvested synchronously and the request is counted as a pool miss.
+Bits are stored packed (8 per byte) and served as BitBuffers.
+"""
+
+import atexit
+import threading
+import time
+
+from bitbuffer import BitBuffer, as_bitbuffer
+from qnn_backends import get_backend
+
+# Back-off after a failed background harvest (seconds)
+REFILL_RETRY_SECONDS = 1.0
+
+
+class EntropyPool:
+    """
+    Thread-safe buffer of packed quantum-random bits.
+    Every bit handed out is removed from the buffer, so no two callers
+    ever receive the same bits.
+    """
+
+    def __init__(self, capacity_bits=65536, low_watermark=16384,
+                 high_watermark=None, block_bits=8192, harvest=None):
+        """
+        :param capacity_bits: maximum number of bits kept in the buffer
+        :param low_watermark: refill starts when fill drops below this
+        :param high_watermark: refill stops once fill reaches this (default: capacity)
+        :param block_bits: how many bits one harvest call produces
+        :param harvest: callable(num_bits) -> BitBuffer (or anything
+                        bitbuffer.as_bitbuffer accepts); defaults to the
+                        QRNG circuit on the default simulator backend
+        """
+        if high_watermark is None:
+            high_watermark = capacity_bits
+        if not 0 <= low_watermark <= high_watermark <= capacity_bits:
+            raise ValueError("Watermarks must satisfy 0 <= low <= high <= capacity.")
+        if block_bits < 8:
+            raise ValueError("block_bits must be at least 8.")
+
+        self.capacity_bits = capacity_bits
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.block_bits = block_bits
+        self._harvest = harvest or _harvest_block
+
+        # Packed bits; the first `_head` bits of _buffer[0] were already served.
+        # Harvested blocks are appended in whole bytes, so the tail stays aligned.
+        self._buffer = bytearray()
+        self._head = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+
+        # Counters exposed through stats()
+        self._requests = 0
+        self._misses = 0
+        self._bits_served = 0
+        self._bits_harvested = 0
+        self._blocks_harvested = 0
+        self._harvest_seconds = 0.0
+        self._refill_errors = 0
+        self._last_error = None
+
+    # ------------------------------
+    # Lifecycle of the refill thread
+    # ------------------------------
+    def start(self):
+        """Starts the background refill thread (no-op if already running)."""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._refill_loop, name="entropy-pool-refill", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stops the refill thread and waits for it to exit."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _refill_loop(self):
+        while True:
+            with self._lock:
+                # Blocks are stored in whole bytes, so less than a byte of room counts as full
+                while self._running and (self._fill() >= self.low_watermark
+                                         or self.capacity_bits - self._fill() < 8):
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+
+            # Harvest outside the lock so readers are never blocked by the simulator
+            while True:
+                with self._lock:
+                    if not self._running or self._fill() >= self.high_watermark:
+                        break
+                    room = self.capacity_bits - self._fill()
+                if room < 8:
+                    break
+                try:
+                    block = self._timed_harvest(min(self.block_bits, room) // 8 * 8)
+                except Exception as err:
+                    # Keep the thread alive; callers fall back to direct harvests
+                    with self._lock:
+                        self._refill_errors += 1
+                        self._last_error = str(err)
+                        if self._running:
+                            self._wakeup.wait(REFILL_RETRY_SECONDS)
+                    continue
+                with self._lock:
+                    room = self.capacity_bits - self._fill()
+                    usable = min(len(block), room) // 8 * 8
+                    self._buffer += block[:usable].to_bytes()
+
+    def _fill(self):
+        return len(self._buffer) * 8 - self._head
+
+    def _timed_harvest(self, num_bits):
+        start = time.perf_counter()
+        block = as_bitbuffer(self._harvest(num_bits))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._bits_harvested += len(block)
+            self._blocks_harvested += 1
+            self._harvest_seconds += elapsed
+        return block
+
+    # ------------------------------
+    # Serving bits
+    # ------------------------------
+    def get_bits(self, num_bits=64):
+        """
+        Removes `num_bits` bits from the pool and returns them.
+        :param num_bits: number of bits requested
+        :return: BitBuffer of length `num_bits`
+        """
+        if num_bits < 0:
+            raise ValueError("num_bits must be non-negative.")
+
+        with self._lock:
+            self._requests += 1
+            count = min(num_bits, self._fill())
+            end = self._head + count
+            taken = BitBuffer(bytes(self._buffer[:(end + 7) // 8]), count, self._head)
+            del self._buffer[:end // 8]
+            self._head = end % 8
+            missing = num_bits - count
+            if missing:
+                self._misses += 1
+            self._bits_served += num_bits
+            if self._fill() < self.low_watermark:
+                self._wakeup.notify()
+
+        if missing:
+            # Pool ran dry: pay for a synchronous harvest of just the shortfall
+            taken = taken + self._timed_harvest(missing)[:missing]
+        return taken
+
+    def stats(self):
+        """
+        Returns a snapshot of the pool counters, for sizing the pool
+        against the expected peak request rate.
+        """
+        with self._lock:
+            fill = self._fill()
+            rate = (self._bits_harvested / self._harvest_seconds
+                    if self._harvest_seconds > 0 else 0.0)
+            return {
+                "fill_bits": fill,
+                "capacity_bits": self.capacity_bits,
+                "fill_level": fill / self.capacity_bits if self.capacity_bits else 0.0,
+                "refill_rate_bps": rate,
+                "requests": self._requests,
+                "misses": self._misses,
+                "bits_served": self._bits_served,
+                "bits_harvested": self._bits_harvested,
+                "blocks_harvested": self._blocks_harvested,
+                "refill_errors": self._refill_errors,
+                "last_error": self._last_error,
+                "running": self._running,
+            }
+
+
+# ----------------------------------------
+# Shared pool used by the Flask apps/CLI
+# ----------------------------------------
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def _harvest_block(num_bits):
+    return get_backend().random_bits(num_bits)
+
+
+def get_default_pool():
+    """Returns the process-wide pool, starting its refill thread on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = EntropyPool()
+            _default_pool.start()
+            # Let an in-flight harvest finish before the interpreter tears down
+            atexit.register(_default_pool.stop)
+        return _default_pool
+
+
+def quantum_random_bitstring(num_bits=64):
+    """
+    Drop-in replacement for quantum_random.quantum_random_bitstring
+    that serves bits from the shared pool.
+    :param num_bits: number of bits to return
+    :return: BitBuffer of length `num_bits` (str() gives the '0'/'1' text)
+    """
+    return get_default_pool().get_bits(num_bits)
+
+
+def pool_stats():
+    """Returns stats() of the shared pool."""
+    return get_default_pool().stats()
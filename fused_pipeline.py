@@ -0,0 +1,89 @@
+# fused_pipeline.py
+"""
+Fused QRNG + QNN execution: one simulator invocation per request.
+
+Instead of one job for the 16-bit seed and another for the seeded QNN
+circuit, both stages run as ONE dynamic circuit (qnn_gates.fused_qnn_gates):
+every shot draws its own seed on an ancilla qubit and feeds it into the
+QNN through classically conditioned RX gates. Results are still split
+per stage, so callers can log the seeds and the QNN outcomes separately.
+
+On exact statevector backends the same joint distribution is produced
+without re-simulating per shot: the seed qubits are measured before they
+influence anything, so all seeds can be drawn in one call and every QNN
+outcome sampled from the cached distribution of its seed
+(see qnn_sampler.DistributionCache).
+"""
+
+import numpy as np
+
+from bitbuffer import BitBuffer, as_bitbuffer
+from qnn_backends import get_backend, AerBackend
+from qnn_sampler import seed_key, get_default_cache
+
+# Seed width used by the apps (4 bits per seeded qubit => 4 seeded qubits)
+SEED_BITS = 16
+
+
+def run_fused_qnn(num_qubits, shots=1, seed_bits=SEED_BITS, backend=None, seed_source=None):
+    """
+    Generates `shots` (seed, QNN outcome) pairs with a single simulator run.
+    Every shot draws its own seed, so one request samples up to `shots`
+    different distributions (the apps used to seed all shots of a request
+    with a single 16-bit seed).
+
+    :param num_qubits: QNN width
+    :param shots: number of pairs to produce
+    :param seed_bits: bits per seed
+    :param backend: backend name/instance (e.g. plan["backend"] from
+                    simulation_planner.plan_qnn_simulation(..., fused=True))
+    :param seed_source: optional callable(num_bits) -> BitBuffer used
+                        for the seeds on the exact path (e.g. the entropy pool)
+    :return: dict with per-stage outputs: seeds and outcomes (per-shot
+             BitBuffer views), bits (all outcomes in shot order),
+             backend, method, simulator_jobs
+    """
+    backend = get_backend(backend)
+    cache = get_default_cache()
+
+    if backend.exact and cache.supports(num_qubits):
+        # Stage 1: all seeds at once
+        draw = seed_source or backend.random_bits
+        seed_stream = as_bitbuffer(draw(seed_bits * shots))
+        seeds = [seed_stream[i*seed_bits:(i+1)*seed_bits] for i in range(shots)]
+
+        # Stage 2: one vectorized draw per distinct seed
+        groups = {}
+        for index, seed in enumerate(seeds):
+            groups.setdefault(seed_key(num_qubits, seed), []).append(index)
+        values = np.empty(shots, dtype=np.int64)
+        rng = np.random.default_rng()
+        for (_, seed), indices in groups.items():
+            values[indices] = cache.sample(num_qubits, seed, len(indices), rng, backend)
+        bits = BitBuffer.from_uints(values, num_qubits)
+
+        return {
+            "seeds": seeds,
+            "outcomes": [bits[i*num_qubits:(i+1)*num_qubits] for i in range(shots)],
+            "bits": bits,
+            "backend": backend.name,
+            "method": "statevector (cached distribution, seeds measured first)",
+            "simulator_jobs": 0 if seed_source else 1,
+        }
+
+    # One dynamic-circuit job on Aer; exact-only backends defer to Aer here
+    if not isinstance(backend, AerBackend):
+        backend = get_backend("aer")
+    from qnn_model import get_fused_circuit
+    memory = backend.run_memory(get_fused_circuit(num_qubits, seed_bits), shots)
+    stream = BitBuffer.from_bitstring("".join(memory))
+    width = seed_bits + num_qubits
+    outcomes = [stream[i*width + seed_bits:(i+1)*width] for i in range(shots)]
+    return {
+        "seeds": [stream[i*width:i*width + seed_bits] for i in range(shots)],
+        "outcomes": outcomes,
+        "bits": BitBuffer.concat(outcomes),
+        "backend": backend.name,
+        "method": f"fused dynamic circuit ({backend.method})",
+        "simulator_jobs": 1,
+    }
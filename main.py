@@ -2,45 +2,42 @@
 """
 Demonstrates a Quantum Neural Network approach to password generation
 using the modern Qiskit AerSimulator instead of the legacy 'execute' function.
-"""
 
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
+The simulator is qnn_backends.DEFAULT_BACKEND, the same default as the
+Flask apps: the lightweight NumPy statevector backend unless QNN_BACKEND=aer
+selects Qiskit Aer.
+"""
 
 # Local modules
-from quantum_random import quantum_random_bitstring
-from qnn_model import build_qnn_circuit
+from qnn_backends import DEFAULT_BACKEND, get_backend
+from qnn_sampler import harvest_qnn_bitstrings
 from password_generation import bits_to_password, sha3_hash_password
 from qkd_simulation import simulate_qkd
 from validation import validate_password_against_common_patterns
 
 
-def main():
-    # 1) Generate a quantum-random seed for the QNN
-    seed_bits = quantum_random_bitstring(num_bits=16)
-    print(f"[1] QRNG Seed bits: {seed_bits}")
+# Simulator backend: 'numpy' or 'aer' (Qiskit Aer), from the QNN_BACKEND env var
+QNN_BACKEND = DEFAULT_BACKEND
 
-    # 2) Build the QNN circuit with that seed (8 qubits for demonstration)
-    qnn_circuit = build_qnn_circuit(num_qubits=8, random_seed=seed_bits)
 
-    # 3) Copy the QNN circuit and add measurement to all qubits
-    measure_circuit = qnn_circuit.copy()
-    for i in range(8):
-        measure_circuit.measure(i, i)
+def main():
+    backend = get_backend(QNN_BACKEND)
 
-    # 4) Use the modern AerSimulator
-    simulator = AerSimulator()
-    job = simulator.run(measure_circuit, shots=1)
-    result = job.result()
+    # 1) Generate a quantum-random seed for the QNN
+    seed_bits = backend.random_bits(16)
+    print(f"[1] QRNG Seed bits: {seed_bits}")
 
-    # get_counts() expects the same circuit reference
-    counts = result.get_counts(measure_circuit)
-    measured_state = list(counts.keys())[0]  # e.g. "01010111"
+    # 2) Build the QNN circuit with that seed (8 qubits for demonstration),
+    # 3) measure all qubits and
+    # 4) sample its cached exact output distribution, keeping every shot
+    #    (12 chars * 7 bits = 84 bits = 11 shots of 8 qubits)
+    shot_bits = harvest_qnn_bitstrings(8, seed_bits, shots=11, backend=backend)
+    measured_state = "".join(shot_bits)
 
-    print(f"[2] Measured Qubit State: {measured_state}")
+    print(f"[2] Measured Qubit States: {measured_state}")
 
     # 5) Convert measured bits -> password (length 12 by default)
-    password = bits_to_password(measured_state, password_length=12)
+    password = bits_to_password(measured_state, length=12, more_bits=backend.random_bits)
     print(f"[3] Raw QNN Password: {password}")
 
     # 6) Optional: apply SHA-3 hashing
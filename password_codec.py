@@ -0,0 +1,65 @@
+# password_codec.py
+"""
+Lookup-table codec between passwords and qubit bit rows (used by xyz.py).
+
+Every character of PASSWORD_CHARS is a 7-bit big-endian code, its index
+in the charset. 6 bits cannot hold the 72 symbols, so the codec uses 7:
+no two characters share a code, and a 12-character password becomes an
+84-bit row. Codes 72..127 are not characters. Padding uses PAD_CODE,
+and decoding drops any such code instead of folding it onto a character.
+
+Both directions are one NumPy pass over the whole batch (table lookups,
+shifts and a matrix product), not a Python loop per character.
+"""
+
+import numpy as np
+
+PASSWORD_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()"
+
+CODE_BITS = 7
+INVALID_CODE = 255
+PAD_CODE = (1 << CODE_BITS) - 1
+ENCODE_TABLE = np.full(256, INVALID_CODE, dtype=np.uint8)  # byte -> code
+ENCODE_TABLE[np.frombuffer(PASSWORD_CHARS.encode("ascii"), dtype=np.uint8)] = np.arange(len(PASSWORD_CHARS))
+DECODE_TABLE = np.zeros(1 << CODE_BITS, dtype=np.uint8)  # code -> byte (0: no character)
+DECODE_TABLE[:len(PASSWORD_CHARS)] = np.frombuffer(PASSWORD_CHARS.encode("ascii"), dtype=np.uint8)
+CODE_SHIFTS = np.arange(CODE_BITS - 1, -1, -1, dtype=np.uint8)
+
+
+def encode_passwords(passwords, length):
+    """
+    Encodes passwords of at most `length` characters.
+    :return: uint8 0/1 matrix of shape (len(passwords), length * CODE_BITS);
+             shorter passwords are padded with PAD_CODE
+    """
+    chars = np.array(passwords, dtype=f"S{length}").view(np.uint8).reshape(len(passwords), length)
+    codes = ENCODE_TABLE[chars]
+    padding = chars == 0
+    if np.any((codes == INVALID_CODE) & ~padding):
+        raise ValueError("Password contains characters outside the charset.")
+    codes[padding] = PAD_CODE
+    return ((codes[:, :, np.newaxis] >> CODE_SHIFTS) & 1).reshape(len(passwords), length * CODE_BITS)
+
+
+def decode_measurements(measurements):
+    """
+    Decodes measured bit rows back into passwords.
+    :param measurements: '0'/'1' strings of equal length, or a 0/1 matrix.
+                         A shorter last chunk still becomes a character
+    :return: list of str; codes outside the charset are dropped
+    """
+    if not isinstance(measurements, np.ndarray):
+        text = np.asarray(measurements, dtype=str)
+        width = text.dtype.itemsize // 4
+        measurements = (text.view(np.uint32).reshape(len(text), width) - ord("0")).astype(np.uint8)
+    rows, width = measurements.shape
+    full, tail = divmod(width, CODE_BITS)
+    weights = np.left_shift(1, CODE_SHIFTS).astype(np.int64)
+    codes = measurements[:, :full * CODE_BITS].reshape(rows, full, CODE_BITS) @ weights
+    if tail:
+        codes = np.column_stack([codes, measurements[:, full * CODE_BITS:] @ weights[-tail:]])
+    chars = DECODE_TABLE[codes]
+    # Move the dropped codes (byte 0) behind the characters; S strings end at them
+    order = np.argsort(chars == 0, axis=1, kind="stable")
+    chars = np.ascontiguousarray(np.take_along_axis(chars, order, axis=1))
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str).tolist()
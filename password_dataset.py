@@ -0,0 +1,304 @@
+# password_dataset.py
+"""
+Compact, indexed binary format for the password corpora.
+
+The training and analysis scripts used to re-parse the raw text dumps on
+every run. `build_password_dataset` converts a dump once into a
+de-duplicated file with the passwords grouped by length (in characters):
+
+  header (64 bytes) | per length: UTF-8 data | offsets | counts | length table
+
+Inside a bucket the passwords are sorted; `offsets` (count + 1 uint64)
+delimit each password's bytes and `counts` (uint64) keep how often it
+occurred, so frequency-based code loses nothing. The length table at the
+end of the file locates every bucket.
+
+`PasswordDataset` mmaps the file: iteration decodes straight from the
+mapping, `of_length(L)` is an O(1) view of all passwords of length L
+(binary-searchable, and an (n, L) uint8 matrix for ASCII-only buckets),
+and nothing is parsed up front. `open_password_dataset` finds the binary
+copy next to a text dump (same name, DATASET_SUFFIX) when it is up to date.
+The copy does not keep file order, so it is only used where order does not
+matter: counting and membership code passes compiled=True
+(load_passwords_from_txt / iter_passwords_from_txt in pattern_finder.py),
+xyz.py samples its length-12 bucket by popularity, and the training
+pipeline shuffles what it reads.
+
+Usage:
+  python password_dataset.py [dump.txt ...]
+"""
+
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+
+import numpy as np
+
+from pattern_finder import DATASET_FILES, SPILL_ITEMS, iter_passwords_from_txt, merge_count_runs, reduce_count_runs
+
+DATASET_SUFFIX = ".qpw"
+
+_MAGIC = b"QPPWSET1"
+_HEADER = struct.Struct("<8sIQQQQq")  # magic, lengths, unique, total, table offset, source size, source mtime_ns
+_HEADER_BYTES = 64
+_U64 = struct.Struct("<Q")
+_TABLE_DTYPE = np.dtype([("length", "<u8"), ("count", "<u8"), ("data", "<u8"),
+                         ("offsets", "<u8"), ("counts", "<u8")])
+
+
+def compiled_path(path):
+    """Binary dataset path belonging to a text dump (rockyou.txt -> rockyou.qpw)."""
+    return os.path.splitext(path)[0] + DATASET_SUFFIX
+
+
+def _length_order(entry):
+    # Buckets by length, passwords sorted inside each bucket
+    return len(entry[0]), entry[0]
+
+
+def _sorted_counts(source, run_dir, spill_items):
+    """Distinct passwords of the text dump with their counts, in _length_order."""
+    counts, runs = {}, []
+
+    def spill():
+        path = os.path.join(run_dir, f"run{len(runs):05d}.tsv")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            for password, count in sorted(counts.items(), key=_length_order):
+                f.write(f"{password}\t{count}\n")
+        runs.append(path)
+        counts.clear()
+
+    for password in iter_passwords_from_txt(source, compiled=False):
+        counts[password] = counts.get(password, 0) + 1
+        if len(counts) >= spill_items:
+            spill()
+    if not runs:
+        return sorted(counts.items(), key=_length_order)
+    if counts:
+        spill()
+    return merge_count_runs(reduce_count_runs(runs, run_dir, _length_order), key=_length_order)
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % 8))
+
+
+def build_password_dataset(source, output_file=None, spill_items=SPILL_ITEMS):
+    """
+    Converts one text dump into the binary format (bounded memory: partial
+    counts spill to sorted runs that are merged while writing).
+    :param output_file: destination (default: compiled_path(source))
+    :return: dict with output_file, unique, total and lengths
+    """
+    if not os.path.isfile(source):
+        print(f"[WARNING] File not found: {source}")
+        return None
+    output_file = output_file or compiled_path(source)
+    stat = os.stat(source)
+    table = []
+    unique = total = 0
+
+    with tempfile.TemporaryDirectory() as run_dir, \
+            open(output_file + ".tmp", "wb") as out, \
+            open(os.path.join(run_dir, "offsets.bin"), "w+b") as offsets_file, \
+            open(os.path.join(run_dir, "counts.bin"), "w+b") as counts_file:
+
+        def finish_bucket(length, count, data_start, data_bytes):
+            # offsets and counts follow the bucket's data
+            offsets_file.write(_U64.pack(data_bytes))
+            _pad(out)
+            offsets_start = out.tell()
+            for scratch in (offsets_file, counts_file):
+                scratch.seek(0)
+                shutil.copyfileobj(scratch, out)
+                scratch.seek(0)
+                scratch.truncate()
+            table.append((length, count, data_start, offsets_start, offsets_start + (count + 1) * 8))
+
+        out.write(b"\0" * _HEADER_BYTES)
+        length = count = data_start = data_bytes = None
+        for password, occurrences in _sorted_counts(source, run_dir, spill_items):
+            if len(password) != length:
+                if length is not None:
+                    finish_bucket(length, count, data_start, data_bytes)
+                _pad(out)
+                length, count, data_start, data_bytes = len(password), 0, out.tell(), 0
+            encoded = password.encode("utf-8")
+            out.write(encoded)
+            offsets_file.write(_U64.pack(data_bytes))
+            counts_file.write(_U64.pack(occurrences))
+            data_bytes += len(encoded)
+            count += 1
+            unique += 1
+            total += occurrences
+        if length is not None:
+            finish_bucket(length, count, data_start, data_bytes)
+
+        _pad(out)
+        table_offset = out.tell()
+        out.write(np.array(table, dtype=_TABLE_DTYPE).tobytes())
+        out.seek(0)
+        out.write(_HEADER.pack(_MAGIC, len(table), unique, total, table_offset,
+                               stat.st_size, stat.st_mtime_ns))
+    os.replace(output_file + ".tmp", output_file)
+
+    print(f"[INFO] Wrote {unique} unique passwords ({total} lines, {len(table)} lengths) to '{output_file}'.")
+    return {"output_file": output_file, "unique": unique, "total": total,
+            "lengths": [entry[0] for entry in table]}
+
+
+class PasswordBucket:
+    """
+    All passwords of one length: a sorted, read-only sequence of str
+    backed by the mapping of a PasswordDataset.
+    """
+
+    def __init__(self, mapping, length, count, data, offsets, counts):
+        self.length = length
+        self._data = memoryview(mapping)[data:offsets]
+        self._offsets = np.frombuffer(mapping, dtype="<u8", count=count + 1, offset=offsets)
+        self.counts = np.frombuffer(mapping, dtype="<u8", count=count, offset=counts)
+
+    def __len__(self):
+        return self.counts.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("password index out of range")
+        start, end = self._offsets[index:index + 2].tolist()
+        return str(self._data[start:end], "utf-8")
+
+    def __iter__(self):
+        data = self._data
+        offsets = self._offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield str(data[start:end], "utf-8")
+
+    def __contains__(self, password):
+        index = bisect.bisect_left(self, password)
+        return index < len(self) and self[index] == password
+
+    def byte_matrix(self):
+        """
+        Zero-copy (count, length) uint8 view of an ASCII-only bucket
+        (every password one byte per character), else None.
+        """
+        if int(self._offsets[-1]) != len(self) * self.length:
+            return None
+        size = len(self) * self.length
+        return np.frombuffer(self._data[:size], dtype=np.uint8).reshape(len(self), self.length)
+
+
+class PasswordDataset:
+    """
+    Read-only, memory-mapped view of a binary password dataset.
+    Iterates over distinct passwords, shortest first.
+    """
+
+    def __init__(self, dataset_file):
+        with open(dataset_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, num_lengths, self.unique, self.total, table_offset,
+         self.source_size, self.source_mtime_ns) = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a password dataset file: {dataset_file}")
+        self.dataset_file = dataset_file
+        table = np.frombuffer(self._map, dtype=_TABLE_DTYPE, count=num_lengths, offset=table_offset)
+        self._buckets = {int(entry["length"]): PasswordBucket(self._map, *(int(v) for v in entry))
+                         for entry in table}
+
+    def __len__(self):
+        return self.unique
+
+    def lengths(self):
+        """Password lengths present, ascending."""
+        return sorted(self._buckets)
+
+    def of_length(self, length):
+        """All distinct passwords of `length` characters (empty bucket if none)."""
+        bucket = self._buckets.get(length)
+        if bucket is None:
+            return []
+        return bucket
+
+    def _sorted_buckets(self):
+        # Taken up front, so iterators started before close() run to the end
+        return [self._buckets[length] for length in self.lengths()]
+
+    def __iter__(self):
+        for bucket in self._sorted_buckets():
+            yield from bucket
+
+    def iter_counts(self):
+        """Yields (password, occurrences) for every distinct password."""
+        for bucket in self._sorted_buckets():
+            yield from zip(bucket, bucket.counts.tolist())
+
+    def iter_occurrences(self):
+        """Yields every password as often as it occurred in the source dump."""
+        for password, count in self.iter_counts():
+            for _ in range(count):
+                yield password
+
+    def __contains__(self, password):
+        return password in self.of_length(len(password))
+
+    def is_current(self, source):
+        """True if this file was built from the current version of `source`."""
+        stat = os.stat(source)
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns
+
+    def close(self):
+        """
+        Drops the buckets and unmaps the file. Buckets (or iterators) still
+        held elsewhere keep the mapping alive until they are released.
+        """
+        self._buckets = {}
+        try:
+            self._map.close()
+        except BufferError:
+            pass
+
+
+# abspath -> (mtime_ns, PasswordDataset); a rebuilt file replaces (and closes) its entry
+_datasets = {}
+_datasets_lock = threading.Lock()
+
+
+def open_password_dataset(path):
+    """
+    Returns the shared PasswordDataset for `path` - a binary dataset file,
+    or a text dump whose binary copy is up to date (a copy without its
+    text dump is used as is) - or None.
+    """
+    dataset_file = path if path.endswith(DATASET_SUFFIX) else compiled_path(path)
+    if not os.path.isfile(dataset_file):
+        return None
+    key, mtime_ns = os.path.abspath(dataset_file), os.stat(dataset_file).st_mtime_ns
+    with _datasets_lock:
+        cached = _datasets.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            dataset = cached[1]
+        else:
+            dataset = PasswordDataset(dataset_file)
+            _datasets[key] = (mtime_ns, dataset)
+            if cached is not None:
+                cached[1].close()
+    if dataset_file != path and os.path.isfile(path) and not dataset.is_current(path):
+        return None
+    return dataset
+
+
+if __name__ == "__main__":
+    for dump in sys.argv[1:] or DATASET_FILES:
+        build_password_dataset(dump)
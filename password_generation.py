@@ -2,34 +2,172 @@
 """
 Converts the measured qubits into a password, 
 plus optional SHA-3 hashing for additional security.
+
+The conversion engine (generate_passwords) is vectorized with NumPy and
+bias-free: every symbol index is read from the smallest number of bits
+that can address the symbol set, values outside the set are rejected
+(never folded back with %), and no input bit is ever used twice.
 """
 
 import hashlib
 
+import numpy as np
+
+from bitbuffer import as_bitbuffer
+
+DEFAULT_SYMBOLS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()-_=+"
+
+# Widest symbol index the engine reads (symbol sets up to 65536 characters)
+MAX_SYMBOL_BITS = 16
+
 
-def bits_to_password(bitstring, length=12, symbols="abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()-_=+"):
+def symbol_bit_width(num_symbols):
+    """Minimal number of bits that can address `num_symbols` symbols."""
+    if num_symbols < 1:
+        raise ValueError("The symbol set must not be empty.")
+    return max(1, (num_symbols - 1).bit_length())
+
+
+def _read_symbols(bits, width, num_symbols):
     """
-    Convert a bitstring to a password of 'length' characters,
-    using the given 'symbols' set. 
-    Here we show a 7-bit approach as an example.
+    Splits a BitBuffer into consecutive `width`-bit big-endian values and
+    keeps those below `num_symbols` (rejection sampling).
+    """
+    packed = bits.packed()
+    count = len(bits) // width
+    if count == 0:
+        return np.empty(0, dtype=np.uint16)
+    # Every `width` bytes hold exactly 8 values at fixed bit offsets, so the
+    # stream is cut into rows of `width` bytes, stored column-wise, and each
+    # of the 8 values is a few operations on contiguous columns. A value
+    # spans at most `span` bytes, read as one big-endian window.
+    span = 2 if width <= 8 else 3
+    window_dtype = np.uint16 if span == 2 else np.uint32
+    rows = -(-packed.size // width)
+    flat = np.zeros(rows * width, dtype=np.uint8)
+    flat[:packed.size] = packed
+    columns = np.zeros((width + span - 1, rows), dtype=window_dtype)
+    columns[:width] = flat.reshape(rows, width).T
+
+    values = np.empty((8, rows), dtype=np.uint8 if span == 2 else np.uint16)
+    window = np.empty(rows, dtype=window_dtype)
+    for j in range(8):
+        byte, offset = divmod(j * width, 8)
+        np.copyto(window, columns[byte])
+        for k in range(1, span):
+            window <<= 8
+            window |= columns[byte + k]
+        window >>= 8 * span - width - offset
+        window &= (1 << width) - 1
+        values[j] = window
+    values = values.T.ravel()[:count]
+    if num_symbols == 1 << width:
+        return values
+    return values[values < num_symbols]
+
+
+def generate_passwords(count, length=12, symbols=DEFAULT_SYMBOLS, bits=None, more_bits=None):
+    """
+    Generates `count` passwords of `length` characters in one vectorized pass.
+
+    :param count: number of passwords
+    :param length: characters per password
+    :param symbols: symbol set (no duplicates, or some symbols would be favoured)
+    :param bits: random input: BitBuffer, packed bytes, uint8/bool array
+                 or '0'/'1' string (see bitbuffer.as_bitbuffer)
+    :param more_bits: optional callable(num_bits) -> bits in any of those forms,
+                      called whenever `bits` runs out after rejections
+    :return: 2-D array of shape (count, length) with one character per cell
+             (see passwords_to_strings)
+    """
+    if len(set(symbols)) != len(symbols):
+        raise ValueError("The symbol set must not contain duplicate characters.")
+    width = symbol_bit_width(len(symbols))
+    if width > MAX_SYMBOL_BITS:
+        raise ValueError(f"At most {2 ** MAX_SYMBOL_BITS} symbols are supported.")
+
+    needed = count * length
+    chunks, have = [], 0
+    if bits is not None:
+        chunk = _read_symbols(as_bitbuffer(bits), width, len(symbols))
+        chunks.append(chunk)
+        have += chunk.size
+
+    acceptance = len(symbols) / (1 << width)  # always > 1/2
+    while have < needed:
+        if more_bits is None:
+            raise ValueError(f"Not enough random bits for {count} x {length} characters.")
+        # Expected bits for the shortfall, plus a margin so one call usually suffices
+        request = int((needed - have) / acceptance * 1.1 + 16) * width
+        chunk = _read_symbols(as_bitbuffer(more_bits(request)), width, len(symbols))
+        chunks.append(chunk)
+        have += chunk.size
+
+    indices = np.concatenate(chunks)[:needed] if chunks else np.empty(0, dtype=np.uint16)
+    table = np.array(list(symbols), dtype="U1")
+    return table[indices].reshape(count, length)
+
+
+def passwords_to_strings(passwords):
+    """
+    Converts the 2-D character array of generate_passwords into a list of str.
+    """
+    count, length = passwords.shape
+    if length == 0:
+        return [""] * count
+    return np.ascontiguousarray(passwords).view(f"U{length}").ravel().tolist()
+
+
+def batch_bit_budget(count, length, symbols=DEFAULT_SYMBOLS):
+    """
+    Bits iter_password_batches requests for one batch of `count` passwords:
+    the expected need after rejections plus a 5% margin.
+    """
+    width = symbol_bit_width(len(symbols))
+    acceptance = len(symbols) / (1 << width)
+    return int(count * length / acceptance * 1.05 + 1) * width
+
+
+def _pool_bits(num_bits):
+    from entropy_pool import quantum_random_bitstring
+    return quantum_random_bitstring(num_bits)
+
+
+def iter_password_batches(count, length=12, symbols=DEFAULT_SYMBOLS, bit_source=None,
+                          batch_size=256, more_bits=None):
     """
-    needed_bits = length * 7
-    # If bitstring too short, repeat or pad
-    if len(bitstring) < needed_bits:
-        repeats = needed_bits // len(bitstring) + 1
-        bitstring = bitstring * repeats
+    Generates `count` passwords in batches, for streaming large requests.
+    Each batch is one bit_source call (batch_bit_budget bits) and one
+    generate_passwords pass.
 
-    bitstring = bitstring[:needed_bits]
-    
-    num_symbols = len(symbols)
-    chars = []
-    for i in range(length):
-        chunk = bitstring[i*7:(i+1)*7]  # chunk of 7 bits
-        val = int(chunk, 2)  # integer from 0..127
-        val %= num_symbols   # map into symbols range
-        chars.append(symbols[val])
+    :param bit_source: callable(num_bits) -> bits for a whole batch
+                       (default: the shared entropy pool)
+    :param batch_size: passwords per batch
+    :param more_bits: top-up source when a batch runs short (default: entropy pool)
+    :return: iterator of lists of str, batch_size passwords each (the last may be shorter)
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    bit_source = bit_source or _pool_bits
+    more_bits = more_bits or _pool_bits
+    for start in range(0, count, batch_size):
+        size = min(batch_size, count - start)
+        bits = bit_source(batch_bit_budget(size, length, symbols))
+        yield passwords_to_strings(generate_passwords(size, length, symbols, bits=bits, more_bits=more_bits))
 
-    return "".join(chars)
+
+def bits_to_password(bitstring, length=12, symbols=DEFAULT_SYMBOLS, more_bits=None):
+    """
+    Convert a bitstring to a password of 'length' characters,
+    using the given 'symbols' set.
+    Each character consumes the minimal number of bits for the symbol set
+    (e.g. 7 bits for the 76 default symbols); out-of-range values are
+    rejected instead of reduced modulo the set size, so every symbol is
+    equally likely. If the bitstring runs out, fresh bits are drawn from
+    `more_bits` (default: the shared entropy pool) instead of repeating it.
+    """
+    passwords = generate_passwords(1, length, symbols, bits=bitstring, more_bits=more_bits or _pool_bits)
+    return passwords_to_strings(passwords)[0]
 
 
 
@@ -40,4 +178,3 @@ def sha3_hash_password(password: str):
     """
     hash_obj = hashlib.sha3_256(password.encode('utf-8'))
     return hash_obj.hexdigest()
-
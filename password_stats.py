@@ -0,0 +1,256 @@
+# password_stats.py
+"""
+Incrementally maintained summary statistics of the stored passwords.
+
+Aggregating passwords3 on demand means a full table scan (and the table
+only holds hashes, so lengths and charsets cannot be recovered from it).
+Instead every insert_password() call derives the password's buckets
+(password_buckets) and hands them to the write-behind writer with the
+row; once the row is committed, the writer's on_written callback adds
+them to in-process counters, so dropped rows are never counted:
+
+  - total, per user and per (UTC) day
+  - password length and charset-class distributions
+  - classical/quantum entropy histograms (entropy_utils), ENTROPY_BUCKET_BITS wide
+  - QKD shared-key lengths
+
+All of them are (metric, bucket) -> count. Reading them never touches
+passwords3: snapshot() costs O(number of buckets), count() is O(1).
+Deltas since the last flush are added to the `password_stats` summary
+table on a background thread (one insert-or-add executemany per flush),
+and load() seeds the counters from that table when the app starts.
+"""
+
+import atexit
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+
+from entropy_utils import calculate_classical_entropy, calculate_quantum_entropy
+
+STATS_TABLE = "password_stats"
+FLUSH_SECONDS = 5.0
+ENTROPY_BUCKET_BITS = 16
+TOP_USERS = 20
+
+# Character classes, in the order used for charset bucket names
+CHAR_CLASSES = (
+    ("lower", str.islower),
+    ("upper", str.isupper),
+    ("digit", str.isdigit),
+)
+
+
+def charset_bucket(password):
+    """Names the character classes used by `password`, e.g. 'lower+digit'."""
+    used = [name for name, test in CHAR_CLASSES if any(test(ch) for ch in password)]
+    if any(not ch.isalnum() for ch in password):
+        used.append("symbol")
+    return "+".join(used) or "empty"
+
+
+def entropy_bucket(bits):
+    """Lower edge of the histogram bucket holding `bits`."""
+    return str(int(bits // ENTROPY_BUCKET_BITS) * ENTROPY_BUCKET_BITS)
+
+
+def password_buckets(user_id, password, char_space, shared_key=None, at=None):
+    """
+    (metric, bucket) pairs one stored password counts towards; the
+    plaintext itself is not kept.
+    :param user_id: owner of the password
+    :param char_space: size of the symbol set it was drawn from
+    :param shared_key: QKD shared key (anything with len()), if any
+    :param at: insert time (default: now)
+    """
+    length = len(password)
+    updates = [
+        ("total", ""),
+        ("user", str(user_id)),
+        ("day", time.strftime("%Y-%m-%d", time.gmtime(at))),
+        ("length", str(length)),
+        ("charset", charset_bucket(password)),
+        ("classical_entropy", entropy_bucket(calculate_classical_entropy(length, char_space))),
+        ("quantum_entropy", entropy_bucket(calculate_quantum_entropy(length, char_space))),
+    ]
+    if shared_key is not None:
+        updates.append(("qkd_key_length", str(len(shared_key))))
+    return updates
+
+
+class PasswordStats:
+    """
+    Thread-safe (metric, bucket) counters, optionally persisted through a
+    persistence.ConnectionPool.
+    """
+
+    def __init__(self, pool=None, table=STATS_TABLE, flush_seconds=FLUSH_SECONDS):
+        """
+        :param pool: ConnectionPool of the summary table (None: memory only)
+        :param table: summary table with (metric, bucket, count) columns
+        :param flush_seconds: how often pending deltas are written
+        """
+        self.pool = pool
+        self.table = table
+        self.flush_seconds = flush_seconds
+        self._counts = defaultdict(Counter)
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+        self._flushes = 0
+        self._last_error = None
+
+    # ------------------------------
+    # Updates
+    # ------------------------------
+    def record(self, user_id, password, char_space, shared_key=None, at=None):
+        """Counts one stored password (arguments as in password_buckets)."""
+        self.add_written([password_buckets(user_id, password, char_space, shared_key, at)])
+
+    def add_written(self, bucket_lists):
+        """
+        Counts committed rows: one password_buckets list per row, None for
+        rows without statistics. Use as WriteBehindWriter(on_written=...).
+        """
+        with self._lock:
+            for updates in bucket_lists:
+                for metric, bucket in updates or ():
+                    self._counts[metric][bucket] += 1
+                    self._pending[metric, bucket] += 1
+
+    # ------------------------------
+    # Reads (never scan passwords3)
+    # ------------------------------
+    def count(self, metric, bucket=""):
+        """Current count of one bucket."""
+        with self._lock:
+            return self._counts[metric][str(bucket)]
+
+    def snapshot(self, top_users=TOP_USERS):
+        """
+        All aggregates as plain dicts, for /admin/stats.
+        :param top_users: how many of the most active users to list
+        """
+        with self._lock:
+            counts = {metric: dict(buckets) for metric, buckets in self._counts.items()}
+            pending = len(self._pending)
+            flushes, last_error = self._flushes, self._last_error
+
+        users = counts.get("user", {})
+        key_lengths = {int(k): v for k, v in counts.get("qkd_key_length", {}).items()}
+        keys = sum(key_lengths.values())
+        return {
+            "total": counts.get("total", {}).get("", 0),
+            "per_day": counts.get("day", {}),
+            "users": len(users),
+            "top_users": heapq.nlargest(top_users, users.items(), key=lambda item: item[1]),
+            "length": counts.get("length", {}),
+            "charset": counts.get("charset", {}),
+            "entropy_bucket_bits": ENTROPY_BUCKET_BITS,
+            "classical_entropy": counts.get("classical_entropy", {}),
+            "quantum_entropy": counts.get("quantum_entropy", {}),
+            "qkd_key_length": {
+                "count": keys,
+                "min": min(key_lengths, default=None),
+                "max": max(key_lengths, default=None),
+                "mean": sum(k * v for k, v in key_lengths.items()) / keys if keys else None,
+                "histogram": counts.get("qkd_key_length", {}),
+            },
+            "pending_buckets": pending,
+            "flushes": flushes,
+            "last_error": last_error,
+        }
+
+    # ------------------------------
+    # Summary table
+    # ------------------------------
+    def load(self):
+        """Replaces the in-memory counters with the summary table (O(buckets))."""
+        if self.pool is None:
+            return
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SELECT metric, bucket, count FROM {self.table}")
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        with self._lock:
+            self._counts = defaultdict(Counter)
+            for metric, bucket, count in rows:
+                self._counts[metric][bucket] = count
+            # Deltas recorded before the load are not in the table yet
+            for (metric, bucket), delta in self._pending.items():
+                self._counts[metric][bucket] += delta
+
+    def flush(self):
+        """Adds the pending deltas to the summary table; returns False on error."""
+        if self.pool is None:
+            return True
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return True
+        rows = [(metric, bucket, delta) for (metric, bucket), delta in pending.items()]
+        query = self.pool.backend.increment_query(self.table, ("metric", "bucket"), "count")
+        try:
+            with self.pool.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.executemany(query, rows)
+                    conn.commit()
+                finally:
+                    cursor.close()
+        except Exception as err:
+            # Keep the deltas for the next flush
+            with self._lock:
+                self._pending.update(pending)
+                self._last_error = str(err)
+            print(f"Error: {err} (password stats not flushed)")
+            return False
+        with self._lock:
+            self._flushes += 1
+        return True
+
+    def start(self):
+        """Starts the background flush thread (no-op if already running)."""
+        with self._lock:
+            if self._running or self.pool is None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._flush_loop, name="password-stats-flush", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout=None):
+        """Stops the flush thread and writes what is still pending."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                self._wakeup.wait(self.flush_seconds)
+                if not self._running:
+                    return
+            self.flush()
+
+
+def create_stats(pool, **options):
+    """PasswordStats loaded from the summary table, flushed in the background and at exit."""
+    stats = PasswordStats(pool, **options)
+    try:
+        stats.load()
+    except Exception as err:
+        # Start from zero rather than failing the app; deltas still accumulate
+        print(f"[WARNING] Could not load password stats: {err}")
+    stats.start()
+    atexit.register(stats.close)
+    return stats
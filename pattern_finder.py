@@ -1,4 +1,4 @@
-# pattern_generator.py
+# pattern_finder.py
 """
 Generates a file named 'common_patterns.txt' by analyzing three text files
 stored in a 'datasets' folder:
@@ -10,55 +10,414 @@ Assumptions:
   - Each file has one password per line.
   - The 'datasets' folder is in the same directory as this script, or adjust paths accordingly.
 
-Steps:
-  1) Load lines from each .txt file in 'datasets/'.
+Default mode (exact, in memory):
+  1) Load lines from each .txt file in 'datasets/' (or its up-to-date
+     binary copy, see password_dataset.py).
   2) Combine all lines into one large list.
   3) Count frequency of each password using collections.Counter.
   4) Sort them by frequency (descending).
   5) Take the top N (default 500) and write them to 'common_patterns.txt'.
 
 Usage:
-  python pattern_generator.py
+  python pattern_finder.py [--top N] [--streaming [--capacity K] | --parallel [--workers W]]
+  python pattern_finder.py [--top N] --ingest DUMP [DUMP ...] [--store DIR]
 
-Adjust the 'TOP_N' constant at the bottom if you need more/fewer patterns.
+Adjust the 'TOP_N' constant at the top if you need more/fewer patterns.
+
+Streaming top-N mode (--streaming, stream_common_patterns) never holds the
+datasets in memory: lines are read one at a time into a Space-Saving
+heavy-hitter sketch with a fixed number of counters (default
+STREAM_CAPACITY_FACTOR per requested pattern), so memory stays bounded for
+HIBP-size inputs. Counts are then estimates that over-count by at most
+(lines / capacity); the error bounds are reported with the result, next to
+the peak RSS.
+
+Sharded map-reduce mode (--parallel, parallel_common_patterns) is exact and
+scales with cores on corpora larger than RAM. Map: every dataset is split
+into CHUNK_BYTES byte-range chunks counted by a multiprocessing pool; each
+worker hash-partitions passwords into NUM_SHARDS shards and spills partial
+counts to sorted run files whenever it holds SPILL_ITEMS distinct
+passwords. Reduce: each shard's runs are k-way merged (at most
+MERGE_FAN_IN at a time, shards in parallel) into exact counts, and the
+shard top-N lists are combined.
+
+Incremental mode (--ingest) adds new breach dumps to the persistent
+frequency store in pattern_store.py and rewrites the output from its
+maintained top list, so only the new dump is read.
 """
 
-import os
+import argparse
 import collections
+import heapq
+import multiprocessing
+import os
+import sys
+import tempfile
+import zlib
 
 # Adjust these paths if needed
 ROCKYOU_FILE = os.path.join("datasets", "rockyou_dataset.txt")
 HIBP_FILE = os.path.join("datasets", "hibp_dataset.txt")
 CRACKSTATION_FILE = os.path.join("datasets", "crackstation_dataset.txt")
+DATASET_FILES = (ROCKYOU_FILE, HIBP_FILE, CRACKSTATION_FILE)
 OUTPUT_FILE = "common_patterns.txt"
+TOP_N = 500
 
-def load_passwords_from_txt(filepath):
+# Default sketch size in streaming mode: counters per requested pattern
+STREAM_CAPACITY_FACTOR = 20
+
+# Parallel mode: bytes per map task, hash shards, distinct passwords a map
+# task keeps in memory before spilling, and maximum runs merged at once
+CHUNK_BYTES = 64 * 1024 * 1024
+NUM_SHARDS = 64
+SPILL_ITEMS = 1_000_000
+MERGE_FAN_IN = 256
+
+def iter_passwords_from_txt(filepath, compiled=False):
     """
-    Reads a text file line by line, stripping whitespace.
-    Returns a list of passwords (strings).
+    Streams a text file line by line, stripping whitespace and skipping
+    empty lines, without holding the file in memory.
+    :param compiled: read an up-to-date binary copy (password_dataset.py)
+                     instead, if one exists. Every password still occurs as
+                     often as in the text, but grouped in (length, password)
+                     order, so only counting/membership callers opt in
+    Yields passwords (strings).
     """
-    passwords = []
+    if compiled:
+        from password_dataset import open_password_dataset
+        dataset = open_password_dataset(filepath)
+        if dataset is not None:
+            yield from dataset.iter_occurrences()
+            return
+
     if not os.path.isfile(filepath):
         print(f"[WARNING] File not found: {filepath}")
-        return passwords
+        return
 
     with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
         for line in f:
             line = line.strip()
             if line:
-                passwords.append(line)
-    return passwords
+                yield line
+
+
+def load_passwords_from_txt(filepath, compiled=False):
+    """
+    Reads a text file line by line, stripping whitespace.
+    :param compiled: see iter_passwords_from_txt (same passwords, not in file order)
+    Returns a list of passwords (strings).
+    """
+    return list(iter_passwords_from_txt(filepath, compiled))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter sketch with `capacity` counters.
+    When all counters are taken, a new item replaces the item with the
+    smallest count and inherits that count as its error. Every estimate
+    over-counts the true frequency by at most its error, and every error
+    is at most total / capacity.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1.")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}  # item -> [count, error]
+        self._heap = []    # one (count, item) per tracked item; counts may be stale (too low)
+
+    def add(self, item):
+        self.total += 1
+        entry = self._counts.get(item)
+        if entry is not None:
+            entry[0] += 1
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[item] = [1, 0]
+            heapq.heappush(self._heap, (1, item))
+            return
+
+        # Find the true minimum, refreshing stale heap entries on the way
+        while True:
+            count, victim = self._heap[0]
+            current = self._counts[victim][0]
+            if current == count:
+                break
+            heapq.heapreplace(self._heap, (current, victim))
+        heapq.heapreplace(self._heap, (count + 1, item))
+        del self._counts[victim]
+        self._counts[item] = [count + 1, count]
+
+    def top(self, n):
+        """
+        The n items with the highest estimated counts.
+        :return: list of (item, count, error, guaranteed) tuples; `guaranteed`
+                 is True when the item is certainly in the true top n
+        """
+        ranked = sorted(self._counts.items(), key=lambda kv: kv[1][0], reverse=True)
+        # Any item outside the result has a true count <= this estimate
+        # (untracked items: <= the smallest counter, once all are taken)
+        if len(ranked) > n:
+            threshold = ranked[n][1][0]
+        else:
+            threshold = ranked[-1][1][0] if len(ranked) == self.capacity else 0
+        return [(item, count, error, count - error >= threshold)
+                for item, (count, error) in ranked[:n]]
+
+    def __len__(self):
+        return len(self._counts)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes (None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # Windows: psutil is optional
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return getattr(psutil.Process().memory_info(), "peak_wset", None)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KB
+
+
+def _print_peak_rss():
+    peak = peak_rss_bytes()
+    print(f"[INFO] Peak RSS = {peak / 2**20:.1f} MB" if peak is not None else "[INFO] Peak RSS = n/a")
+
+
+def stream_common_patterns(top_n=TOP_N, capacity=None, sources=DATASET_FILES, output_file=OUTPUT_FILE):
+    """
+    Streaming version of generate_common_patterns: bounded memory,
+    approximate counts with error bounds.
+    :param capacity: number of sketch counters (default STREAM_CAPACITY_FACTOR * top_n)
+    :return: list of (password, count, error, guaranteed), most common first
+    """
+    sketch = SpaceSaving(capacity or STREAM_CAPACITY_FACTOR * top_n)
+    for path in sources:
+        for password in iter_passwords_from_txt(path, compiled=True):
+            sketch.add(password)
+
+    most_common = sketch.top(top_n)
+    with open(output_file, "w", encoding="utf-8") as f:
+        for pwd, _count, _error, _guaranteed in most_common:
+            f.write(pwd + "\n")
+
+    guaranteed = sum(1 for entry in most_common if entry[3])
+    max_error = max((entry[2] for entry in most_common), default=0)
+    print(f"[INFO] Wrote top {top_n} patterns to '{output_file}' (streaming, approximate).")
+    print(f"[INFO] Total lines processed = {sketch.total}")
+    print(f"[INFO] Sketch counters used = {len(sketch)} / {sketch.capacity}")
+    print(f"[INFO] Count error <= {max_error} in the top {top_n} "
+          f"(bound: lines / capacity = {sketch.total // sketch.capacity}); "
+          f"{guaranteed} of {len(most_common)} guaranteed in the true top {top_n}")
+    _print_peak_rss()
+    return most_common
+
+
+def chunk_ranges(path, chunk_bytes):
+    """(path, start, end) byte ranges of at most `chunk_bytes` covering the file."""
+    if not os.path.isfile(path):
+        print(f"[WARNING] File not found: {path}")
+        return []
+    size = os.path.getsize(path)
+    return [(path, start, min(start + chunk_bytes, size)) for start in range(0, size, chunk_bytes)]
+
+
+def iter_chunk_passwords(path, start, end):
+    """
+    Passwords of the lines that start inside [start, end) of the file,
+    stripped and non-empty as in iter_passwords_from_txt. Chunks are cut
+    at b"\n", and a lone "\r" also ends a line, as in text-mode reads.
+    """
+    with open(path, "rb") as f:
+        position = start
+        if start:
+            # The line holding byte start-1 belongs to the previous chunk
+            f.seek(start - 1)
+            position = start - 1 + len(f.readline())
+        while position < end:
+            raw = f.readline()
+            if not raw:
+                return
+            position += len(raw)
+            for line in raw.decode("utf-8", errors="ignore").split("\r"):
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def _shard_of(password, num_shards):
+    # Stable across processes (str hashes are salted per interpreter)
+    return zlib.crc32(password.encode("utf-8")) % num_shards
+
+
+def _spill(shards, spill_dir, task_id, run_id):
+    for shard, counts in enumerate(shards):
+        if counts:
+            path = os.path.join(spill_dir, f"shard{shard:04d}", f"{task_id:06d}-{run_id:04d}.tsv")
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                for password in sorted(counts):
+                    f.write(f"{password}\t{counts[password]}\n")
+            counts.clear()
+
+
+def _count_chunk(task):
+    """Map task: counts one byte range into per-shard sorted run files."""
+    path, start, end, task_id, num_shards, spill_dir, spill_items = task
+    shards = [{} for _ in range(num_shards)]
+    lines = distinct = run_id = 0
+    for password in iter_chunk_passwords(path, start, end):
+        lines += 1
+        counts = shards[_shard_of(password, num_shards)]
+        if password in counts:
+            counts[password] += 1
+        else:
+            counts[password] = 1
+            distinct += 1
+            if distinct >= spill_items:
+                _spill(shards, spill_dir, task_id, run_id)
+                distinct, run_id = 0, run_id + 1
+    _spill(shards, spill_dir, task_id, run_id)
+    return lines
+
+
+def read_count_run(path):
+    """Yields (password, count) from a sorted "password<TAB>count" run file."""
+    # Only "\n" ends a record: no universal-newline splitting on re-read
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        for line in f:
+            password, count = line.rstrip("\n").rsplit("\t", 1)
+            yield password, int(count)
+
+
+def merge_count_runs(paths, key=None):
+    """
+    K-way merge of sorted runs, summing the counts of equal passwords.
+    :param key: sort key of (password, count) entries the runs were sorted by
+    """
+    current, total = None, 0
+    for password, count in heapq.merge(*(read_count_run(path) for path in paths), key=key):
+        if password == current:
+            total += count
+        else:
+            if current is not None:
+                yield current, total
+            current, total = password, count
+    if current is not None:
+        yield current, total
+
+
+def reduce_count_runs(paths, work_dir, key=None):
+    """
+    Bounds open files: merges runs in groups of MERGE_FAN_IN (replacing
+    them with merged runs in `work_dir`) until one merge_count_runs pass suffices.
+    :return: list of at most MERGE_FAN_IN run paths
+    """
+    runs, level = list(paths), 0
+    while len(runs) > MERGE_FAN_IN:
+        merged_runs = []
+        for group_start in range(0, len(runs), MERGE_FAN_IN):
+            group = runs[group_start:group_start + MERGE_FAN_IN]
+            path = os.path.join(work_dir, f"merged-{level:02d}-{group_start:06d}.tsv")
+            with open(path, "w", encoding="utf-8", newline="\n") as f:
+                for password, count in merge_count_runs(group, key):
+                    f.write(f"{password}\t{count}\n")
+            for old in group:
+                os.remove(old)
+            merged_runs.append(path)
+        runs, level = merged_runs, level + 1
+    return runs
+
+
+def _reduce_shard(task):
+    """Reduce task: exact counts of one shard -> its top N and unique count."""
+    shard_dir, top_n = task
+    runs = reduce_count_runs(sorted(os.path.join(shard_dir, name) for name in os.listdir(shard_dir)),
+                             shard_dir)
+
+    top, unique = [], 0
+    for password, count in merge_count_runs(runs):
+        unique += 1
+        if len(top) < top_n:
+            heapq.heappush(top, (count, password))
+        elif count > top[0][0]:
+            heapq.heapreplace(top, (count, password))
+    return top, unique
+
+
+def parallel_common_patterns(top_n=TOP_N, workers=None, sources=DATASET_FILES, output_file=OUTPUT_FILE,
+                             chunk_bytes=CHUNK_BYTES, num_shards=NUM_SHARDS, spill_items=SPILL_ITEMS,
+                             spill_dir=None):
+    """
+    Exact, multi-core version of generate_common_patterns with disk spill.
+    :param workers: pool size (default: all cores)
+    :param spill_dir: where sorted runs go (default: system temp directory)
+    :return: list of (password, count), most common first (ties by password)
+    """
+    tasks = [(path, start, end) for path in sources for path, start, end in chunk_ranges(path, chunk_bytes)]
+    with tempfile.TemporaryDirectory(dir=spill_dir) as run_dir:
+        for shard in range(num_shards):
+            os.mkdir(os.path.join(run_dir, f"shard{shard:04d}"))
+        map_tasks = [(path, start, end, task_id, num_shards, run_dir, spill_items)
+                     for task_id, (path, start, end) in enumerate(tasks)]
+        reduce_tasks = [(os.path.join(run_dir, f"shard{shard:04d}"), top_n) for shard in range(num_shards)]
+
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            total_lines = sum(pool.imap_unordered(_count_chunk, map_tasks))
+            shard_results = pool.map(_reduce_shard, reduce_tasks)
+
+    candidates = [(count, password) for top, _unique in shard_results for count, password in top]
+    most_common = [(password, count) for count, password in
+                   sorted(candidates, key=lambda entry: (-entry[0], entry[1]))[:top_n]]
+    with open(output_file, "w", encoding="utf-8") as f:
+        for pwd, _count in most_common:
+            f.write(pwd + "\n")
+
+    print(f"[INFO] Wrote top {top_n} patterns to '{output_file}' (parallel, exact).")
+    print(f"[INFO] Total lines processed = {total_lines}")
+    print(f"[INFO] Unique passwords found = {sum(unique for _top, unique in shard_results)}")
+    print(f"[INFO] Map tasks = {len(map_tasks)}, shards = {num_shards}, workers = {workers or os.cpu_count()}")
+    _print_peak_rss()
+    return most_common
+
+
+def ingest_common_patterns(paths, top_n=TOP_N, store_dir=None, output_file=OUTPUT_FILE):
+    """
+    Ingests new dump files into the pattern store as deltas and rewrites
+    the output from the merged counts (previously ingested files are skipped).
+    :param store_dir: store directory (default: pattern_store.PATTERN_STORE_DIR)
+    :return: list of (password, count), most common first (ties by password)
+    """
+    from pattern_store import PatternStore, PATTERN_STORE_DIR
+
+    store = PatternStore(store_dir or PATTERN_STORE_DIR)
+    for path in paths:
+        store.ingest(path)
+    most_common = store.top(top_n)
+    with open(output_file, "w", encoding="utf-8") as f:
+        for pwd, _count in most_common:
+            f.write(pwd + "\n")
+
+    stats = store.stats()
+    print(f"[INFO] Wrote top {top_n} patterns to '{output_file}' (pattern store).")
+    print(f"[INFO] Total lines ingested = {stats['total_lines']} from {stats['sources']} files")
+    print(f"[INFO] Unique passwords found = {stats['unique']} ({stats['runs']} runs)")
+    _print_peak_rss()
+    return most_common
 
 
-def generate_common_patterns(top_n=500):
+def generate_common_patterns(top_n=TOP_N):
     """
     Merges passwords from the three dataset files, counts their frequency,
     selects the top N most common, and writes them to OUTPUT_FILE.
     """
-    # 1) Load from each dataset file
-    rockyou_passwords = load_passwords_from_txt(ROCKYOU_FILE)
-    hibp_passwords = load_passwords_from_txt(HIBP_FILE)
-    crackstation_passwords = load_passwords_from_txt(CRACKSTATION_FILE)
+    # 1) Load from each dataset file (only counted, so binary copies may be used)
+    rockyou_passwords = load_passwords_from_txt(ROCKYOU_FILE, compiled=True)
+    hibp_passwords = load_passwords_from_txt(HIBP_FILE, compiled=True)
+    crackstation_passwords = load_passwords_from_txt(CRACKSTATION_FILE, compiled=True)
 
     # 2) Combine into one list
     all_passwords = rockyou_passwords + hibp_passwords + crackstation_passwords
@@ -77,7 +436,24 @@ def generate_common_patterns(top_n=500):
     print(f"[INFO] Wrote top {top_n} patterns to '{OUTPUT_FILE}'.")
     print(f"[INFO] Total lines processed = {len(all_passwords)}")
     print(f"[INFO] Unique passwords found = {len(counter.keys())}")
+    _print_peak_rss()
 
 
 if __name__ == "__main__":
-    generate_common_patterns(top_n=500)
+    parser = argparse.ArgumentParser(description="Extract the most common passwords from the datasets.")
+    parser.add_argument("--top", type=int, default=TOP_N, help="number of patterns to write")
+    parser.add_argument("--streaming", action="store_true", help="bounded-memory approximate mode")
+    parser.add_argument("--capacity", type=int, default=None, help="sketch counters in streaming mode")
+    parser.add_argument("--parallel", action="store_true", help="exact multi-core mode with disk spill")
+    parser.add_argument("--workers", type=int, default=None, help="processes in parallel mode")
+    parser.add_argument("--ingest", nargs="+", metavar="DUMP", help="add new dump files to the pattern store")
+    parser.add_argument("--store", default=None, help="pattern store directory for --ingest")
+    args = parser.parse_args()
+    if args.ingest:
+        ingest_common_patterns(args.ingest, top_n=args.top, store_dir=args.store)
+    elif args.streaming:
+        stream_common_patterns(top_n=args.top, capacity=args.capacity)
+    elif args.parallel:
+        parallel_common_patterns(top_n=args.top, workers=args.workers)
+    else:
+        generate_common_patterns(top_n=args.top)
@@ -0,0 +1,157 @@
+# pattern_matcher.py
+"""
+Finds common patterns embedded anywhere in a password.
+
+validation.py only catches exact matches, so 'xPassw0rd42' passes. Here the
+patterns are compiled once into an Aho-Corasick automaton, which scans a
+password in time linear in its length regardless of how many patterns
+there are, and reports every embedded pattern with its offsets.
+
+Optional normalization tables (case folding, leetspeak) are applied to the
+patterns and to the scanned text alike. They map one character to one
+character, so offsets in the normalized text are offsets in the password.
+"""
+
+import threading
+from collections import deque
+
+from validation import PATTERNS, get_pattern_index
+
+# Common leetspeak substitutions, folded back to letters
+LEET_TABLE = {
+    "0": "o", "1": "i", "!": "i", "|": "i", "3": "e", "4": "a", "@": "a",
+    "5": "s", "$": "s", "7": "t", "+": "t", "8": "b", "9": "g",
+}
+
+# Shorter patterns would flag too many random passwords
+MIN_PATTERN_LENGTH = 4
+
+
+def build_translation(fold_case=True, leet=True):
+    """Returns a str.translate table for the chosen normalizations (or None)."""
+    table = {}
+    if leet:
+        table.update({ord(src): dst for src, dst in LEET_TABLE.items()})
+    if fold_case:
+        for code in range(ord("A"), ord("Z") + 1):
+            table[code] = chr(code).lower()
+    return table or None
+
+
+class PatternMatcher:
+    """
+    Aho-Corasick automaton over a set of patterns. States are list indexes;
+    `_goto[s]` maps a character to the next state, `_fail[s]` is the longest
+    proper suffix state, and `_out[s]` lists every pattern ending at `s`
+    (its own plus those reached through failure links).
+    """
+
+    def __init__(self, patterns, fold_case=True, leet=True, min_length=MIN_PATTERN_LENGTH):
+        self._table = build_translation(fold_case, leet)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        # Several originals can normalize to the same key; report one of them
+        normalized = {}
+        for pattern in sorted(patterns):
+            if len(pattern) >= min_length:
+                normalized.setdefault(self._normalize(pattern), pattern)
+        self.patterns = list(normalized.values())
+        self._lengths = [len(key) for key in normalized]
+
+        for pattern_id, key in enumerate(normalized):
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(pattern_id)
+
+        # Breadth-first pass sets failure links and merges their outputs
+        # (children of the root keep failure link 0)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _normalize(self, text):
+        return text.translate(self._table) if self._table else text
+
+    def _scan(self, password):
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, char in enumerate(self._normalize(password), 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in out[state]:
+                yield pattern_id, end
+
+    def find_all(self, password):
+        """
+        Every embedded pattern, in order of its end offset.
+        :return: list of dicts with pattern, start, end and the matched text
+        """
+        matches = []
+        for pattern_id, end in self._scan(password):
+            start = end - self._lengths[pattern_id]
+            matches.append({
+                "pattern": self.patterns[pattern_id],
+                "start": start,
+                "end": end,
+                "matched": password[start:end],
+            })
+        return matches
+
+    def contains_any(self, password):
+        """True as soon as one pattern is found."""
+        return next(self._scan(password), None) is not None
+
+    def scan_many(self, passwords, only_hits=False):
+        """
+        Batch mode for large generated sets.
+        :param only_hits: yield only passwords with at least one match
+        :return: generator of (index, password, matches)
+        """
+        for index, password in enumerate(passwords):
+            matches = self.find_all(password)
+            if matches or not only_hits:
+                yield index, password, matches
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_pattern_matcher(patterns_file=PATTERNS, fold_case=True, leet=True):
+    """
+    Returns the shared matcher for `patterns_file`. It is compiled once and
+    rebuilt only when validation's PatternIndex reloads the file.
+    """
+    patterns = get_pattern_index(patterns_file).patterns()
+    key = (patterns_file, fold_case, leet)
+    with _matchers_lock:
+        cached = _matchers.get(key)
+        if cached is None or cached[0] is not patterns:
+            cached = _matchers[key] = (patterns, PatternMatcher(patterns, fold_case, leet))
+        return cached[1]
+
+
+def find_embedded_patterns(password, patterns_file=PATTERNS, fold_case=True, leet=True):
+    """
+    Convenience wrapper: every common pattern embedded in `password`.
+    :return: list of match dicts (see PatternMatcher.find_all)
+    """
+    return get_pattern_matcher(patterns_file, fold_case, leet).find_all(password)
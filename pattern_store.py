@@ -0,0 +1,331 @@
+# pattern_store.py
+"""
+Persistent, mergeable password frequency store for incremental ingestion.
+
+Instead of re-counting every dataset whenever a new breach dump arrives,
+the store keeps the exact counts of everything ingested so far as
+immutable sorted run files ("password<TAB>count", as in pattern_finder's
+parallel mode), listed in a JSON manifest together with the current top
+passwords. Ingesting a dump:
+
+  1) counts only the new file into a sorted delta run,
+  2) looks up the previous total of every delta password through each
+     run's sparse index (ascending lookups, so each run is read at most once),
+  3) updates the top list: only delta passwords changed, so the new top K
+     is found among the old top K and the delta,
+  4) merges runs of similar size (size-tiered), so the store holds
+     O(log n) runs and each count is rewritten O(log n) times.
+
+Ingest cost is therefore proportional to the delta (plus the amortized
+compaction), not to the whole history.
+"""
+
+import bisect
+import heapq
+import json
+import os
+import time
+
+from pattern_finder import TOP_N, SPILL_ITEMS, iter_passwords_from_txt, merge_count_runs
+
+PATTERN_STORE_DIR = "pattern_store"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Passwords kept in the maintained top list; larger requests need a full merge
+TOP_CAPACITY = 10 * TOP_N
+
+# One sparse index entry every INDEX_STRIDE lines of a run
+INDEX_STRIDE = 256
+
+# Merge the newest run into the previous one once it reaches 1/RATIO of its size
+COMPACTION_RATIO = 2
+
+
+def _rank(entry):
+    # Most common first, ties by password
+    return -entry[1], entry[0]
+
+
+class _RunCursor:
+    """Ascending point lookups in one sorted run, via its sparse index."""
+
+    def __init__(self, path, keys, offsets):
+        self._file = open(path, "rb")
+        self._keys = keys
+        self._offsets = offsets
+        self._block = -1
+        self._pending = None  # (password, count) read but not consumed yet
+
+    def get(self, password):
+        block = bisect.bisect_right(self._keys, password) - 1
+        if block < 0:
+            return 0
+        if block != self._block:
+            self._file.seek(self._offsets[block])
+            self._block = block
+            self._pending = None
+        while True:
+            if self._pending is None:
+                line = self._file.readline()
+                if not line:
+                    return 0
+                key, count = line.decode("utf-8").rstrip("\n").rsplit("\t", 1)
+                self._pending = (key, int(count))
+            key, count = self._pending
+            if key < password:
+                self._pending = None
+            elif key == password:
+                self._pending = None
+                return count
+            else:
+                return 0
+
+    def close(self):
+        self._file.close()
+
+
+class PatternStore:
+    """
+    On-disk exact frequency store under `directory`. Run files are never
+    modified; the manifest is replaced atomically after new runs are
+    written, and obsolete runs are deleted only afterwards.
+    """
+
+    def __init__(self, directory=PATTERN_STORE_DIR, top_capacity=TOP_CAPACITY, spill_items=SPILL_ITEMS):
+        """
+        :param top_capacity: size of the maintained top list (fixed when the store is created)
+        :param spill_items: distinct delta passwords held in memory before spilling to disk
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.spill_items = spill_items
+        self._indexes = {}
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+            if self._manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"{manifest_path}: unsupported pattern store version.")
+        else:
+            self._manifest = {
+                "version": MANIFEST_VERSION,
+                "top_capacity": top_capacity,
+                "next_run": 0,
+                "total_lines": 0,
+                "unique": 0,
+                "runs": [],
+                "sources": [],
+                "top": [],
+            }
+
+    # ------------------------------
+    # Run files
+    # ------------------------------
+    def _path(self, name, suffix):
+        return os.path.join(self.directory, name + suffix)
+
+    def _new_run_name(self):
+        name = f"run-{self._manifest['next_run']:06d}"
+        self._manifest["next_run"] += 1
+        return name
+
+    def _write_run(self, name, items):
+        """Writes sorted (password, count) items plus the sparse index; returns run metadata."""
+        keys, offsets = [], []
+        position = count_items = total = 0
+        with open(self._path(name, ".tsv"), "wb") as f:
+            for password, count in items:
+                if count_items % INDEX_STRIDE == 0:
+                    keys.append(password)
+                    offsets.append(position)
+                line = f"{password}\t{count}\n".encode("utf-8")
+                f.write(line)
+                position += len(line)
+                count_items += 1
+                total += count
+        with open(self._path(name, ".idx"), "w", encoding="utf-8") as f:
+            json.dump({"keys": keys, "offsets": offsets}, f)
+        self._indexes[name] = (keys, offsets)
+        return {"name": name, "items": count_items, "lines": total}
+
+    def _index(self, name):
+        index = self._indexes.get(name)
+        if index is None:
+            with open(self._path(name, ".idx"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            index = self._indexes[name] = (data["keys"], data["offsets"])
+        return index
+
+    def _cursor(self, name):
+        return _RunCursor(self._path(name, ".tsv"), *self._index(name))
+
+    def _remove_run(self, name):
+        self._indexes.pop(name, None)
+        for suffix in (".tsv", ".idx"):
+            try:
+                os.remove(self._path(name, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _save_manifest(self):
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f)
+        os.replace(path + ".tmp", path)
+
+    # ------------------------------
+    # Ingestion
+    # ------------------------------
+    @staticmethod
+    def _source_entry(path):
+        stat = os.stat(path)
+        return {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def is_ingested(self, path):
+        """True if this exact file (path, size, mtime) was already ingested."""
+        if not os.path.isfile(path):
+            return False
+        entry = self._source_entry(path)
+        return any(all(source[key] == value for key, value in entry.items())
+                   for source in self._manifest["sources"])
+
+    def _count_delta(self, path):
+        """Counts one file; returns (sorted items iterable, lines, spill run names)."""
+        counts, spills, lines = {}, [], 0
+        for password in iter_passwords_from_txt(path, compiled=True):
+            lines += 1
+            counts[password] = counts.get(password, 0) + 1
+            if len(counts) >= self.spill_items:
+                spills.append(self._write_run(self._new_run_name(), sorted(counts.items())))
+                counts = {}
+        if not spills:
+            return sorted(counts.items()), lines, []
+        if counts:
+            spills.append(self._write_run(self._new_run_name(), sorted(counts.items())))
+        names = [run["name"] for run in spills]
+        return merge_count_runs([self._path(name, ".tsv") for name in names]), lines, names
+
+    def ingest(self, path):
+        """
+        Adds the passwords of one dump file to the store.
+        :return: dict with source, lines, delta_unique, new_unique, runs,
+                 seconds and skipped (already ingested), or None if missing
+        """
+        if not os.path.isfile(path):
+            print(f"[WARNING] File not found: {path}")
+            return None
+        if self.is_ingested(path):
+            print(f"[INFO] Already ingested, skipping: {path}")
+            return {"source": path, "skipped": True}
+
+        start = time.perf_counter()
+        source = self._source_entry(path)
+        delta, lines, spill_names = self._count_delta(path)
+
+        top = dict(self._manifest["top"])
+        capacity = self._manifest["top_capacity"]
+        candidates = []
+        stats = {"delta_unique": 0, "new_unique": 0}
+        cursors = [self._cursor(run["name"]) for run in self._manifest["runs"]]
+
+        def delta_with_totals():
+            # Passes delta counts through to the run file, tracking new totals on the way
+            for password, delta_count in delta:
+                stats["delta_unique"] += 1
+                if password in top:
+                    top[password] += delta_count
+                else:
+                    previous = sum(cursor.get(password) for cursor in cursors)
+                    if previous == 0:
+                        stats["new_unique"] += 1
+                    candidates.append((password, previous + delta_count))
+                    if len(candidates) >= 2 * capacity:
+                        candidates[:] = heapq.nsmallest(capacity, candidates, key=_rank)
+                yield password, delta_count
+
+        try:
+            run = self._write_run(self._new_run_name(), delta_with_totals())
+        finally:
+            for cursor in cursors:
+                cursor.close()
+
+        # Nobody outside the old top list and the delta changed, so the new
+        # top list is the best of the two
+        manifest = self._manifest
+        manifest["top"] = [list(entry) for entry in
+                           heapq.nsmallest(capacity, list(top.items()) + candidates, key=_rank)]
+        if run["items"]:
+            manifest["runs"].append(run)
+        else:
+            spill_names.append(run["name"])
+        manifest["sources"].append(dict(source, lines=lines))
+        manifest["total_lines"] += lines
+        manifest["unique"] += stats["new_unique"]
+        obsolete = spill_names + self._compact()
+        self._save_manifest()
+        for name in obsolete:
+            self._remove_run(name)
+
+        summary = {
+            "source": path,
+            "lines": lines,
+            "delta_unique": stats["delta_unique"],
+            "new_unique": stats["new_unique"],
+            "runs": len(manifest["runs"]),
+            "seconds": time.perf_counter() - start,
+            "skipped": False,
+        }
+        print(f"[INFO] Ingested {lines} lines from '{path}' "
+              f"({stats['delta_unique']} distinct, {stats['new_unique']} new) in {summary['seconds']:.2f}s.")
+        return summary
+
+    def _compact(self):
+        """
+        Size-tiered compaction of the manifest's runs.
+        :return: names of the runs that were merged away (to delete after saving)
+        """
+        runs = self._manifest["runs"]
+        obsolete = []
+        while len(runs) >= 2 and runs[-1]["items"] * COMPACTION_RATIO >= runs[-2]["items"]:
+            older, newer = runs[-2], runs[-1]
+            merged = merge_count_runs([self._path(older["name"], ".tsv"), self._path(newer["name"], ".tsv")])
+            runs[-2:] = [self._write_run(self._new_run_name(), merged)]
+            obsolete += [older["name"], newer["name"]]
+        return obsolete
+
+    # ------------------------------
+    # Queries
+    # ------------------------------
+    def count(self, password):
+        """Exact number of occurrences of `password` across everything ingested."""
+        total = 0
+        for run in self._manifest["runs"]:
+            cursor = self._cursor(run["name"])
+            try:
+                total += cursor.get(password)
+            finally:
+                cursor.close()
+        return total
+
+    def top(self, n=TOP_N):
+        """
+        The n most common passwords as (password, count), ties by password.
+        Served from the maintained top list; larger n merges every run.
+        """
+        if n <= self._manifest["top_capacity"]:
+            return [tuple(entry) for entry in self._manifest["top"][:n]]
+        paths = [self._path(run["name"], ".tsv") for run in self._manifest["runs"]]
+        return heapq.nsmallest(n, merge_count_runs(paths), key=_rank)
+
+    def stats(self):
+        """Returns a snapshot of the store size for logging."""
+        manifest = self._manifest
+        return {
+            "sources": len(manifest["sources"]),
+            "runs": len(manifest["runs"]),
+            "run_items": sum(run["items"] for run in manifest["runs"]),
+            "total_lines": manifest["total_lines"],
+            "unique": manifest["unique"],
+            "top_capacity": manifest["top_capacity"],
+        }
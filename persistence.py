@@ -0,0 +1,432 @@
+# persistence.py
+"""
+Pooled, write-behind persistence for generated password hashes.
+
+Request handlers used to open a MySQL connection per row and commit
+synchronously. Here:
+
+  - ConnectionPool keeps up to `size` open connections and hands them out
+    with a timeout (broken or failed connections are discarded, not reused)
+  - WriteBehindWriter queues rows in a bounded queue and a background
+    thread writes them with multi-row executemany, as soon as `batch_size`
+    rows are waiting or the oldest has waited `flush_seconds`. A full
+    queue blocks the caller for up to `put_timeout` (backpressure), and
+    close() drains everything still queued (registered with atexit)
+
+Backends: MySQLBackend (mysql.connector, imported on first connect) and
+SQLiteBackend, a stand-in with the same tables for tests and local runs.
+Tables added by this code base (MYSQL_SCHEMA) are created on MySQL's first
+connect if missing; the original users/passwords tables are left alone.
+
+Reads of large tables use keyset pagination on the primary key
+(fetch_keyset_page / iter_keyset): no OFFSET scans and no fetchall() of
+the whole table, so a page costs the same however deep it is.
+"""
+
+import atexit
+import contextlib
+import queue
+import sqlite3
+import threading
+import time
+
+# Defaults (override through the app config)
+POOL_SIZE = 4
+POOL_TIMEOUT_SECONDS = 5.0
+BATCH_SIZE = 100
+FLUSH_SECONDS = 0.5
+MAX_PENDING_ROWS = 10000
+PUT_TIMEOUT_SECONDS = 5.0
+MAX_RETRIES = 3
+
+# Rows per keyset query when streaming a whole table
+KEYSET_BATCH_ROWS = 1000
+
+# Tables used by app.py / app1.py, for the SQLite stand-in
+SQLITE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS users ("
+    " id INTEGER PRIMARY KEY, username TEXT, role TEXT NOT NULL DEFAULT 'user')",
+    "CREATE TABLE IF NOT EXISTS passwords2 ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, hashed_password TEXT,"
+    " created_at TEXT DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE IF NOT EXISTS passwords3 ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, hashed_password TEXT NOT NULL,"
+    " shared_key TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE IF NOT EXISTS password_stats ("
+    " metric TEXT NOT NULL, bucket TEXT NOT NULL, count INTEGER NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (metric, bucket))",
+)
+
+
+# Tables this code base adds to the MySQL database (created if missing)
+MYSQL_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS password_stats ("
+    " metric VARCHAR(32) NOT NULL, bucket VARCHAR(64) NOT NULL, count BIGINT NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (metric, bucket))",
+)
+
+
+class PersistenceError(RuntimeError):
+    """Base class of the errors raised by this module."""
+
+
+class PoolTimeout(PersistenceError):
+    """No pooled connection became free within the timeout."""
+
+
+class WriteQueueFull(PersistenceError):
+    """The write-behind queue stayed full for longer than put_timeout."""
+
+
+class MySQLBackend:
+    """mysql.connector connections built from a db_config dict."""
+
+    placeholder = "%s"
+
+    def __init__(self, config, schema=MYSQL_SCHEMA):
+        self.config = dict(config)
+        self.schema = schema
+        self._schema_ready = False
+
+    def connect(self):
+        import mysql.connector
+        conn = mysql.connector.connect(**self.config)
+        if not self._schema_ready:
+            cursor = conn.cursor()
+            try:
+                for statement in self.schema:
+                    cursor.execute(statement)
+                conn.commit()
+            finally:
+                cursor.close()
+            self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def increment_query(table, key_columns, value_column):
+        """Insert-or-add statement: adds the row's value to an existing key."""
+        columns = (*key_columns, value_column)
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+                f" ON DUPLICATE KEY UPDATE {value_column} = {value_column} + VALUES({value_column})")
+
+    @staticmethod
+    def is_alive(conn):
+        return conn.is_connected()
+
+
+class SQLiteBackend:
+    """SQLite stand-in (one database file shared by all pooled connections)."""
+
+    placeholder = "?"
+
+    def __init__(self, path, schema=SQLITE_SCHEMA):
+        self.path = path
+        self.schema = schema
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=POOL_TIMEOUT_SECONDS, check_same_thread=False)
+        for statement in self.schema:
+            conn.execute(statement)
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def increment_query(table, key_columns, value_column):
+        """Insert-or-add statement: adds the row's value to an existing key."""
+        columns = (*key_columns, value_column)
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+                f" ON CONFLICT ({', '.join(key_columns)}) DO UPDATE"
+                f" SET {value_column} = {value_column} + excluded.{value_column}")
+
+    @staticmethod
+    def is_alive(conn):
+        return True
+
+
+def create_backend(kind, mysql_config=None, sqlite_file=None):
+    """Backend by name: 'mysql' (mysql_config) or 'sqlite' (sqlite_file)."""
+    if kind == "mysql":
+        return MySQLBackend(mysql_config or {})
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_file)
+    raise ValueError(f"Unknown database backend '{kind}'. Choose from: mysql, sqlite")
+
+
+class ConnectionPool:
+    """
+    Bounded pool of database connections, created lazily.
+    Use as: with pool.connection() as conn: ...
+    """
+
+    def __init__(self, backend, size=POOL_SIZE, timeout=POOL_TIMEOUT_SECONDS):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._discarded = 0
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the `with` block. If the block raises, the
+        connection is closed instead of being returned to the pool.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"No database connection free within {self.timeout:g}s.")
+        conn = None
+        try:
+            while conn is None:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    conn = self.backend.connect()
+                    with self._lock:
+                        self._opened += 1
+                elif not self.backend.is_alive(conn):
+                    self._discard(conn)
+                    conn = None
+            yield conn
+        except BaseException:
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                with self._lock:
+                    self._idle.append(conn)
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            self._discarded += 1
+        # Roll back first: a failed statement may still hold locks after close()
+        for release in (conn.rollback, conn.close):
+            try:
+                release()
+            except Exception:
+                pass
+
+    def close(self):
+        """Closes the idle connections (borrowed ones close when discarded)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            return {"size": self.size, "idle": len(self._idle),
+                    "opened": self._opened, "discarded": self._discarded}
+
+
+class WriteBehindWriter:
+    """
+    Queues rows for one table and inserts them in batches on a background
+    thread. Rows are tuples in `columns` order.
+    """
+
+    def __init__(self, pool, table, columns, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS,
+                 max_pending=MAX_PENDING_ROWS, put_timeout=PUT_TIMEOUT_SECONDS, max_retries=MAX_RETRIES,
+                 on_written=None):
+        """
+        :param batch_size: rows per executemany (flush as soon as this many wait)
+        :param flush_seconds: longest time a row waits for its batch to fill
+        :param max_pending: queue bound; submit() blocks while it is full
+        :param put_timeout: seconds submit() may block before WriteQueueFull (None: forever)
+        :param max_retries: failed batches are retried this often, then dropped and counted
+        :param on_written: optional callable(contexts), called on the writer thread
+                           with the submit() contexts of every committed batch
+        """
+        self.pool = pool
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.on_written = on_written
+        placeholders = ", ".join([pool.backend.placeholder] * len(self.columns))
+        self.query = f"INSERT INTO {table} ({', '.join(self.columns)}) VALUES ({placeholders})"
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._flush_now = threading.Event()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._written = 0
+        self._failed = 0
+        self._batches = 0
+        self._last_error = None
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{table}", daemon=True)
+        self._thread.start()
+
+    def submit(self, row, context=None):
+        """
+        Queues one row; blocks while the queue is full (backpressure).
+        :param context: passed to on_written once the row is committed
+        """
+        if self._closed:
+            raise PersistenceError(f"Writer for {self.table} is closed.")
+        if len(row) != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} values, got {len(row)}.")
+        try:
+            self._queue.put((tuple(row), context), timeout=self.put_timeout)
+        except queue.Full:
+            raise WriteQueueFull(f"{self.table}: {self._queue.maxsize} rows waiting for the database.") from None
+        with self._stats_lock:
+            self._submitted += 1
+
+    def flush(self, timeout=None):
+        """Writes everything queued so far; returns False on timeout."""
+        self._flush_now.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Stops accepting rows, drains the queue and stops the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_now.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            # flush()/close() write at once, but still fill batches from what is queued
+            urgent = (self._closed or self._flush_now.is_set()) and self._queue.empty()
+            if batch and (len(batch) >= self.batch_size or urgent or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+                continue
+            if not batch and self._queue.empty():
+                if self._closed:
+                    return
+                self._flush_now.clear()
+            # An empty queue is polled so that close() is noticed
+            wait = max(0.0, deadline - time.monotonic()) if batch else 0.1
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                continue
+            if not batch:
+                deadline = time.monotonic() + self.flush_seconds
+            batch.append(item)
+
+    def _write(self, batch):
+        rows = [row for row, _ in batch]
+        error = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.pool.connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.executemany(self.query, rows)
+                        conn.commit()
+                    finally:
+                        cursor.close()
+                error = None
+                break
+            except Exception as err:
+                error = err
+                if attempt < self.max_retries and not self._closed:
+                    time.sleep(min(0.1 * 2 ** attempt, 2.0))
+        with self._stats_lock:
+            self._batches += 1
+            if error is None:
+                self._written += len(batch)
+            else:
+                self._failed += len(batch)
+                self._last_error = str(error)
+        if error is not None:
+            print(f"Error: {error} ({len(batch)} rows for {self.table} dropped)")
+        elif self.on_written is not None:
+            try:
+                self.on_written([context for _, context in batch])
+            except Exception as err:
+                print(f"Error: {err} (on_written callback for {self.table})")
+        for _ in batch:
+            self._queue.task_done()
+
+    def stats(self):
+        """Snapshot of the writer counters."""
+        with self._stats_lock:
+            return {
+                "table": self.table,
+                "pending": self._queue.qsize(),
+                "submitted": self._submitted,
+                "written": self._written,
+                "failed": self._failed,
+                "batches": self._batches,
+                "last_error": self._last_error,
+            }
+
+
+def fetch_keyset_page(pool, table, columns, limit, after=None, before=None, key="id"):
+    """
+    One page of rows ordered by `key`: the first `limit` rows with
+    key > after, or (paging backwards) the last `limit` with key < before.
+    :return: (rows in ascending key order, has_more) - has_more tells
+             whether another page follows in the paging direction
+    """
+    ph = pool.backend.placeholder
+    select = f"SELECT {', '.join(columns)} FROM {table}"
+    if before is not None:
+        query, params = f"{select} WHERE {key} < {ph} ORDER BY {key} DESC LIMIT {ph}", (before, limit + 1)
+    elif after is not None:
+        query, params = f"{select} WHERE {key} > {ph} ORDER BY {key} LIMIT {ph}", (after, limit + 1)
+    else:
+        query, params = f"{select} ORDER BY {key} LIMIT {ph}", (limit + 1,)
+
+    rows = []
+    with pool.connection() as conn:
+        # Default (unbuffered) cursors stream the rows from the server as they are fetched
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                chunk = cursor.fetchmany(256)
+                if not chunk:
+                    break
+                rows.extend(chunk)
+        finally:
+            cursor.close()
+    has_more = len(rows) > limit
+    del rows[limit:]
+    if before is not None:
+        rows.reverse()
+    return rows, has_more
+
+
+def iter_keyset(pool, table, columns, key="id", batch_size=KEYSET_BATCH_ROWS, after=None):
+    """
+    Streams every row of `table` ordered by `key` in keyset batches. Memory
+    stays at one batch, and a connection is only borrowed while a batch is read.
+    """
+    key_index = list(columns).index(key)
+    while True:
+        rows, has_more = fetch_keyset_page(pool, table, columns, batch_size, after=after, key=key)
+        yield from rows
+        if not has_more:
+            return
+        after = rows[-1][key_index]
+
+
+def create_writer(pool, table, columns, **options):
+    """WriteBehindWriter that is drained when the interpreter exits."""
+    writer = WriteBehindWriter(pool, table, columns, **options)
+    atexit.register(writer.close)
+    return writer
@@ -0,0 +1,297 @@
+# qnn_backends.py
+"""
+Pluggable simulator backends for the QRNG and QNN circuits.
+
+Both circuits only use H, CX, RX, RZ and a final measurement of every
+qubit (see qnn_gates.py), so besides Qiskit Aer we ship a minimal NumPy
+statevector simulator for exactly that gate set. It applies every gate in
+place on one preallocated state vector, and web workers that select it
+never import qiskit.
+
+Backends are selected by name ('numpy' or 'aer'); the process-wide
+default comes from the QNN_BACKEND environment variable (unset: 'numpy',
+for every entry point) or set_default_backend().
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from bitbuffer import BitBuffer
+from qnn_gates import qrng_gates
+
+# Default backend when none is configured (the apps and main.py all read this)
+DEFAULT_BACKEND = os.environ.get("QNN_BACKEND", "numpy")
+
+# Widest QRNG circuit simulated per shot on statevector backends
+QRNG_WIDTH = 16
+
+
+class SimulatorBackend:
+    """
+    Interface of a simulator backend. Bitstrings follow the Aer
+    convention: qubit 0 is the rightmost character.
+    """
+
+    name = None
+    max_qubits = None  # None means no fixed limit
+    exact = True  # probabilities() is available (statevector-based)
+
+    def supports(self, num_qubits):
+        """True if this backend can simulate `num_qubits` qubits."""
+        return self.max_qubits is None or num_qubits <= self.max_qubits
+
+    def probabilities(self, num_qubits, gates):
+        """
+        Exact outcome distribution of the gate list.
+        :return: float64 array of length 2**num_qubits
+        """
+        raise NotImplementedError
+
+    def sample(self, num_qubits, gates, shots=1, rng=None):
+        """
+        Measures every qubit `shots` times.
+        :return: list of '0'/'1' strings of length `num_qubits`
+        """
+        raise NotImplementedError
+
+    def random_bits(self, num_bits):
+        """
+        Runs the QRNG circuit (Hadamard + measure) and returns `num_bits` bits.
+        :return: BitBuffer of length `num_bits`
+        """
+        raise NotImplementedError
+
+
+class NumpyBackend(SimulatorBackend):
+    """
+    Statevector simulator for the H/CX/RX/RZ gate set in pure NumPy.
+    The state and two half-size scratch buffers are allocated once per
+    run; gates only ever write into them.
+    """
+
+    name = "numpy"
+    max_qubits = 24  # 2**24 complex128 amplitudes = 256 MB
+
+    def __init__(self):
+        self._qrng_cdfs = {}
+
+    def statevector(self, num_qubits, gates):
+        """Returns the final state vector (qubit 0 = least significant bit)."""
+        if not self.supports(num_qubits):
+            raise ValueError(f"NumPy backend supports at most {self.max_qubits} qubits.")
+
+        state = np.zeros(2 ** num_qubits, dtype=np.complex128)
+        state[0] = 1.0
+        half = max(1, 2 ** (num_qubits - 1))
+        scratch_a = np.empty(half, dtype=np.complex128)
+        scratch_b = np.empty(half, dtype=np.complex128)
+
+        # One axis per qubit; qubit q lives on axis num_qubits-1-q
+        psi = state.reshape((2,) * num_qubits)
+        for gate in gates:
+            name = gate[0]
+            if name == "h":
+                self._apply_h(psi, num_qubits, gate[1], scratch_a)
+            elif name == "rx":
+                self._apply_rx(psi, num_qubits, gate[1], gate[2], scratch_a, scratch_b)
+            elif name == "rz":
+                self._apply_rz(psi, num_qubits, gate[1], gate[2])
+            elif name == "cx":
+                self._apply_cx(psi, num_qubits, gate[1], gate[2], scratch_a)
+            else:
+                raise ValueError(f"Unsupported gate: {name}")
+        return state
+
+    @staticmethod
+    def _halves(psi, num_qubits, qubit):
+        # Slices (not integers) so even a 1-qubit state yields array views
+        axis = num_qubits - 1 - qubit
+        lead = (slice(None),) * axis
+        return psi[lead + (slice(0, 1),)], psi[lead + (slice(1, 2),)]
+
+    @staticmethod
+    def _scratch(buffer, like):
+        return buffer[:like.size].reshape(like.shape)
+
+    def _apply_h(self, psi, num_qubits, qubit, scratch):
+        a0, a1 = self._halves(psi, num_qubits, qubit)
+        tmp = self._scratch(scratch, a0)
+        np.copyto(tmp, a0)
+        a0 += a1
+        a0 *= 1 / np.sqrt(2)
+        np.subtract(tmp, a1, out=a1)
+        a1 *= 1 / np.sqrt(2)
+
+    def _apply_rx(self, psi, num_qubits, theta, qubit, scratch_a, scratch_b):
+        # RX = [[c, -is], [-is, c]]
+        c, m = np.cos(theta / 2), -1j * np.sin(theta / 2)
+        a0, a1 = self._halves(psi, num_qubits, qubit)
+        m_a0 = self._scratch(scratch_a, a0)
+        m_a1 = self._scratch(scratch_b, a1)
+        np.multiply(a0, m, out=m_a0)
+        np.multiply(a1, m, out=m_a1)
+        a0 *= c
+        a0 += m_a1
+        a1 *= c
+        a1 += m_a0
+
+    def _apply_rz(self, psi, num_qubits, theta, qubit):
+        # RZ = diag(e^{-i theta/2}, e^{i theta/2})
+        a0, a1 = self._halves(psi, num_qubits, qubit)
+        a0 *= np.exp(-0.5j * theta)
+        a1 *= np.exp(0.5j * theta)
+
+    def _apply_cx(self, psi, num_qubits, control, target, scratch):
+        # Swap the target's |0>/|1> amplitudes inside the control=1 block
+        index = [slice(None)] * num_qubits
+        index[num_qubits - 1 - control] = slice(1, 2)
+        index[num_qubits - 1 - target] = slice(0, 1)
+        t0 = psi[tuple(index)]
+        index[num_qubits - 1 - target] = slice(1, 2)
+        t1 = psi[tuple(index)]
+        tmp = self._scratch(scratch, t0)
+        np.copyto(tmp, t0)
+        np.copyto(t0, t1)
+        np.copyto(t1, tmp)
+
+    def probabilities(self, num_qubits, gates):
+        state = self.statevector(num_qubits, gates)
+        probs = state.real ** 2
+        probs += state.imag ** 2
+        return probs
+
+    def sample(self, num_qubits, gates, shots=1, rng=None):
+        cdf = np.cumsum(self.probabilities(num_qubits, gates))
+        return self._draw(cdf, num_qubits, shots, rng)
+
+    @staticmethod
+    def _draw(cdf, num_qubits, shots, rng=None):
+        rng = rng or np.random.default_rng()
+        outcomes = np.searchsorted(cdf, rng.random(shots) * cdf[-1], side="right")
+        return [format(int(o), f"0{num_qubits}b") for o in outcomes]
+
+    def random_bits(self, num_bits):
+        if num_bits <= 0:
+            return BitBuffer()
+        width = min(QRNG_WIDTH, num_bits)
+        cdf = self._qrng_cdfs.get(width)
+        if cdf is None:
+            cdf = np.cumsum(self.probabilities(width, qrng_gates(width)))
+            self._qrng_cdfs[width] = cdf
+        shots = -(-num_bits // width)  # ceil division
+        # Outcome indices are packed directly, never formatted as text
+        outcomes = np.searchsorted(cdf, np.random.default_rng().random(shots) * cdf[-1], side="right")
+        return BitBuffer.from_uints(outcomes, width)[:num_bits]
+
+
+class AerBackend(SimulatorBackend):
+    """
+    Qiskit Aer implementation; qiskit is only imported when this
+    backend is created.
+    """
+
+    name = "aer"
+    method = "automatic"
+
+    def __init__(self):
+        from qiskit_aer import AerSimulator
+        self._simulator = AerSimulator(method=self.method)
+
+    def probabilities(self, num_qubits, gates):
+        from qnn_model import circuit_from_gates
+        qc = circuit_from_gates(num_qubits, gates)
+        qc.save_probabilities()
+        result = self._simulator.run(qc, shots=1).result()
+        return np.asarray(result.data(0)["probabilities"], dtype=np.float64)
+
+    def sample(self, num_qubits, gates, shots=1, rng=None):
+        from qnn_model import circuit_from_gates
+        from quantum_random import iter_shot_bitstrings
+        qc = circuit_from_gates(num_qubits, gates, measure=True)
+        return list(iter_shot_bitstrings(qc, shots=shots, simulator=self._simulator))
+
+    def random_bits(self, num_bits):
+        from quantum_random import quantum_random_block
+        return quantum_random_block(num_bits, simulator=self._simulator)
+
+    def run_memory(self, circuit, shots=1):
+        """
+        Runs a prepared QuantumCircuit (e.g. qnn_model.get_fused_circuit)
+        as one job and returns every per-shot bitstring.
+        """
+        from quantum_random import iter_shot_bitstrings
+        return list(iter_shot_bitstrings(circuit, shots=shots, simulator=self._simulator))
+
+    def run_parameter_sweep(self, circuit, values, shots=1024):
+        """
+        Runs one parameterized QuantumCircuit once per row of `values` as a
+        single job: the circuit is transpiled once and Aer binds every row
+        itself (parallelizing the experiments across cores).
+        :param values: array (rows, len(circuit.parameters)), columns in
+                       circuit.parameters order
+        :return: list of counts dicts, one per row
+        """
+        from qiskit import transpile
+        values = np.asarray(values, dtype=np.float64)
+        compiled = transpile(circuit, self._simulator)
+        binds = {param: values[:, column].tolist() for column, param in enumerate(circuit.parameters)}
+        result = self._simulator.run(compiled, shots=shots, parameter_binds=[binds],
+                                     max_parallel_experiments=0).result()
+        return [result.get_counts(row) for row in range(len(values))]
+
+
+class AerMPSBackend(AerBackend):
+    """
+    Aer matrix-product-state method: cheap for wide circuits with
+    nearest-neighbour entanglement, but no full probability vector.
+    """
+
+    name = "aer_mps"
+    method = "matrix_product_state"
+    exact = False
+
+
+class AerStabilizerBackend(AerBackend):
+    """Aer stabilizer method: Clifford circuits (e.g. the QRNG) only."""
+
+    name = "aer_stabilizer"
+    method = "stabilizer"
+    exact = False
+
+
+BACKENDS = {
+    NumpyBackend.name: NumpyBackend,
+    AerBackend.name: AerBackend,
+    AerMPSBackend.name: AerMPSBackend,
+    AerStabilizerBackend.name: AerStabilizerBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def set_default_backend(name):
+    """Selects the backend used when get_backend() is called without a name."""
+    global DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown QNN backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    DEFAULT_BACKEND = name
+
+
+def get_backend(name=None):
+    """
+    Returns the shared instance of the named backend (default: DEFAULT_BACKEND).
+    Passing a SimulatorBackend instance returns it unchanged.
+    """
+    if isinstance(name, SimulatorBackend):
+        return name
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown QNN backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    with _instances_lock:
+        backend = _instances.get(name)
+        if backend is None:
+            backend = _instances[name] = BACKENDS[name]()
+        return backend
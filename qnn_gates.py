@@ -0,0 +1,102 @@
+# qnn_gates.py
+"""
+Qiskit-free description of the project's circuits as plain gate lists,
+so simulator backends can run them without building a QuantumCircuit.
+
+A gate list is a list of tuples:
+  ("h", qubit), ("rx", angle, qubit), ("rz", angle, qubit), ("cx", control, target)
+All qubits are measured at the end. The fused QRNG + QNN circuit also uses
+mid-circuit ("measure", qubit, clbit), ("reset", qubit) and the classically
+conditioned ("if_rx", angle, clbit, qubit), and measures explicitly.
+"""
+
+import numpy as np
+
+from bitbuffer import as_bitbuffer
+
+
+def seed_to_angles(num_qubits, random_seed):
+    """
+    Interprets a seed bitstring as RX angles: every 4 bits => value in
+    [0..15] => angle = value * pi/8. Only whole chunks are used, and at
+    most one angle per qubit.
+
+    :param num_qubits: number of qubits in the circuit
+    :param random_seed: BitBuffer or '0'/'1' string (or None)
+    :return: list of angles, one per seeded qubit starting at qubit 0
+    """
+    angles = []
+    if random_seed:
+        random_seed = as_bitbuffer(random_seed)
+        chunk_size = 4
+        for i in range(min(num_qubits, len(random_seed) // chunk_size)):
+            angles.append(random_seed.uint(i*chunk_size, chunk_size) * (np.pi / 8.0))
+    return angles
+
+
+def qnn_gates(num_qubits, angles):
+    """
+    Gate list of the QNN circuit (see qnn_model.build_qnn_circuit).
+    :param num_qubits: number of qubits in the circuit
+    :param angles: seed-driven RX angles (floats or qiskit Parameters)
+    """
+    gates = []
+
+    # Seed-driven RX rotations on the first len(angles) qubits
+    for i, angle in enumerate(angles):
+        gates.append(("rx", angle, i))
+
+    # Layer 1: put qubits in superposition
+    for i in range(num_qubits):
+        gates.append(("h", i))
+
+    # Layer 2: entangle neighboring qubits
+    for i in range(num_qubits - 1):
+        gates.append(("cx", i, i+1))
+
+    # Layer 3: add some rotations as "activation"
+    for i in range(num_qubits):
+        gates.append(("rz", np.pi/3, i))  # constant angle for demonstration
+
+    # Another round of CNOT in reverse
+    for i in range(num_qubits - 1):
+        gates.append(("cx", num_qubits-1-i, num_qubits-2-i))
+
+    return gates
+
+
+def qnn_gates_for_seed(num_qubits, random_seed):
+    """Gate list of build_qnn_circuit(num_qubits, random_seed)."""
+    return qnn_gates(num_qubits, seed_to_angles(num_qubits, random_seed))
+
+
+def fused_qnn_gates(num_qubits, seed_bits=16):
+    """
+    Gate list of ONE dynamic circuit that generates the QRNG seed and runs
+    the QNN on it. Qubit `num_qubits` is an ancilla that is put in
+    superposition, measured into a seed clbit and reset, `seed_bits` times.
+    Every seed bit then conditionally applies its share of its chunk's RX
+    angle (RX angles add up), which reproduces seed_to_angles exactly.
+
+    Seed character j lands in clbit num_qubits + seed_bits - 1 - j, so a
+    measured string reads: seed (leftmost `seed_bits` chars) + QNN outcome.
+    Needs num_qubits + 1 qubits and num_qubits + seed_bits clbits.
+    """
+    ancilla = num_qubits
+    gates = []
+    for j in range(seed_bits):
+        gates += [("h", ancilla), ("measure", ancilla, num_qubits + seed_bits - 1 - j), ("reset", ancilla)]
+
+    for i in range(min(num_qubits, seed_bits // 4)):
+        for k in range(4):
+            clbit = num_qubits + seed_bits - 1 - (4*i + k)
+            gates.append(("if_rx", (2 ** (3 - k)) * (np.pi / 8.0), clbit, i))
+
+    gates += qnn_gates(num_qubits, [])
+    gates += [("measure", i, i) for i in range(num_qubits)]
+    return gates
+
+
+def qrng_gates(num_bits):
+    """Gate list of the QRNG circuit: a Hadamard on every qubit."""
+    return [("h", i) for i in range(num_bits)]
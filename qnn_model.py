@@ -3,10 +3,29 @@
 Defines a small 'Quantum Neural Network' style circuit
 with entangling gates. We can optionally incorporate
 random seeds from quantum_random.py.
+
+For the request hot path, `bind_qnn_circuit` reuses one parameterized,
+measured and pre-transpiled circuit per (num_qubits, seed angles) shape,
+kept in a small LRU cache, and only binds the seed-derived angles.
 """
 
-import numpy as np
-from qiskit import QuantumCircuit
+import threading
+from collections import OrderedDict
+
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Parameter
+from qiskit_aer import AerSimulator
+
+from qnn_gates import seed_to_angles, qnn_gates, fused_qnn_gates
+
+# Maximum number of transpiled templates kept in memory
+TEMPLATE_CACHE_SIZE = 32
+
+_simulator = None
+_simulator_lock = threading.Lock()
+_template_cache = OrderedDict()
+_template_lock = threading.Lock()
+
 
 def build_qnn_circuit(num_qubits=8, random_seed=None):
     """
@@ -17,37 +36,109 @@ def build_qnn_circuit(num_qubits=8, random_seed=None):
     :param random_seed: an optional bitstring used as 'seed' for angles
     :return: an unmeasured QuantumCircuit
     """
-    qc = QuantumCircuit(num_qubits, num_qubits)
+    return circuit_from_gates(num_qubits, qnn_gates(num_qubits, seed_to_angles(num_qubits, random_seed)))
 
-    # Example: interpret bits of random_seed as angles
-    if random_seed:
-        chunk_size = 4  # e.g., 4 bits => value in [0..15]
-        # We only parse enough chunks to match the qubits
-        for i in range(num_qubits):
-            start = i*chunk_size
-            end = start + chunk_size
-            if end <= len(random_seed):
-                angle_bits = random_seed[start:end]
-                angle_val = int(angle_bits, 2)
-                angle = angle_val * (np.pi / 8.0)
-                # RX rotation
-                qc.rx(angle, i)
-
-    # Layer 1: put qubits in superposition
-    for i in range(num_qubits):
-        qc.h(i)
-
-    # Layer 2: entangle neighboring qubits
-    for i in range(num_qubits - 1):
-        qc.cx(i, i+1)
-
-    # Layer 3: add some rotations as "activation"
-    for i in range(num_qubits):
-        qc.rz(np.pi/3, i)  # constant angle for demonstration
-
-    # Another round of CNOT in reverse
-    for i in range(num_qubits - 1):
-        qc.cx(num_qubits-1-i, num_qubits-2-i)
 
+def circuit_from_gates(num_qubits, gates, measure=False, num_clbits=None):
+    """
+    Turns a qnn_gates gate list into a QuantumCircuit.
+    :param measure: also measure every qubit into its classical bit
+    :param num_clbits: classical bits (default: num_qubits)
+    """
+    qc = QuantumCircuit(num_qubits, num_qubits if num_clbits is None else num_clbits)
+    for gate in gates:
+        if gate[0] == "if_rx":
+            angle, clbit, qubit = gate[1:]
+            with qc.if_test((qc.clbits[clbit], 1)):
+                qc.rx(angle, qubit)
+        else:
+            getattr(qc, gate[0])(*gate[1:])
+    if measure:
+        for i in range(num_qubits):
+            qc.measure(i, i)
     return qc
 
+
+def get_qnn_simulator():
+    """
+    Returns the shared AerSimulator the QNN templates are transpiled for.
+    """
+    global _simulator
+    with _simulator_lock:
+        if _simulator is None:
+            _simulator = AerSimulator()
+        return _simulator
+
+
+def get_qnn_template(num_qubits=8, num_seed_angles=4):
+    """
+    Returns a measured QNN circuit with `num_seed_angles` RX angles left
+    as Parameters, transpiled once for the shared simulator.
+    Templates are kept in an LRU cache of TEMPLATE_CACHE_SIZE entries.
+
+    :param num_qubits: number of qubits in the circuit
+    :param num_seed_angles: number of seed-driven RX gates (<= num_qubits)
+    :return: (transpiled QuantumCircuit, list of Parameters in qubit order)
+    """
+    key = (num_qubits, num_seed_angles)
+    with _template_lock:
+        entry = _template_cache.get(key)
+        if entry is not None:
+            _template_cache.move_to_end(key)
+            return entry
+
+    # Build + transpile outside the lock; a concurrent duplicate is harmless
+    params = [Parameter(f"seed_{i}") for i in range(num_seed_angles)]
+    qc = circuit_from_gates(num_qubits, qnn_gates(num_qubits, params), measure=True)
+    entry = (transpile(qc, get_qnn_simulator()), params)
+
+    with _template_lock:
+        _template_cache[key] = entry
+        _template_cache.move_to_end(key)
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return entry
+
+
+def bind_qnn_circuit(num_qubits=8, random_seed=None):
+    """
+    Same circuit as build_qnn_circuit(...) plus measurement of every
+    qubit, ready to run on get_qnn_simulator(). Only the seed-derived
+    angles are bound per call; construction and transpilation are cached.
+
+    :param num_qubits: number of qubits in the circuit
+    :param random_seed: an optional bitstring used as 'seed' for angles
+    :return: a measured, transpiled QuantumCircuit
+    """
+    angles = seed_to_angles(num_qubits, random_seed)
+    template, params = get_qnn_template(num_qubits, len(angles))
+    if not params:
+        return template.copy()
+    return template.assign_parameters(dict(zip(params, angles)))
+
+
+def get_fused_circuit(num_qubits=8, seed_bits=16):
+    """
+    Returns the fused QRNG + QNN dynamic circuit (see
+    qnn_gates.fused_qnn_gates), built once per shape and kept in the same
+    LRU cache as the QNN templates. It only uses instructions Aer runs
+    natively, so it is not transpiled (which would also cap its width at
+    the simulator's coupling map). It has no seed parameters: every shot
+    draws its own seed inside the circuit.
+    """
+    key = ("fused", num_qubits, seed_bits)
+    with _template_lock:
+        qc = _template_cache.get(key)
+        if qc is not None:
+            _template_cache.move_to_end(key)
+            return qc
+
+    qc = circuit_from_gates(num_qubits + 1, fused_qnn_gates(num_qubits, seed_bits),
+                            num_clbits=num_qubits + seed_bits)
+
+    with _template_lock:
+        _template_cache[key] = qc
+        _template_cache.move_to_end(key)
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return qc
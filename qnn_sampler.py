@@ -0,0 +1,165 @@
+# qnn_sampler.py
+"""
+Samples QNN measurement outcomes from a cached exact distribution.
+
+The circuit from qnn_model.build_qnn_circuit only depends on `num_qubits`
+and the seed bits that become RX angles (4 bits per seeded qubit), so
+there are few distinct output distributions. We compute each probability
+vector once, keep its cumulative form in an LRU cache bounded by a memory
+budget, and draw any number of shots with one vectorized NumPy call.
+Probability vectors come from the configured simulator backend
+(qnn_backends.py); both backends are exact, so entries are shared.
+"""
+
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+
+from qnn_backends import get_backend
+from qnn_gates import qnn_gates_for_seed
+
+# Default memory budget for cached distributions (bytes)
+DEFAULT_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Largest circuit we compute exact distributions for (2**20 doubles = 8 MB)
+MAX_EXACT_QUBITS = 20
+
+
+def seed_key(num_qubits, random_seed):
+    """
+    Reduces a seed (BitBuffer or '0'/'1' string) to the bits that actually
+    change the circuit, as short text so keys never pin a larger buffer.
+    Two seeds with the same key produce the same distribution.
+    """
+    if not random_seed:
+        return (num_qubits, "")
+    used_bits = 4 * min(num_qubits, len(random_seed) // 4)
+    return (num_qubits, str(random_seed[:used_bits]))
+
+
+class DistributionCache:
+    """
+    LRU cache of cumulative outcome distributions, keyed by seed_key().
+    Entries are evicted oldest-first once their total size exceeds
+    `budget_bytes`.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, max_qubits=MAX_EXACT_QUBITS):
+        self.budget_bytes = budget_bytes
+        self.max_qubits = max_qubits
+        self._entries = OrderedDict()
+        self._used_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def supports(self, num_qubits):
+        """True if an exact distribution for `num_qubits` fits the limits."""
+        return (num_qubits <= self.max_qubits
+                and (2 ** num_qubits) * 8 <= self.budget_bytes)
+
+    def get_cdf(self, num_qubits, random_seed, backend=None):
+        """
+        Returns the cumulative distribution over the 2**num_qubits outcomes
+        (index i == measured bitstring format(i, '0{n}b'), as in Aer).
+        :param backend: backend name/instance used on a cache miss
+        """
+        if not self.supports(num_qubits):
+            raise ValueError(f"No exact distribution for {num_qubits} qubits within budget.")
+
+        key = seed_key(num_qubits, random_seed)
+        with self._lock:
+            cdf = self._entries.get(key)
+            if cdf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cdf
+            self.misses += 1
+
+        cdf = self._compute_cdf(num_qubits, key[1], backend)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = cdf
+                self._used_bytes += cdf.nbytes
+            self._entries.move_to_end(key)
+            while self._used_bytes > self.budget_bytes and len(self._entries) > 1:
+                _old_key, old_cdf = self._entries.popitem(last=False)
+                self._used_bytes -= old_cdf.nbytes
+        return cdf
+
+    @staticmethod
+    def _compute_cdf(num_qubits, random_seed, backend=None):
+        gates = qnn_gates_for_seed(num_qubits, random_seed)
+        probs = get_backend(backend).probabilities(num_qubits, gates)
+        cdf = np.cumsum(probs)
+        cdf /= cdf[-1]  # guard against rounding drift
+        return cdf
+
+    def sample(self, num_qubits, random_seed, shots=1, rng=None, backend=None):
+        """
+        Draws `shots` outcomes in one vectorized call.
+        :return: NumPy int64 array of outcome indices
+        """
+        cdf = self.get_cdf(num_qubits, random_seed, backend)
+        rng = rng or np.random.default_rng()
+        return np.searchsorted(cdf, rng.random(shots), side="right")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self._used_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_default_cache = DistributionCache()
+
+
+def sample_qnn_bitstrings(num_qubits, random_seed, shots=1, rng=None, cache=None, backend=None):
+    """
+    Samples `shots` measured bitstrings of the seeded QNN circuit
+    without running the simulator.
+    :return: list of '0'/'1' strings of length `num_qubits`
+    """
+    cache = cache or _default_cache
+    outcomes = cache.sample(num_qubits, random_seed, shots, rng, backend)
+    return [format(int(o), f"0{num_qubits}b") for o in outcomes]
+
+
+def harvest_qnn_bitstrings(num_qubits, random_seed, shots=1, backend=None):
+    """
+    Returns `shots` measured bitstrings of the seeded QNN circuit, using
+    the cached exact distribution when it fits the budget, the selected
+    backend directly when it can still simulate the circuit (e.g. the
+    MPS backend chosen by simulation_planner), and a single multi-shot
+    job on the pre-transpiled Aer template otherwise.
+    :param backend: backend name/instance (default: qnn_backends.DEFAULT_BACKEND)
+    :return: list of '0'/'1' strings of length `num_qubits`
+    """
+    backend = get_backend(backend)
+    if backend.exact and _default_cache.supports(num_qubits):
+        return sample_qnn_bitstrings(num_qubits, random_seed, shots, backend=backend)
+    if backend.name != "aer" and backend.supports(num_qubits):
+        return backend.sample(num_qubits, qnn_gates_for_seed(num_qubits, random_seed), shots)
+
+    from qnn_model import bind_qnn_circuit, get_qnn_simulator
+    from quantum_random import iter_shot_bitstrings
+    measure_circuit = bind_qnn_circuit(num_qubits=num_qubits, random_seed=random_seed)
+    return list(islice(iter_shot_bitstrings(measure_circuit, shots=shots,
+                                            simulator=get_qnn_simulator()), shots))
+
+
+def get_default_cache():
+    """Returns the process-wide DistributionCache."""
+    return _default_cache
+
+
+def sampler_stats():
+    """Returns stats() of the shared distribution cache."""
+    return _default_cache.stats()
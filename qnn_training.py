@@ -1,12 +1,18 @@
 import os
-import random
 import time
 
+import numpy as np
+
+from training_pipeline import BATCH_SIZE, batch_pipeline
+
 # Paths to the text files (one password per line).
 ROCKYOU_FILE = os.path.join("datasets", "rockyou_dataset.txt")
 HIBP_FILE = os.path.join("datasets", "hibp_dataset.txt")
 # CRACKSTATION_FILE = os.path.join("datasets", "crackstation_dataset.txt")
 
+# Simulated cost of one vectorized training step (seconds per batch)
+STEP_SECONDS = 0.0001
+
 
 def load_dataset(file_path):
     """
@@ -41,48 +47,59 @@ def build_qnn_model():
     return model
 
 
-def train_qnn_model(model, dataset, epochs=3):
+def train_qnn_model(model, sources, epochs=3, batch_size=BATCH_SIZE, seed=None):
     """
-    Simulates training steps on the QNN model using the dataset.
+    Simulates training steps on the QNN model, streaming shuffled
+    mini-batches from the dataset files (see training_pipeline.py), so the
+    datasets never have to fit in memory.
+    :param sources: dataset file paths
+    :return: list of per-epoch dicts (samples, avg_loss, seconds, samples_per_second)
     """
-    data_size = len(dataset)
-    if data_size == 0:
-        print("[WARNING] Dataset is empty. No training performed.")
-        return
-
-    print(f"[INFO] Starting QNN training on {data_size} samples for {epochs} epochs.")
+    rng = np.random.default_rng(seed)
+    history = []
+    print(f"[INFO] Starting QNN training on {len(sources)} dataset files for {epochs} epochs "
+          f"(batch size {batch_size}).")
     for epoch in range(1, epochs + 1):
-        random.shuffle(dataset)  
+        epoch_seed = None if seed is None else seed + epoch
         total_loss = 0.0
-        for pwd in dataset:
-            loss = random.uniform(0.0, 1.0) * 0.01
-            total_loss += loss
-
-            time.sleep(0.0001)
-
-        avg_loss = total_loss / data_size
-        print(f"[EPOCH {epoch}] Average Loss: {avg_loss:.5f}")
+        samples = 0
+        start = time.perf_counter()
+        for passwords, features, lengths in batch_pipeline(sources, batch_size=batch_size, seed=epoch_seed):
+            loss = rng.random(len(passwords)) * 0.01
+            total_loss += float(loss.sum())
+            samples += len(passwords)
+
+            time.sleep(STEP_SECONDS)
+
+        if samples == 0:
+            print("[WARNING] Dataset is empty. No training performed.")
+            return history
+        seconds = time.perf_counter() - start
+        stats = {
+            "samples": samples,
+            "avg_loss": total_loss / samples,
+            "seconds": seconds,
+            "samples_per_second": samples / seconds if seconds > 0 else float("inf"),
+        }
+        history.append(stats)
+        print(f"[EPOCH {epoch}] Average Loss: {stats['avg_loss']:.5f} "
+              f"({samples} samples, {stats['samples_per_second']:.0f} samples/s)")
 
     print("[INFO] Training complete. Model parameters updated (simulation).")
+    return history
 
 
 def main():
-    # 1) Load each dataset
-    rockyou_data = load_dataset(ROCKYOU_FILE)
-    hibp_data = load_dataset(HIBP_FILE)
-    # crackstation_data = load_dataset(CRACKSTATION_FILE)
-
-    # 2) Combine into one big list
-    combined_data = rockyou_data + hibp_data #+ crackstation_data
-    print(f"[INFO] Total combined dataset size: {len(combined_data)}")
+    # 1) Dataset files, streamed batch by batch during training
+    sources = [ROCKYOU_FILE, HIBP_FILE]  # + [CRACKSTATION_FILE]
 
-    # 3) Build QNN model
+    # 2) Build QNN model
     qnn_model = build_qnn_model()
 
-    # 4) Train the QNN model
-    train_qnn_model(qnn_model, combined_data, epochs=3)
+    # 3) Train the QNN model
+    train_qnn_model(qnn_model, sources, epochs=3)
 
-    # 5) Done
+    # 4) Done
     print("[INFO] QNN training simulation finished.")
 
 
@@ -1,16 +1,28 @@
 # quantum_random.py
 """
 Generates a quantum-random bitstring using Qiskit's AerSimulator (modern approach).
+
+Besides the one-shot `quantum_random_bitstring`, this module offers a
+multi-shot harvesting mode: one Aer job with thousands of shots and
+`memory=True`, whose per-shot bitstrings are yielded lazily in order.
+`quantum_random_bitstring` and `quantum_random_block` pack Aer's text
+outcomes into a BitBuffer. The per-shot iterators (`iter_shot_bitstrings`,
+`harvest_quantum_bits`) yield Aer's '0'/'1' strings unchanged, one short
+string per shot, like the sample() methods in qnn_backends.py.
 """
 
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 
-def quantum_random_bitstring(num_bits=64):
+from bitbuffer import BitBuffer
+
+# Default number of shots per harvesting job
+HARVEST_SHOTS = 4096
+
+
+def _hadamard_circuit(num_bits):
     """
-    Generates a quantum random bitstring using Qiskit's AerSimulator.
-    :param num_bits: number of qubits/bits to measure
-    :return: a string of '0'/'1' of length `num_bits`
+    Builds the QRNG circuit: Hadamard + measurement on every qubit.
     """
     # 1) Create a quantum circuit with `num_bits` qubits + classical bits
     qc = QuantumCircuit(num_bits, num_bits)
@@ -23,12 +35,73 @@ def quantum_random_bitstring(num_bits=64):
     for i in range(num_bits):
         qc.measure(i, i)
 
+    return qc
+
+
+def quantum_random_bitstring(num_bits=64):
+    """
+    Generates a quantum random bitstring using Qiskit's AerSimulator.
+    :param num_bits: number of qubits/bits to measure
+    :return: BitBuffer of length `num_bits` (str() gives the '0'/'1' text)
+    """
+    qc = _hadamard_circuit(num_bits)
+
     # 4) Use AerSimulator instead of old `execute`
     simulator = AerSimulator()
-    job = simulator.run(qc, shots=1)
+    job = simulator.run(qc, shots=1, memory=True)
     result = job.result()
 
-    # 5) There will be exactly 1 measurement outcome since shots=1
-    counts = result.get_counts(qc)
-    measured_string = list(counts.keys())[0]  # e.g. "0101101101"
-    return measured_string
+    # 5) There is exactly 1 measurement outcome since shots=1
+    return BitBuffer.from_bitstring(result.get_memory(qc)[0])
+
+
+def iter_shot_bitstrings(circuit, shots=HARVEST_SHOTS, simulator=None):
+    """
+    Runs a measured circuit as ONE Aer job with `shots` shots and
+    `memory=True`, then yields every per-shot bitstring in shot order.
+    The job is only submitted when the first bitstring is requested.
+
+    :param circuit: a QuantumCircuit that already contains measurements
+    :param shots: number of shots in the job
+    :param simulator: optional AerSimulator to reuse across calls
+    :return: generator of '0'/'1' strings, one per shot
+    """
+    simulator = simulator or AerSimulator()
+    result = simulator.run(circuit, shots=shots, memory=True).result()
+    for bits in result.get_memory(circuit):
+        yield bits
+
+
+def harvest_quantum_bits(num_bits=16, shots=HARVEST_SHOTS, simulator=None):
+    """
+    Endless stream of `num_bits`-wide quantum-random bitstrings.
+    Each Aer job feeds `shots` values; a new job is only run once the
+    previous one has been fully consumed.
+
+    :param num_bits: width of every yielded bitstring (e.g. 16 for a QNN seed)
+    :param shots: number of shots per Aer job
+    :param simulator: optional AerSimulator to reuse across jobs
+    :return: generator of '0'/'1' strings of length `num_bits`
+    """
+    qc = _hadamard_circuit(num_bits)
+    simulator = simulator or AerSimulator()
+    while True:
+        yield from iter_shot_bitstrings(qc, shots=shots, simulator=simulator)
+
+
+def quantum_random_block(num_bits, width=32, simulator=None):
+    """
+    Generates `num_bits` quantum-random bits with a single Aer job by
+    measuring a `width`-qubit circuit over as many shots as needed.
+    :param num_bits: total number of bits wanted
+    :param width: qubits per shot
+    :param simulator: optional AerSimulator to reuse across calls
+    :return: BitBuffer of length `num_bits`
+    """
+    if num_bits <= 0:
+        return BitBuffer()
+    width = min(width, num_bits)
+    shots = -(-num_bits // width)  # ceil division
+    qc = _hadamard_circuit(width)
+    bits = BitBuffer.from_bitstring("".join(iter_shot_bitstrings(qc, shots=shots, simulator=simulator)))
+    return bits[:num_bits]
@@ -0,0 +1,144 @@
+# role_cache.py
+"""
+Per-user role lookups without a database round trip on the hot path.
+
+Two tiers, checked in order:
+
+  1) the signed session: the role is stamped into it at login (and again
+     after every lookup) together with the time it was read; a stamp is
+     trusted for `ttl` seconds unless the user was invalidated after it
+  2) an in-process LRU cache with the same TTL and a bounded number of users
+
+Only when both miss is `load_role(user_id)` called (the SELECT on users).
+invalidate() drops cached roles and revokes older session stamps; in
+multi-process deployments other workers still pick up the change at the
+latest after `ttl` seconds.
+"""
+
+import collections
+import threading
+import time
+
+ROLE_TTL_SECONDS = 60.0
+MAX_CACHED_USERS = 10000
+
+# Session keys
+SESSION_ROLE = "role"
+SESSION_ROLE_AT = "role_at"
+SESSION_USER = "user_id"
+
+
+class RoleCache:
+    """
+    TTL + LRU cache of user roles in front of `load_role`, with
+    optional session stamping.
+    """
+
+    def __init__(self, load_role, ttl=ROLE_TTL_SECONDS, maxsize=MAX_CACHED_USERS):
+        """
+        :param load_role: callable(user_id) -> role, e.g. the users table query
+        :param ttl: seconds a cached or session-stamped role is trusted
+        :param maxsize: users kept in the in-process cache (least recently used go first)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self._load_role = load_role
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()  # user_id -> (role, loaded_at)
+        self._invalidated = {}  # user_id -> time of the last invalidate(user_id)
+        self._invalidated_all = 0.0
+        self._lock = threading.Lock()
+        self._counters = collections.Counter()
+
+    def _revoked_after(self, user_id):
+        with self._lock:
+            return max(self._invalidated_all, self._invalidated.get(user_id, 0.0))
+
+    def stamp(self, session, user_id, role, at=None):
+        """
+        Stores the role in the session (call at login with the known role).
+        :param at: when the role was read (default: now)
+        """
+        session[SESSION_USER] = user_id
+        session[SESSION_ROLE] = role
+        session[SESSION_ROLE_AT] = time.time() if at is None else at
+
+    def get_role(self, user_id, session=None):
+        """
+        Role of `user_id`: from the session stamp, the cache or load_role.
+        :param session: the request's session (any mutable mapping) or None
+        """
+        now = time.time()
+        if session is not None and session.get(SESSION_USER) == user_id and SESSION_ROLE in session:
+            stamped_at = session.get(SESSION_ROLE_AT, 0.0)
+            if now - stamped_at < self.ttl and stamped_at > self._revoked_after(user_id):
+                with self._lock:
+                    self._counters["session_hits"] += 1
+                return session[SESSION_ROLE]
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self._counters["hits"] += 1
+                role, read_at = entry
+            else:
+                if entry is not None:
+                    del self._entries[user_id]
+                    self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                role = None
+
+        if role is None:
+            role, read_at = self._load_role(user_id), now
+            with self._lock:
+                # A concurrent invalidate() wins over a load that started before it
+                if self._invalidated.get(user_id, 0.0) <= now and self._invalidated_all <= now:
+                    self._entries[user_id] = (role, now)
+                    self._entries.move_to_end(user_id)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+                        self._counters["evictions"] += 1
+        if session is not None:
+            # Stamped with when the role was read from the database (a load is
+            # dated at its start, so an invalidate() during it revokes the stamp);
+            # re-stamping a cached role never extends its ttl
+            self.stamp(session, user_id, role, at=read_at)
+        return role
+
+    def invalidate(self, user_id=None):
+        """
+        Forgets the role of one user (None: of every user), in the cache and
+        in session stamps issued before now. Call after changing a role.
+        """
+        now = time.time()
+        with self._lock:
+            self._counters["invalidations"] += 1
+            if user_id is None:
+                self._entries.clear()
+                self._invalidated.clear()
+                self._invalidated_all = now
+            else:
+                self._entries.pop(user_id, None)
+                self._invalidated[user_id] = now
+                # Stamps older than the TTL are ignored anyway
+                for stale in [u for u, at in self._invalidated.items() if now - at > self.ttl]:
+                    del self._invalidated[stale]
+
+    def stats(self):
+        """Snapshot of the hit/miss counters and cache size."""
+        with self._lock:
+            lookups = self._counters["session_hits"] + self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "session_hits": self._counters["session_hits"],
+                "hits": self._counters["hits"],
+                "misses": self._counters["misses"],
+                "expired": self._counters["expired"],
+                "evictions": self._counters["evictions"],
+                "invalidations": self._counters["invalidations"],
+                "hit_rate": (lookups - self._counters["misses"]) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,233 @@
+# simulation_planner.py
+"""
+Cost-aware choice of simulation method for QRNG/QNN circuits.
+
+Estimates memory and run time of every applicable method from the qubit
+count, gate list (depth, entanglement across each cut, Clifford-ness) and
+shots, then picks the cheapest one within the configured budget:
+
+  - statevector: exact, but memory grows as 2**num_qubits
+  - matrix_product_state: memory grows with the bond dimension, which stays
+    tiny for nearest-neighbour circuits like build_qnn_circuit
+  - stabilizer: only for Clifford circuits (H, CX, RX/RZ by multiples of pi/2)
+
+Requests that no method can serve within budget are either rejected
+(SimulationBudgetError) or downgraded to fewer qubits and more shots,
+still harvesting the number of bits the caller needs. Widths above
+`max_qubits` are handled the same way before any gate list is built,
+so planning itself stays cheap however large the request. By default the
+cap is the bits the caller needs (at least MAX_QUBITS): one shot of a
+circuit that wide already yields them all, so wider never helps. Callers
+bound those bits themselves (the apps cap the password length).
+"""
+
+import math
+
+import numpy as np
+
+from qnn_backends import get_backend
+from qnn_gates import qnn_gates_for_seed, fused_qnn_gates
+
+# Default budgets (override per call or through the app config)
+MAX_MEMORY_BYTES = 256 * 1024 * 1024
+MAX_SECONDS = 2.0
+# Floor of the default width cap (see plan_qnn_simulation)
+MAX_QUBITS = 64
+
+# Rough per-operation costs (seconds), calibrated on Aer/NumPy on one core
+_SV_COST_PER_AMPLITUDE_GATE = 2e-9
+_MPS_COST_PER_BOND_OP = 1e-7
+_STABILIZER_COST_PER_OP = 1e-8
+_SAMPLE_COST_PER_BIT = 1e-7
+
+
+class SimulationBudgetError(ValueError):
+    """Raised when no simulation method fits the memory/time budget."""
+
+
+def analyze_gates(num_qubits, gates):
+    """
+    Summarizes a qnn_gates gate list for cost estimation.
+    :return: dict with depth, clifford flag and MPS bond-dimension bound
+    """
+    layer_of = [0] * num_qubits
+    crossings = [0] * max(num_qubits - 1, 0)
+    clifford = True
+    for gate in gates:
+        name = gate[0]
+        if name == "cx":
+            control, target = gate[1], gate[2]
+            layer = max(layer_of[control], layer_of[target]) + 1
+            layer_of[control] = layer_of[target] = layer
+            for cut in range(min(control, target), max(control, target)):
+                crossings[cut] += 1
+        elif name in ("rx", "rz", "if_rx"):
+            layer_of[gate[-1]] += 1
+            quarter_turns = gate[1] / (np.pi / 2)
+            if abs(quarter_turns - round(quarter_turns)) > 1e-9:
+                clifford = False
+        else:
+            # h, measure, reset act on gate[1]
+            layer_of[gate[1]] += 1
+
+    # Each two-qubit gate across a cut at most doubles its bond dimension,
+    # and a cut can never need more than the smaller side's Hilbert space.
+    max_log_bond = 0
+    for cut, count in enumerate(crossings):
+        max_log_bond = max(max_log_bond, min(count, cut + 1, num_qubits - cut - 1))
+
+    return {
+        "depth": max(layer_of, default=0),
+        "num_gates": len(gates),
+        "clifford": clifford,
+        "max_bond_dimension": 2 ** max_log_bond,
+    }
+
+
+def estimate_costs(num_qubits, gates, shots=1, per_shot=False):
+    """
+    Estimates memory (bytes) and time (seconds) of every applicable method.
+    :param per_shot: the circuit is re-simulated for every shot (mid-circuit
+                     measurement), instead of being sampled from one final state
+    :return: dict method -> {"memory_bytes": ..., "seconds": ...}
+    """
+    info = analyze_gates(num_qubits, gates)
+    num_gates = info["num_gates"] * (shots if per_shot else 1)
+    sampling = shots * num_qubits * _SAMPLE_COST_PER_BIT
+    costs = {}
+
+    # Statevector: 2**n complex128 amplitudes (+ half-size scratch buffers)
+    amplitudes = 2.0 ** num_qubits if num_qubits < 1000 else math.inf
+    costs["statevector"] = {
+        "memory_bytes": amplitudes * 16 * 2,
+        "seconds": num_gates * amplitudes * _SV_COST_PER_AMPLITUDE_GATE + sampling,
+    }
+
+    # MPS: one 2 x chi x chi tensor per qubit; gates and samples cost ~chi**3
+    chi = info["max_bond_dimension"]
+    costs["matrix_product_state"] = {
+        "memory_bytes": num_qubits * 2 * chi * chi * 16,
+        "seconds": (num_gates + shots * num_qubits) * chi ** 3 * _MPS_COST_PER_BOND_OP + sampling,
+    }
+
+    # Stabilizer tableau: 2n x 2n bits, each gate/measurement ~n operations
+    if info["clifford"]:
+        costs["stabilizer"] = {
+            "memory_bytes": (2 * num_qubits) ** 2 / 8,
+            "seconds": (num_gates + shots * num_qubits) * num_qubits * _STABILIZER_COST_PER_OP + sampling,
+        }
+    return costs
+
+
+def _backend_for(method, num_qubits, preferred):
+    if method == "statevector":
+        preferred = get_backend(preferred)
+        if preferred.name in ("numpy", "aer") and preferred.supports(num_qubits):
+            return preferred.name
+        return "aer"
+    return {"matrix_product_state": "aer_mps", "stabilizer": "aer_stabilizer"}[method]
+
+
+def plan_simulation(num_qubits, gates, shots=1, max_memory_bytes=MAX_MEMORY_BYTES,
+                    max_seconds=MAX_SECONDS, preferred_backend=None, per_shot=False):
+    """
+    Picks the cheapest method that fits both budgets.
+    :param preferred_backend: statevector backend to use when statevector wins
+    :param per_shot: see estimate_costs
+    :return: plan dict (method, backend, estimates) or None if nothing fits
+    """
+    candidates = []
+    for method, cost in estimate_costs(num_qubits, gates, shots, per_shot).items():
+        if cost["memory_bytes"] <= max_memory_bytes and cost["seconds"] <= max_seconds:
+            candidates.append((cost["seconds"], cost["memory_bytes"], method))
+    if not candidates:
+        return None
+
+    seconds, memory_bytes, method = min(candidates)
+    return {
+        "num_qubits": num_qubits,
+        "shots": shots,
+        "method": method,
+        "backend": _backend_for(method, num_qubits, preferred_backend),
+        "est_memory_bytes": memory_bytes,
+        "est_seconds": seconds,
+        "downgraded": False,
+    }
+
+
+def plan_qnn_simulation(num_qubits, random_seed=None, shots=1, max_memory_bytes=MAX_MEMORY_BYTES,
+                        max_seconds=MAX_SECONDS, on_over_budget="downgrade", preferred_backend=None,
+                        fused=False, seed_bits=16, max_qubits=None, total_bits=None):
+    """
+    Plans the QNN circuit of build_qnn_circuit(num_qubits, random_seed),
+    or with `fused=True` the fused QRNG + QNN circuit (one extra ancilla
+    qubit, re-simulated per shot; `random_seed` is then ignored).
+
+    :param on_over_budget: 'reject' raises SimulationBudgetError,
+                           'downgrade' retries with fewer qubits and
+                           enough shots for `total_bits`
+    :param max_qubits: widest circuit ever planned; wider requests are
+                       rejected or downgraded without building their gates
+                       (default: max(MAX_QUBITS, total_bits), or
+                       MAX_QUBITS when total_bits is not given)
+    :param total_bits: bits the caller needs (default num_qubits * shots);
+                       downgraded plans keep at least this many
+    :return: plan dict; plan["num_qubits"]/plan["shots"] may differ from
+             the request when downgraded, and plan["limited_by"] then says
+             why: 'max_qubits' (the width cap) or 'budget'
+    """
+    if num_qubits < 1:
+        raise ValueError("num_qubits must be at least 1.")
+    if shots < 1:
+        raise ValueError("shots must be at least 1.")
+    if on_over_budget not in ("reject", "downgrade"):
+        raise ValueError("on_over_budget must be 'reject' or 'downgrade'.")
+    if max_qubits is None:
+        max_qubits = MAX_QUBITS if total_bits is None else max(MAX_QUBITS, total_bits)
+    if total_bits is None:
+        total_bits = num_qubits * shots
+
+    def plan_for(qubits, qubit_shots):
+        if fused:
+            plan = plan_simulation(qubits + 1, fused_qnn_gates(qubits, seed_bits), qubit_shots,
+                                   max_memory_bytes, max_seconds, preferred_backend, per_shot=True)
+            if plan is not None:
+                plan["num_qubits"] = qubits  # report QNN width, not the ancilla
+            return plan
+        return plan_simulation(qubits, qnn_gates_for_seed(qubits, random_seed), qubit_shots,
+                               max_memory_bytes, max_seconds, preferred_backend)
+
+    limited_by = "max_qubits" if num_qubits > max_qubits else "budget"
+    if limited_by == "max_qubits":
+        if on_over_budget == "reject":
+            raise SimulationBudgetError(f"{num_qubits} qubits exceed the limit of {max_qubits}.")
+    else:
+        plan = plan_for(num_qubits, shots)
+        if plan is not None:
+            return plan
+        if on_over_budget == "reject":
+            raise SimulationBudgetError(
+                f"No simulation method fits {num_qubits} qubits x {shots} shots within "
+                f"{max_memory_bytes / 2**20:g} MB / {max_seconds:g} s."
+            )
+
+    # Binary search for the widest circuit that still fits
+    best = None
+    low, high = 1, min(num_qubits - 1, max_qubits)
+    while low <= high:
+        qubits = (low + high) // 2
+        plan = plan_for(qubits, math.ceil(total_bits / qubits))
+        if plan is None:
+            high = qubits - 1
+        else:
+            best, low = plan, qubits + 1
+    if best is None:
+        raise SimulationBudgetError(
+            f"No circuit width can produce {total_bits} bits within "
+            f"{max_memory_bytes / 2**20:g} MB / {max_seconds:g} s."
+        )
+    best["downgraded"] = True
+    best["requested_qubits"] = num_qubits
+    best["limited_by"] = limited_by
+    best["max_qubits"] = max_qubits
+    return best
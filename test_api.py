@@ -0,0 +1,83 @@
+import importlib
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def app1(tmp_path_factory):
+    # app1 builds its pool/writer at import time from the environment
+    env = {"DB_BACKEND": "sqlite", "QNN_BACKEND": "numpy", "STATS_FLUSH_SECONDS": "0.1",
+           "DB_SQLITE_FILE": str(tmp_path_factory.mktemp("db") / "api.sqlite3")}
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        module = importlib.import_module("app1")
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return module
+
+
+def test_ndjson_stream(app1):
+    client = app1.app.test_client()
+    response = client.post("/api/v1/passwords", json={"count": 30, "length": 10, "charset": ["digits"]})
+    assert response.status_code == 200 and response.mimetype == "application/x-ndjson"
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [r["index"] for r in records] == list(range(30))
+    assert all(len(r["password"]) == 10 and r["password"].isdigit() for r in records)
+    assert float(response.headers["X-Password-Entropy-Bits"]) == pytest.approx(10 * 3.3219, abs=0.01)
+
+
+def test_json_document_with_hashes(app1):
+    client = app1.app.test_client()
+    response = client.post("/api/v1/passwords", json={"count": 3, "sha3": True},
+                           headers={"Accept": "application/json"})
+    body = response.get_json()
+    assert response.status_code == 200 and body["count"] == 3 and body["symbols"] == 62
+    assert all(len(r["hashed_password"]) == 64 for r in body["passwords"])
+
+
+def test_batches_stay_within_planned_shots(app1, monkeypatch):
+    plans, shots = [], []
+    plan_qnn_simulation, run_fused_qnn = app1.plan_qnn_simulation, app1.run_fused_qnn
+
+    def plan_spy(*args, **kwargs):
+        plans.append(plan_qnn_simulation(*args, **kwargs))
+        return plans[-1]
+
+    def run_spy(num_qubits, count, **kwargs):
+        shots.append(count)
+        return run_fused_qnn(num_qubits, count, **kwargs)
+
+    monkeypatch.setattr(app1, "plan_qnn_simulation", plan_spy)
+    monkeypatch.setattr(app1, "run_fused_qnn", run_spy)
+    monkeypatch.setitem(app1.app.config, "API_BATCH_SIZE", 64)
+    response = app1.app.test_client().post("/api/v1/passwords", json={
+        "count": 100, "length": 12, "charset": ["lowercase", "uppercase", "digits", "symbols"]})
+    assert len(response.get_data(as_text=True).splitlines()) == 100
+    assert len(shots) == 2 and max(shots) <= plans[0]["shots"]
+
+
+@pytest.mark.parametrize("body", [
+    [1],
+    {"count": 0},
+    {"count": 10 ** 6},
+    {"length": "twelve"},
+    {"num_qubits": 0},
+    {"charset": ["emoji"]},
+    {"charset": []},
+])
+def test_invalid_requests_are_rejected(app1, body):
+    response = app1.app.test_client().post("/api/v1/passwords", json=body)
+    assert response.status_code == 400 and "error" in response.get_json()
+
+
+def test_over_budget_is_rejected_before_streaming(app1, monkeypatch):
+    monkeypatch.setitem(app1.app.config, "QNN_OVER_BUDGET", "reject")
+    response = app1.app.test_client().post("/api/v1/passwords", json={"num_qubits": 10 ** 7})
+    assert response.status_code == 400 and "Request rejected" in response.get_json()["error"]
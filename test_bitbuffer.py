@@ -0,0 +1,30 @@
+import numpy as np
+
+from bitbuffer import BitBuffer, as_bitbuffer
+
+
+def test_round_trips_with_text():
+    text = "1011001110001111010"
+    bits = BitBuffer.from_bitstring(text)
+    assert len(bits) == 19 and str(bits) == text
+    assert bits == text and hash(bits) == hash(text)
+    assert str(bits + "01") == text + "01"
+
+
+def test_slices_are_zero_copy_views():
+    data = np.array([0b10110011, 0b10001111], dtype=np.uint8)
+    bits = BitBuffer(data)
+    view = bits[3:13]
+    assert str(view) == "1001110001"
+    assert np.shares_memory(view._data, data)
+    assert view[0] == 1 and view[-1] == 1
+    assert view.uint(0, 4) == 0b1001
+
+
+def test_uints_and_bytes():
+    values = np.array([5, 0, 1023, 77])
+    bits = BitBuffer.from_uints(values, 10)
+    assert str(bits) == "".join(format(v, "010b") for v in values)
+    assert bits.to_uints(10).tolist() == values.tolist()
+    assert as_bitbuffer(b"\xf0\x0f").to_bytes() == b"\xf0\x0f"
+    assert as_bitbuffer(np.array([True, False, True])) == "101"
@@ -0,0 +1,24 @@
+import random
+import string
+
+from breach_filter import BreachFilter, build_breach_filter
+
+
+def test_filter_has_no_false_negatives_and_bounded_fp(tmp_path):
+    rng = random.Random(3)
+    corpus = ["".join(rng.choices(string.ascii_letters, k=10)) for _ in range(20000)]
+    first, second = tmp_path / "rockyou.txt", tmp_path / "hibp.txt"
+    first.write_text("\n".join(corpus[:15000]) + "\n\n", encoding="utf-8")
+    second.write_text("\n".join(corpus[15000:]) + "\n", encoding="utf-8")
+    output = str(tmp_path / "breach.bin")
+
+    info = build_breach_filter((str(first), str(second)), output, fp_rate=0.01)
+    assert info["num_items"] == len(corpus)
+
+    breach_filter = BreachFilter(output)
+    try:
+        assert all(breach_filter.contains_many(corpus))
+        probes = ["".join(rng.choices(string.digits, k=12)) for _ in range(20000)]
+        assert sum(breach_filter.contains_many(probes)) / len(probes) < 0.02
+    finally:
+        breach_filter.close()
@@ -0,0 +1,40 @@
+import hashlib
+
+import breach_store
+from breach_store import DigestStore, build_digest_store
+
+
+def test_store_lookups_are_exact(tmp_path, monkeypatch):
+    monkeypatch.setattr(breach_store, "RUN_ITEMS", 64)  # force several sorted runs
+    words = [f"user{i:04d}pw" for i in range(500)]
+    plain, hibp = tmp_path / "rockyou.txt", tmp_path / "pwned.txt"
+    plain.write_text("\n".join(words[:400] + words[:50]) + "\n", encoding="utf-8")
+    hibp.write_text("\n".join(hashlib.sha1(w.encode()).hexdigest().upper() + ":3" for w in words[400:]),
+                    encoding="utf-8")
+    output = str(tmp_path / "store.bin")
+
+    info = build_digest_store((str(plain),), output, "sha1", hibp_hash_files=(str(hibp),))
+    assert info["count"] == len(words)  # duplicates dropped across runs
+
+    store = DigestStore(output)
+    try:
+        assert all(word in store for word in words)
+        assert "user9999pw" not in store and "" not in store
+        assert store.contains_many(["user0001pw", "nope", "user0450pw"]) == [True, False, True]
+        assert store.contains_hex(hashlib.sha1(b"user0123pw").hexdigest())
+    finally:
+        store.close()
+
+
+def test_sha3_store_matches_sha3_hash_password(tmp_path):
+    from password_generation import sha3_hash_password
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("qwerty\nletmein\n", encoding="utf-8")
+    output = str(tmp_path / "sha3.bin")
+    build_digest_store((str(corpus),), output, "sha3_256")
+    store = DigestStore(output)
+    try:
+        assert store.contains_hex(sha3_hash_password("letmein"))
+        assert not store.contains_hex(sha3_hash_password("letmein!"))
+    finally:
+        store.close()
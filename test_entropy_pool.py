@@ -0,0 +1,60 @@
+import time
+import pytest
+
+from entropy_pool import EntropyPool
+
+
+def counting_harvest(num_bits):
+    """Deterministic stand-in for the Aer QRNG: alternating bits."""
+    return ("01" * (num_bits // 2 + 1))[:num_bits]
+
+
+def wait_for_fill(pool, bits, timeout=2.0):
+    deadline = time.time() + timeout
+    while pool.stats()["fill_bits"] < bits and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_pool_refills_to_high_watermark():
+    """Background thread tops the pool up to the high watermark."""
+    pool = EntropyPool(capacity_bits=4096, low_watermark=1024, high_watermark=2048,
+                       block_bits=256, harvest=counting_harvest)
+    pool.start()
+    try:
+        wait_for_fill(pool, 2048)
+        stats = pool.stats()
+        assert 2048 <= stats["fill_bits"] <= 4096
+        assert stats["refill_rate_bps"] > 0
+    finally:
+        pool.stop()
+
+
+def test_pool_serves_bits_without_reuse():
+    """Bits are removed from the buffer as they are served."""
+    pool = EntropyPool(capacity_bits=1024, low_watermark=512, block_bits=1024,
+                       harvest=counting_harvest)
+    pool.start()
+    try:
+        wait_for_fill(pool, 1024)
+        first = pool.get_bits(16)
+        second = pool.get_bits(16)
+        assert len(first) == len(second) == 16
+        assert set(str(first)) <= {"0", "1"}
+        assert pool.stats()["fill_bits"] == 1024 - 32
+        assert pool.stats()["misses"] == 0
+    finally:
+        pool.stop()
+
+
+def test_pool_miss_falls_back_to_direct_harvest():
+    """An empty pool still answers, and the miss is counted."""
+    pool = EntropyPool(capacity_bits=64, low_watermark=0, block_bits=64,
+                       harvest=counting_harvest)
+    bits = pool.get_bits(40)
+    assert len(bits) == 40
+    assert pool.stats()["misses"] == 1
+
+
+def test_pool_rejects_bad_watermarks():
+    with pytest.raises(ValueError):
+        EntropyPool(capacity_bits=100, low_watermark=200)
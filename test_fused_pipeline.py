@@ -0,0 +1,63 @@
+import numpy as np
+
+import fused_pipeline
+from bitbuffer import BitBuffer
+from fused_pipeline import run_fused_qnn
+from qnn_backends import AerMPSBackend
+from qnn_sampler import DistributionCache
+
+
+class RecordingCache(DistributionCache):
+    """Returns a fixed outcome per seed and records how often each seed is sampled."""
+
+    def __init__(self, outcome_of_seed):
+        super().__init__()
+        self.outcome_of_seed = outcome_of_seed
+        self.calls = []
+
+    def sample(self, num_qubits, random_seed, shots=1, rng=None, backend=None):
+        self.calls.append((str(random_seed), shots))
+        return np.full(shots, self.outcome_of_seed[str(random_seed)], dtype=np.int64)
+
+
+class FixedMemoryAer(AerMPSBackend):
+    def __init__(self, memory):
+        self.memory = memory
+
+    def run_memory(self, circuit, shots=1):
+        return self.memory[:shots]
+
+
+def test_exact_path_groups_per_shot_seeds(monkeypatch):
+    cache = RecordingCache({"0000": 0b00, "1111": 0b11, "1010": 0b01})
+    monkeypatch.setattr(fused_pipeline, "get_default_cache", lambda: cache)
+    drawn = []
+
+    def seed_source(num_bits):
+        drawn.append(num_bits)
+        return BitBuffer.from_bitstring("0000" "1111" "0000" "1010")
+
+    fused = run_fused_qnn(2, shots=4, seed_bits=4, backend="numpy", seed_source=seed_source)
+    assert drawn == [16]  # one draw for all shots
+    assert [str(s) for s in fused["seeds"]] == ["0000", "1111", "0000", "1010"]
+    assert sorted(cache.calls) == [("0000", 2), ("1010", 1), ("1111", 1)]
+    assert [str(o) for o in fused["outcomes"]] == ["00", "11", "00", "01"]
+    assert str(fused["bits"]) == "00110001"
+    assert fused["simulator_jobs"] == 0
+
+
+def test_exact_path_counts_the_seed_job_without_seed_source():
+    fused = run_fused_qnn(3, shots=5, backend="numpy")
+    assert fused["simulator_jobs"] == 1
+    assert len(fused["seeds"]) == 5 and all(len(s) == 16 for s in fused["seeds"])
+    assert len(fused["bits"]) == 15
+
+
+def test_aer_path_splits_seed_then_outcome_bits():
+    # Each memory string reads seed (first seed_bits chars) + QNN outcome
+    backend = FixedMemoryAer(["1010" "011", "0001" "100"])
+    fused = run_fused_qnn(3, shots=2, seed_bits=4, backend=backend)
+    assert [str(s) for s in fused["seeds"]] == ["1010", "0001"]
+    assert [str(o) for o in fused["outcomes"]] == ["011", "100"]
+    assert str(fused["bits"]) == "011100"
+    assert fused["simulator_jobs"] == 1
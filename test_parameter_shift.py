@@ -0,0 +1,31 @@
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
+
+from parameter_shift import (counts_to_bits, expectations_from_counts, parameter_shift_gradient,
+                             shifted_parameter_values, z_expectation)
+
+
+def test_shifted_values_layout():
+    shifted = shifted_parameter_values([0.1, 0.2])
+    assert np.allclose(shifted, [[0.1 + np.pi / 2, 0.2], [0.1 - np.pi / 2, 0.2],
+                                 [0.1, 0.2 + np.pi / 2], [0.1, 0.2 - np.pi / 2]])
+
+
+def test_expectations_follow_aer_bit_order():
+    assert counts_to_bits(["01 1"]).tolist() == [[1, 1, 0]]
+    counts = [{"01": 3, "00": 1}, {"10": 2}]
+    assert np.allclose(expectations_from_counts(counts, z_expectation(0)), [-0.5, 1.0])
+    assert np.allclose(expectations_from_counts(counts, z_expectation(1)), [1.0, -1.0])
+
+
+def test_gradient_matches_analytic_value():
+    theta = ParameterVector("t", 2)
+    qc = QuantumCircuit(2)
+    qc.ry(theta[0], 0)
+    qc.rx(theta[1], 1)
+    qc.measure_all()
+    # <Z_0> = cos(t0), independent of t1
+    grad = parameter_shift_gradient(qc, [0.7, 1.1], shots=20000)
+    assert abs(grad[0] + np.sin(0.7)) < 0.05
+    assert abs(grad[1]) < 0.05
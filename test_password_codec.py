@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from password_codec import CODE_BITS, PASSWORD_CHARS, decode_measurements, encode_passwords
+
+
+def test_round_trip_keeps_every_symbol():
+    passwords = ["abcdefgh1234", "#$%^&*()ABCD", "Xp5&Z@Y8q3L", "a"]
+    rows = encode_passwords(passwords, 12)
+    assert rows.shape == (4, 84)
+    assert decode_measurements(rows) == passwords
+    assert decode_measurements(["".join(map(str, row)) for row in rows]) == passwords
+
+
+def test_symbols_do_not_share_codes_with_letters():
+    rows = encode_passwords(list(PASSWORD_CHARS), 1)
+    assert len({tuple(row) for row in rows}) == len(PASSWORD_CHARS) == 72
+
+
+def test_out_of_charset_codes_are_dropped_and_tail_is_decoded():
+    # 127 (no character), 1 ('b'), then a 2-bit tail 0b10 ('c')
+    bits = np.array([[1] * CODE_BITS + [0, 0, 0, 0, 0, 0, 1] + [1, 0]], dtype=np.uint8)
+    assert decode_measurements(bits) == ["bc"]
+
+
+def test_unknown_characters_are_rejected():
+    with pytest.raises(ValueError):
+        encode_passwords(["pass word"], 12)
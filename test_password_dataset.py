@@ -0,0 +1,65 @@
+import collections
+import os
+
+from password_dataset import build_password_dataset, compiled_path, open_password_dataset
+from pattern_finder import iter_passwords_from_txt, load_passwords_from_txt
+
+
+def _write_dump(path):
+    lines = ["123456", "password", "héllo", "123456", "", "  abc  ", "qwerty", "123456", "zzz", "ééé"]
+    path.write_text("\n".join(lines * 20) + "\n", encoding="utf-8")
+
+
+def test_round_trip_with_spills(tmp_path):
+    dump = tmp_path / "dump.txt"
+    _write_dump(dump)
+    summary = build_password_dataset(str(dump), spill_items=2)
+    assert summary["output_file"] == compiled_path(str(dump))
+
+    dataset = open_password_dataset(str(dump))
+    exact = collections.Counter(iter_passwords_from_txt(str(dump), compiled=False))
+    assert dict(dataset.iter_counts()) == exact
+    assert collections.Counter(iter_passwords_from_txt(str(dump), compiled=True)) == exact
+    assert len(dataset) == len(exact) and dataset.total == sum(exact.values())
+
+    assert list(dataset.of_length(6)) == ["123456", "qwerty"]
+    assert dataset.of_length(6).byte_matrix().shape == (2, 6)
+    assert dataset.of_length(3).byte_matrix() is None  # "ééé" is not ASCII
+    assert "héllo" in dataset and "hello" not in dataset
+    assert list(dataset.of_length(42)) == []
+
+
+def test_text_order_is_kept_unless_compiled_is_requested(tmp_path):
+    dump = tmp_path / "dump.txt"
+    _write_dump(dump)
+    build_password_dataset(str(dump))
+    head = ["123456", "password", "héllo", "123456", "abc"]
+    assert list(iter_passwords_from_txt(str(dump)))[:5] == head
+    assert load_passwords_from_txt(str(dump))[:5] == head
+    assert load_passwords_from_txt(str(dump), compiled=True)[:3] == ["abc"] * 3
+
+
+def test_rebuild_replaces_and_closes_the_cached_copy(tmp_path):
+    dump = tmp_path / "dump.txt"
+    _write_dump(dump)
+    build_password_dataset(str(dump))
+    old = open_password_dataset(str(dump))
+    passwords = iter(old)
+    first = next(passwords)
+
+    build_password_dataset(str(dump), spill_items=2)
+    stat = os.stat(compiled_path(str(dump)))
+    os.utime(compiled_path(str(dump)), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    new = open_password_dataset(str(dump))
+    assert new is not old and open_password_dataset(str(dump)) is new
+    assert list(old.of_length(6)) == []  # closed
+    assert [first, *passwords] == list(new)  # started iterations still finish
+
+
+def test_stale_copy_is_ignored(tmp_path):
+    dump = tmp_path / "dump.txt"
+    _write_dump(dump)
+    build_password_dataset(str(dump))
+    stat = os.stat(dump)
+    os.utime(dump, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert open_password_dataset(str(dump)) is None
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from password_generation import (
+    bits_to_password, generate_passwords, iter_password_batches, passwords_to_strings, symbol_bit_width,
+)
+
+
+def test_every_symbol_equally_likely():
+    """Each in-range value maps to exactly one symbol; out-of-range values are dropped."""
+    symbols = "abcdefghij"  # 10 symbols -> 4 bits, values 10..15 rejected
+    every_value = "".join(format(v, "04b") for v in range(16))
+    passwords = generate_passwords(1, 10, symbols, bits=every_value)
+    assert passwords_to_strings(passwords) == [symbols]
+
+
+def test_input_formats_agree():
+    rng = np.random.default_rng(7)
+    packed = rng.integers(0, 256, size=64, dtype=np.uint8)
+    bitstring = "".join(format(b, "08b") for b in packed)
+    unpacked = np.unpackbits(packed).astype(bool)
+    results = [generate_passwords(4, 8, bits=source) for source in (packed, packed.tobytes(), bitstring, unpacked)]
+    for result in results[1:]:
+        assert np.array_equal(result, results[0])
+
+
+def test_bits_are_never_reused():
+    with pytest.raises(ValueError):
+        generate_passwords(1, 12, bits="0101")
+    drawn = []
+    password = bits_to_password("0101", 12, "01", more_bits=lambda n: drawn.append(n) or "1" * n)
+    assert password == "0101" + "1" * 8 and drawn
+
+
+def test_batch_shape_and_width():
+    assert symbol_bit_width(76) == 7 and symbol_bit_width(64) == 6 and symbol_bit_width(2) == 1
+    passwords = generate_passwords(1000, 16, bits=np.random.default_rng().bytes(30000))
+    assert passwords.shape == (1000, 16)
+    assert all(len(p) == 16 for p in passwords_to_strings(passwords))
+
+
+def test_password_batches_draw_one_block_per_batch():
+    requests = []
+
+    def source(num_bits):
+        requests.append(num_bits)
+        return np.random.default_rng(len(requests)).integers(0, 2, num_bits, dtype=np.uint8)
+
+    batches = list(iter_password_batches(10, 8, "0123456789", bit_source=source, batch_size=4,
+                                         more_bits=lambda n: "0" * n))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert len(requests) == 3
+    assert all(len(p) == 8 and set(p) <= set("0123456789") for batch in batches for p in batch)
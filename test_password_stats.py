@@ -0,0 +1,61 @@
+import sqlite3
+
+from password_stats import PasswordStats, charset_bucket, entropy_bucket, password_buckets
+from persistence import ConnectionPool, SQLiteBackend, WriteBehindWriter
+
+
+def test_charset_and_entropy_buckets():
+    assert charset_bucket("abc123") == "lower+digit"
+    assert charset_bucket("Ab!") == "lower+upper+symbol"
+    assert entropy_bucket(71.4) == "64"
+
+
+def test_record_updates_every_aggregate():
+    stats = PasswordStats()
+    day = 86400 * 20000
+    stats.record(1, "abcdefgh", 26, at=day)
+    stats.record(1, "Abcdefgh12", 62, shared_key="0110" * 10, at=day)
+    stats.record(2, "abcdefgh", 26, shared_key="01" * 10, at=day + 86400)
+
+    snap = stats.snapshot()
+    assert snap["total"] == 3 and snap["users"] == 2
+    assert snap["top_users"][0] == ("1", 2)
+    assert sorted(snap["per_day"].values()) == [1, 2]
+    assert snap["length"] == {"8": 2, "10": 1}
+    assert snap["charset"] == {"lower": 2, "lower+upper+digit": 1}
+    assert snap["classical_entropy"] == {"32": 2, "48": 1}
+    assert snap["qkd_key_length"]["count"] == 2
+    assert (snap["qkd_key_length"]["min"], snap["qkd_key_length"]["max"]) == (20, 40)
+    assert stats.count("user", 2) == 1
+
+
+def test_flush_adds_deltas_and_load_restores(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    pool = ConnectionPool(SQLiteBackend(path))
+    first = PasswordStats(pool)
+    first.record(1, "abc", 26)
+    assert first.flush()
+    first.record(1, "abcd", 26)
+    first.close()
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count FROM password_stats WHERE metric = 'total'").fetchone() == (2,)
+
+    second = PasswordStats(pool)
+    second.load()
+    assert second.count("total") == 2
+    assert second.snapshot()["length"] == {"3": 1, "4": 1}
+
+
+def test_only_committed_rows_are_counted(tmp_path):
+    pool = ConnectionPool(SQLiteBackend(str(tmp_path / "db.sqlite3")))
+    stats = PasswordStats()
+    writer = WriteBehindWriter(pool, "passwords3", ("user_id", "hashed_password", "shared_key"),
+                               batch_size=1, max_retries=0, on_written=stats.add_written)
+    writer.submit((1, "hash", None), password_buckets(1, "abcdef", 26))
+    writer.submit((1, None, None), password_buckets(1, "abcdefgh", 26))  # NOT NULL violation
+    writer.submit((2, "hash", None))  # no statistics for this row
+    writer.close()
+    assert writer.stats()["failed"] == 1
+    assert stats.count("total") == 1
+    assert stats.snapshot()["length"] == {"6": 1}
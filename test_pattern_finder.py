@@ -0,0 +1,55 @@
+import collections
+import random
+
+from pattern_finder import SpaceSaving, iter_passwords_from_txt, parallel_common_patterns, stream_common_patterns
+
+
+def test_space_saving_bounds_hold():
+    rng = random.Random(5)
+    stream = rng.choices([f"pw{i}" for i in range(2000)],
+                         weights=[1 / (i + 1) for i in range(2000)], k=50000)
+    sketch = SpaceSaving(200)
+    for item in stream:
+        sketch.add(item)
+    exact = collections.Counter(stream)
+    true_top = {item for item, _count in exact.most_common(10)}
+    for item, count, error, guaranteed in sketch.top(10):
+        assert exact[item] <= count <= exact[item] + error
+        assert error <= len(stream) // 200
+        if guaranteed:
+            assert item in true_top
+
+
+def test_streaming_mode_writes_top_n(tmp_path):
+    source = tmp_path / "rockyou.txt"
+    source.write_text("123456\nqwerty\n123456\n\nletmein\n123456\nqwerty\n", encoding="utf-8")
+    output = tmp_path / "patterns.txt"
+    top = stream_common_patterns(top_n=2, capacity=10, sources=(str(source),), output_file=str(output))
+    assert [entry[:2] for entry in top] == [("123456", 3), ("qwerty", 2)]
+    assert output.read_text(encoding="utf-8").split() == ["123456", "qwerty"]
+
+
+def test_parallel_mode_is_exact_across_chunks_and_spills(tmp_path):
+    rng = random.Random(11)
+    sources = []
+    for name in ("a.txt", "b.txt"):
+        path = tmp_path / name
+        lines = rng.choices([f"pw{i}" for i in range(300)], weights=[1 / (i + 1) for i in range(300)], k=5000)
+        path.write_text("\n".join(lines) + "\n\n  pw7  \n", encoding="utf-8")
+        sources.append(str(path))
+    exact = collections.Counter(line.strip() for path in sources
+                                for line in open(path, encoding="utf-8") if line.strip())
+
+    top = parallel_common_patterns(top_n=20, workers=2, sources=sources, output_file=str(tmp_path / "out.txt"),
+                                   chunk_bytes=997, num_shards=4, spill_items=25, spill_dir=str(tmp_path))
+    assert top == sorted(exact.items(), key=lambda entry: (-entry[1], entry[0]))[:20]
+
+
+def test_parallel_mode_splits_carriage_returns_like_text_mode(tmp_path):
+    source = tmp_path / "cr.txt"
+    source.write_bytes(b"abc\rdef\nabc\r\nabc\n\r\nx\ty\n")
+    exact = collections.Counter(iter_passwords_from_txt(str(source), compiled=False))
+    assert exact == {"abc": 3, "def": 1, "x\ty": 1}
+    top = parallel_common_patterns(top_n=10, workers=1, sources=[str(source)], output_file=str(tmp_path / "out.txt"),
+                                   num_shards=1, spill_dir=str(tmp_path))
+    assert top == [("abc", 3), ("def", 1), ("x\ty", 1)]
@@ -0,0 +1,22 @@
+from pattern_matcher import PatternMatcher, get_pattern_matcher
+
+
+def test_reports_every_overlapping_pattern_with_offsets():
+    matcher = PatternMatcher(["qwerty", "qwerty123", "erty", "1234"], fold_case=False, leet=False)
+    found = [(m["pattern"], m["start"], m["end"]) for m in matcher.find_all("xqwerty1234")]
+    assert found == [("qwerty", 1, 7), ("erty", 3, 7), ("qwerty123", 1, 10), ("1234", 7, 11)]
+    assert not matcher.contains_any("qwert")
+
+
+def test_leetspeak_and_case_normalization():
+    matcher = PatternMatcher(["password", "dragon"])
+    (match,) = matcher.find_all("Zy7P@SSw0rd!")
+    assert match["pattern"] == "password" and match["matched"] == "P@SSw0rd"
+    assert PatternMatcher(["password"], leet=False).find_all("P@ssw0rd") == []
+
+
+def test_batch_scan_of_common_patterns_file():
+    matcher = get_pattern_matcher("common_patterns.txt")
+    assert get_pattern_matcher("common_patterns.txt") is matcher  # compiled once
+    hits = list(matcher.scan_many(["Xk9#mQ2v", "my-Dr4g0n-pw", "Zq8&Lw3t"], only_hits=True))
+    assert [index for index, _password, _matches in hits] == [1]
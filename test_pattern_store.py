@@ -0,0 +1,38 @@
+import collections
+import random
+
+from pattern_store import PatternStore
+
+
+def _write_dump(path, rng, count):
+    words = [f"pw{i}" for i in range(400)]
+    lines = rng.choices(words, weights=[1 / (i + 1) for i in range(400)], k=count)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+
+def test_deltas_match_full_recount(tmp_path):
+    rng = random.Random(2)
+    store = PatternStore(str(tmp_path / "store"), top_capacity=30, spill_items=50)
+    exact = collections.Counter()
+    for i in range(4):
+        dump = tmp_path / f"dump{i}.txt"
+        exact.update(_write_dump(dump, rng, 3000))
+        assert store.ingest(str(dump))["skipped"] is False
+
+        reopened = PatternStore(str(tmp_path / "store"))
+        ranked = sorted(exact.items(), key=lambda entry: (-entry[1], entry[0]))
+        assert reopened.top(30) == ranked[:30]
+        assert reopened.top(60) == ranked[:60]
+        assert reopened.stats()["unique"] == len(exact)
+        assert reopened.count("pw3") == exact["pw3"]
+        assert reopened.count("missing") == 0
+
+
+def test_same_dump_is_ingested_once(tmp_path):
+    dump = tmp_path / "dump.txt"
+    _write_dump(dump, random.Random(4), 100)
+    store = PatternStore(str(tmp_path / "store"))
+    store.ingest(str(dump))
+    assert store.ingest(str(dump)) == {"source": str(dump), "skipped": True}
+    assert store.stats()["total_lines"] == 100
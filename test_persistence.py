@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+import pytest
+
+from persistence import (ConnectionPool, PoolTimeout, SQLiteBackend, WriteBehindWriter, WriteQueueFull,
+                         fetch_keyset_page, iter_keyset)
+
+
+def _count(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_rows_are_written_in_batches_and_drained_on_close(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    pool = ConnectionPool(SQLiteBackend(path), size=2)
+    writer = WriteBehindWriter(pool, "passwords3", ("user_id", "hashed_password", "shared_key"),
+                               batch_size=50, flush_seconds=10)
+    for i in range(520):
+        writer.submit((i, f"hash{i}", None))
+    assert writer.flush(timeout=5)
+    assert _count(path, "passwords3") == 520
+    assert writer.stats()["batches"] <= 12
+
+    writer.submit((1, "last", "key"))
+    writer.close()
+    assert _count(path, "passwords3") == 521
+    assert writer.stats()["written"] == 521
+
+
+def test_time_trigger_flushes_partial_batch(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    writer = WriteBehindWriter(ConnectionPool(SQLiteBackend(path)), "passwords2", ("hashed_password",),
+                               batch_size=100, flush_seconds=0.05)
+    writer.submit(("abc",))
+    time.sleep(0.5)
+    assert _count(path, "passwords2") == 1
+    writer.close()
+
+
+def test_failed_batches_are_counted_and_release_locks(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    writer = WriteBehindWriter(ConnectionPool(SQLiteBackend(path)), "passwords3",
+                               ("user_id", "hashed_password", "shared_key"), max_retries=0, flush_seconds=0.01)
+    writer.submit((1, None, None))  # hashed_password is NOT NULL
+    writer.flush()
+    assert writer.stats()["failed"] == 1
+    with sqlite3.connect(path, timeout=1) as conn:
+        conn.execute("INSERT INTO users (id, role) VALUES (1, 'admin')")
+    writer.close()
+
+
+def test_backpressure_and_pool_timeout(tmp_path):
+    pool = ConnectionPool(SQLiteBackend(str(tmp_path / "db.sqlite3")), size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+
+        # The only connection stays busy, so nothing drains the queue
+        pool.timeout = 5
+        writer = WriteBehindWriter(pool, "passwords2", ("hashed_password",), batch_size=1,
+                                   max_pending=2, put_timeout=0.05, max_retries=0)
+        with pytest.raises(WriteQueueFull):
+            for i in range(10):
+                writer.submit((str(i),))
+    writer.close()
+
+
+def test_keyset_pages_walk_both_directions(tmp_path):
+    path = str(tmp_path / "db.sqlite3")
+    pool = ConnectionPool(SQLiteBackend(path))
+    with pool.connection() as conn:
+        conn.cursor().executemany("INSERT INTO passwords3 (user_id, hashed_password) VALUES (?, ?)",
+                                  [(1, f"hash{i}") for i in range(25)])
+
+    rows, has_more = fetch_keyset_page(pool, "passwords3", ("id", "hashed_password"), 10)
+    assert [r[0] for r in rows] == list(range(1, 11)) and has_more
+    rows, has_more = fetch_keyset_page(pool, "passwords3", ("id",), 10, after=20)
+    assert [r[0] for r in rows] == list(range(21, 26)) and not has_more
+    rows, has_more = fetch_keyset_page(pool, "passwords3", ("id",), 10, before=11)
+    assert [r[0] for r in rows] == list(range(1, 11)) and not has_more
+
+    assert [r[0] for r in iter_keyset(pool, "passwords3", ("id",), batch_size=7)] == list(range(1, 26))
+    assert [r[0] for r in iter_keyset(pool, "passwords3", ("id",), batch_size=7, after=22)] == [23, 24, 25]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from qnn_backends import get_backend, NumpyBackend
+from qnn_gates import qnn_gates_for_seed, qrng_gates
+from fused_pipeline import run_fused_qnn
+
+qiskit_aer = pytest.importorskip("qiskit_aer")
+
+
+@pytest.mark.parametrize("num_qubits,seed", [
+    (1, None),
+    (3, "1011"),
+    (6, "1011001110001111"),
+    (8, "0000111101011010"),
+])
+def test_numpy_and_aer_distributions_match(num_qubits, seed):
+    """Both backends produce the same exact QNN output distribution."""
+    gates = qnn_gates_for_seed(num_qubits, seed)
+    numpy_probs = get_backend("numpy").probabilities(num_qubits, gates)
+    aer_probs = get_backend("aer").probabilities(num_qubits, gates)
+    assert np.allclose(numpy_probs, aer_probs, atol=1e-9)
+
+
+def test_numpy_and_aer_samples_agree():
+    """Empirical frequencies from both backends agree within sampling noise."""
+    num_qubits, seed, shots = 4, "1100101000110101", 20000
+    gates = qnn_gates_for_seed(num_qubits, seed)
+    freqs = []
+    for name in ("numpy", "aer"):
+        outcomes = get_backend(name).sample(num_qubits, gates, shots=shots)
+        freqs.append(np.bincount([int(b, 2) for b in outcomes], minlength=2 ** num_qubits) / shots)
+    assert np.abs(freqs[0] - freqs[1]).max() < 0.03
+
+
+def test_numpy_qrng_is_uniform():
+    probs = NumpyBackend().probabilities(4, qrng_gates(4))
+    assert np.allclose(probs, 1 / 16)
+    bits = get_backend("numpy").random_bits(1000)
+    assert len(bits) == 1000 and set(str(bits)) <= {"0", "1"}
+
+
+def test_fused_circuit_matches_seeded_qnn():
+    """The fused dynamic circuit reproduces the seeded QNN for every seed it draws."""
+    num_qubits, seed_bits, shots = 2, 4, 16000
+    fused = run_fused_qnn(num_qubits, shots, seed_bits=seed_bits, backend="aer_mps")
+    assert fused["simulator_jobs"] == 1
+    by_seed = {}
+    for seed, outcome in zip(fused["seeds"], fused["outcomes"]):
+        by_seed.setdefault(str(seed), []).append(outcome.uint(0, num_qubits))
+    assert len(by_seed) == 2 ** seed_bits
+    for seed, outcomes in by_seed.items():
+        expected = get_backend("numpy").probabilities(num_qubits, qnn_gates_for_seed(num_qubits, seed))
+        observed = np.bincount(outcomes, minlength=2 ** num_qubits) / len(outcomes)
+        assert np.abs(observed - expected).max() < 0.1
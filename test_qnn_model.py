@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+from qiskit import transpile
+from qiskit.quantum_info import Statevector
+
+import qnn_model
+from qnn_model import bind_qnn_circuit, build_qnn_circuit, get_qnn_simulator, get_qnn_template
+
+
+@pytest.mark.parametrize("num_qubits,seed", [
+    (1, None),
+    (3, "1011"),
+    (5, "1011001110001111"),
+    (6, "0000111101011010"),
+])
+def test_bound_template_matches_built_circuit(num_qubits, seed):
+    bound = bind_qnn_circuit(num_qubits, seed)
+    assert bound.count_ops().get("measure") == num_qubits
+    # Transpiling drops diagonal gates right before measurement, so the
+    # reference goes through the same transpilation
+    built = build_qnn_circuit(num_qubits, seed)
+    built.measure(range(num_qubits), range(num_qubits))
+    expected = transpile(built, get_qnn_simulator()).remove_final_measurements(inplace=False)
+    unmeasured = bound.remove_final_measurements(inplace=False)
+    assert Statevector(unmeasured).equiv(Statevector(expected))
+
+
+def test_seeds_of_the_same_shape_share_one_template():
+    template, params = get_qnn_template(4, 4)
+    bind_qnn_circuit(4, "0001001000110100")
+    bind_qnn_circuit(4, "1111111011011100")
+    assert get_qnn_template(4, 4) == (template, params)
+    assert len(params) == 4 and not template.parameters.isdisjoint(params)
+
+
+def test_simulator_is_created_once_across_threads(monkeypatch):
+    monkeypatch.setattr(qnn_model, "_simulator", None)
+    start = threading.Barrier(8)
+    seen = []
+
+    def worker():
+        start.wait()
+        seen.append(get_qnn_simulator())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(seen) == 8 and all(sim is seen[0] for sim in seen)
@@ -0,0 +1,52 @@
+import numpy as np
+from qiskit.quantum_info import Statevector
+
+from bitbuffer import BitBuffer
+from qnn_model import build_qnn_circuit
+from qnn_sampler import DistributionCache, get_default_cache, harvest_qnn_bitstrings, sample_qnn_bitstrings
+
+ENTRY_BYTES = 2 ** 3 * 8  # one 3-qubit cdf
+
+
+def test_lru_order_and_byte_budget_eviction():
+    cache = DistributionCache(budget_bytes=2 * ENTRY_BYTES)
+    a, b, c = "0001", "0010", "0100"
+    cdf_a = cache.get_cdf(3, a)
+    cache.get_cdf(3, b)
+    assert cache.get_cdf(3, a) is cdf_a  # a becomes most recently used
+    cache.get_cdf(3, c)  # over budget: b, the oldest, goes
+
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["used_bytes"] == 2 * ENTRY_BYTES
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    assert cache.get_cdf(3, a) is cdf_a
+    cache.get_cdf(3, b)
+    assert cache.stats()["misses"] == 4
+
+
+def test_same_seed_reuses_the_cached_distribution():
+    cache = DistributionCache()
+    cdf = cache.get_cdf(4, "1011001110001111")
+    # Only the first 4 bits per qubit change the circuit; the type does not matter
+    assert cache.get_cdf(4, BitBuffer.from_bitstring("1011001110001111" + "0101")) is cdf
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert cache.get_cdf(4, "1011001110001110") is not cdf
+
+
+def test_sampled_frequencies_converge_to_statevector():
+    num_qubits, seed, shots = 4, "1100101000110101", 50000
+    expected = Statevector(build_qnn_circuit(num_qubits, seed)).probabilities()
+    outcomes = sample_qnn_bitstrings(num_qubits, seed, shots, rng=np.random.default_rng(3),
+                                     cache=DistributionCache())
+    observed = np.bincount([int(b, 2) for b in outcomes], minlength=2 ** num_qubits) / shots
+    assert np.abs(observed - expected).max() < 0.01
+
+
+def test_harvest_uses_the_shared_cache():
+    before = get_default_cache().stats()
+    first = harvest_qnn_bitstrings(5, "0110100111000101", shots=7, backend="numpy")
+    second = harvest_qnn_bitstrings(5, "0110100111000101", shots=3, backend="numpy")
+    after = get_default_cache().stats()
+    assert len(first) == 7 and len(second) == 3
+    assert all(len(b) == 5 and set(b) <= {"0", "1"} for b in first + second)
+    assert after["hits"] - before["hits"] >= 1
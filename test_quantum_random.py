@@ -0,0 +1,55 @@
+from itertools import islice
+
+from qiskit import QuantumCircuit
+
+from quantum_random import harvest_quantum_bits, iter_shot_bitstrings, quantum_random_block
+
+
+class FixedMemorySimulator:
+    """Stands in for AerSimulator: returns the given per-shot memory."""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.jobs = []
+
+    def run(self, circuit, shots=1, memory=False):
+        self.jobs.append((circuit.num_qubits, shots))
+        return self
+
+    def result(self):
+        return self
+
+    def get_memory(self, circuit):
+        return self.memory[:self.jobs[-1][1]]
+
+
+def test_shot_bitstrings_are_in_shot_order_with_clbit_0_rightmost():
+    qc = QuantumCircuit(3, 3)
+    qc.x(0)
+    qc.measure(range(3), range(3))
+    shots = list(iter_shot_bitstrings(qc, shots=5))
+    assert [str(bits) for bits in shots] == ["001"] * 5
+
+    simulator = FixedMemorySimulator(["000", "011", "101"])
+    assert [str(bits) for bits in iter_shot_bitstrings(qc, shots=3, simulator=simulator)] == ["000", "011", "101"]
+
+
+def test_harvest_runs_one_job_per_shots_values():
+    simulator = FixedMemorySimulator(["0011", "0101", "1111"])
+    values = [str(bits) for bits in islice(harvest_quantum_bits(4, shots=3, simulator=simulator), 7)]
+    assert values == ["0011", "0101", "1111"] * 2 + ["0011"]
+    assert simulator.jobs == [(4, 3)] * 3
+
+
+def test_block_concatenates_shots_and_trims_to_length():
+    simulator = FixedMemorySimulator(["0000", "1111", "0101"])
+    block = quantum_random_block(10, width=4, simulator=simulator)
+    assert str(block) == "0000" "1111" "01"
+    assert simulator.jobs == [(4, 3)]
+
+
+def test_block_handles_lengths_that_are_not_a_multiple_of_the_width():
+    for num_bits in (1, 31, 33, 70):
+        bits = quantum_random_block(num_bits, width=32)
+        assert len(bits) == num_bits and set(str(bits)) <= {"0", "1"}
+    assert len(quantum_random_block(0)) == 0
@@ -0,0 +1,67 @@
+import time
+
+from role_cache import RoleCache
+
+
+class FakeUsers:
+    def __init__(self, roles):
+        self.roles = roles
+        self.queries = 0
+
+    def __call__(self, user_id):
+        self.queries += 1
+        return self.roles.get(user_id, "user")
+
+
+def test_session_stamp_and_cache_avoid_queries():
+    users = FakeUsers({1: "admin"})
+    cache = RoleCache(users, ttl=60)
+    session = {}
+    cache.stamp(session, 1, "admin")  # login
+    assert cache.get_role(1, session) == "admin"
+    assert users.queries == 0
+
+    assert cache.get_role(1) == "admin" and cache.get_role(1) == "admin"
+    assert users.queries == 1
+    stats = cache.stats()
+    assert (stats["session_hits"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_invalidate_revokes_cache_and_older_stamps():
+    users = FakeUsers({1: "admin"})
+    cache = RoleCache(users, ttl=60)
+    session = {}
+    assert cache.get_role(1, session) == "admin"
+    time.sleep(0.01)
+    users.roles[1] = "user"
+    cache.invalidate(1)
+    assert cache.get_role(1, session) == "user"
+    assert users.queries == 2
+
+
+def test_ttl_and_size_bound():
+    users = FakeUsers({})
+    cache = RoleCache(users, ttl=0.05, maxsize=2)
+    for user_id in (1, 2, 3):
+        cache.get_role(user_id)
+    assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+    time.sleep(0.1)
+    cache.get_role(3)
+    assert cache.stats()["expired"] == 1 and users.queries == 4
+
+
+def test_cache_hit_does_not_extend_the_session_stamp(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("role_cache.time.time", lambda: clock[0])
+    users = FakeUsers({1: "admin"})
+    cache = RoleCache(users, ttl=60)
+    assert cache.get_role(1) == "admin"  # loaded at t=1000
+
+    session = {}
+    clock[0] = 1059.0
+    assert cache.get_role(1, session) == "admin"  # cache hit stamps the session
+    users.roles[1] = "user"  # demoted in the database, no invalidate()
+
+    other_worker = RoleCache(users, ttl=60)
+    clock[0] = 1061.0
+    assert other_worker.get_role(1, session) == "user"
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from simulation_planner import SimulationBudgetError, plan_qnn_simulation, plan_simulation
+
+
+def test_small_circuit_uses_statevector():
+    plan = plan_qnn_simulation(8, None, shots=12)
+    assert plan["method"] == "statevector" and not plan["downgraded"]
+    assert (plan["num_qubits"], plan["shots"]) == (8, 12)
+
+
+def test_wide_circuits_pick_mps_or_stabilizer():
+    assert plan_qnn_simulation(40, None, shots=4)["method"] == "matrix_product_state"
+    ghz = [("h", 0)] + [("cx", q, q + 1) for q in range(39)]
+    assert plan_simulation(40, ghz, shots=4)["method"] == "stabilizer"
+
+
+def test_downgrade_keeps_the_bits_the_caller_needs():
+    plan = plan_qnn_simulation(30, None, shots=4, max_memory_bytes=4000, fused=True, total_bits=84)
+    assert plan["downgraded"] and plan["requested_qubits"] == 30
+    assert plan["num_qubits"] < 30
+    assert plan["num_qubits"] * plan["shots"] >= 84
+
+
+def test_reject_raises():
+    with pytest.raises(SimulationBudgetError):
+        plan_qnn_simulation(30, None, shots=4, max_memory_bytes=4000, fused=True, on_over_budget="reject")
+    with pytest.raises(SimulationBudgetError):
+        plan_qnn_simulation(10 ** 7, None, shots=1, on_over_budget="reject")
+
+
+def test_huge_widths_are_clamped_before_building_gates():
+    start = time.perf_counter()
+    plan = plan_qnn_simulation(10 ** 7, None, shots=1, fused=True, max_qubits=64, total_bits=84)
+    assert time.perf_counter() - start < 2
+    assert plan["downgraded"] and plan["num_qubits"] <= 64
+    assert plan["num_qubits"] * plan["shots"] >= 84
+
+
+def test_invalid_requests():
+    with pytest.raises(ValueError):
+        plan_qnn_simulation(0, None)
+    with pytest.raises(ValueError):
+        plan_qnn_simulation(8, None, shots=0)
+
+
+def test_default_cap_covers_the_bits_needed():
+    plan = plan_qnn_simulation(84, None, shots=1, fused=True, total_bits=84)
+    assert plan["num_qubits"] == 84 and not plan["downgraded"]
+    plan = plan_qnn_simulation(500, None, shots=1, fused=True, total_bits=84)
+    assert plan["downgraded"] and plan["limited_by"] == "max_qubits" and plan["max_qubits"] == 84
+
+    plan = plan_qnn_simulation(30, None, shots=4, max_memory_bytes=4000, fused=True, total_bits=84)
+    assert plan["limited_by"] == "budget"
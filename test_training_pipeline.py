@@ -0,0 +1,65 @@
+import collections
+import random
+
+import numpy as np
+import pytest
+
+from password_dataset import build_password_dataset
+from training_pipeline import batch_pipeline, encode_batch, prefetch, shuffle_buffer
+
+
+def test_shuffle_buffer_is_a_permutation():
+    items = list(range(1000))
+    shuffled = list(shuffle_buffer(iter(items), buffer_size=64, rng=random.Random(1)))
+    assert sorted(shuffled) == items and shuffled != items
+
+
+def test_encode_batch_pads_and_truncates():
+    features, lengths = encode_batch(["ab", "x" * 20], max_length=4)
+    assert features.shape == (2, 4) and features.dtype == np.float32
+    assert np.allclose(features[0], [97 / 255, 98 / 255, 0, 0])
+    assert lengths.tolist() == [2, 20]
+
+
+def test_pipeline_streams_every_sample_once(tmp_path):
+    sources = []
+    for name in ("a.txt", "b.txt"):
+        path = tmp_path / name
+        path.write_text("\n".join(f"{name}-{i % 37}" for i in range(500)) + "\n", encoding="utf-8")
+        sources.append(str(path))
+    seen = collections.Counter()
+    for passwords, features, lengths in batch_pipeline(sources, batch_size=32, buffer_size=50,
+                                                       seed=7, shard_bytes=700):
+        assert features.shape[0] == len(passwords) <= 32
+        seen.update(passwords)
+    expected = collections.Counter(line.strip() for path in sources for line in open(path, encoding="utf-8"))
+    assert seen == expected
+
+
+def test_prefetch_reraises_producer_errors():
+    def failing():
+        yield 1
+        raise RuntimeError("boom")
+
+    consumer = prefetch(failing())
+    assert next(consumer) == 1
+    with pytest.raises(RuntimeError):
+        next(consumer)
+
+
+def test_binary_dataset_batches_are_not_in_sorted_order(tmp_path):
+    dump = tmp_path / "dump.txt"
+    passwords = [f"pw{i:05d}" for i in range(3000)] * 2
+    random.Random(3).shuffle(passwords)
+    dump.write_text("\n".join(passwords) + "\n", encoding="utf-8")
+    build_password_dataset(str(dump))
+
+    seen, medians = [], []
+    for batch, _, _ in batch_pipeline([str(dump)], batch_size=64, buffer_size=16, prefetch_batches=0,
+                                      seed=5, shard_bytes=4000):
+        seen += batch
+        medians.append(sorted(batch)[len(batch) // 2])
+    assert collections.Counter(seen) == collections.Counter(passwords)
+    assert medians != sorted(medians)
+    adjacent_repeats = sum(a == b for a, b in zip(seen, seen[1:]))
+    assert adjacent_repeats < len(seen) // 100
@@ -0,0 +1,28 @@
+import os
+
+from validation import PatternIndex, validate_many, validate_password_against_common_patterns
+
+
+def test_index_reloads_only_when_mtime_changes(tmp_path):
+    patterns = tmp_path / "patterns.txt"
+    patterns.write_text("123456\npassword\n", encoding="utf-8")
+    index = PatternIndex(str(patterns), check_interval=0)
+    assert "password" in index and "hunter2" not in index
+    assert index.reloads == 1
+
+    patterns.write_text("123456\npassword\nhunter2\n", encoding="utf-8")
+    stat = os.stat(patterns)
+    os.utime(patterns, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert index.validate_many(["hunter2", "Xq9!vT2m", "123456"]) == [True, False, True]
+    assert index.reloads == 2
+    assert "hunter2" in index and index.reloads == 2
+
+
+def test_module_helpers_use_the_shared_index():
+    assert validate_password_against_common_patterns("qwerty", "common_patterns.txt")
+    assert validate_many(["qwerty", "Zy7&dF#X8Qp"], "common_patterns.txt") == [True, False]
+
+
+def test_missing_file_is_never_common(tmp_path):
+    index = PatternIndex(str(tmp_path / "missing.txt"), check_interval=0)
+    assert index.validate_many(["123456"]) == [False]
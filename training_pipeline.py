@@ -0,0 +1,196 @@
+# training_pipeline.py
+"""
+Streaming mini-batch pipeline for QNN training on corpora larger than RAM.
+
+Stages, each a generator:
+
+  1) sharded readers: every text dump is split into newline-aligned byte
+     ranges (pattern_finder.chunk_ranges), or, when an up-to-date binary
+     copy exists (password_dataset.py), its sorted length buckets are cut
+     into index ranges whose occurrences are read in a random order; shards
+     are visited in a random order, several at a time, interleaved
+  2) a bounded shuffle buffer (memory: `shuffle_buffer` passwords)
+  3) batching and vectorized encoding into float32 feature arrays
+  4) prefetching on a background thread, so reading and encoding overlap
+     with the training step
+
+Only the shuffle buffer and `prefetch` batches are ever held in memory.
+"""
+
+import functools
+import queue
+import random
+import threading
+
+import numpy as np
+
+from password_dataset import open_password_dataset
+from pattern_finder import CHUNK_BYTES, chunk_ranges, iter_chunk_passwords
+
+# Defaults for qnn_training
+BATCH_SIZE = 256
+SHUFFLE_BUFFER = 65536
+PREFETCH_BATCHES = 4
+OPEN_SHARDS = 8
+MAX_PASSWORD_LENGTH = 16
+SHARD_BYTES = CHUNK_BYTES
+BUCKET_SHARD_PASSWORDS = 65536
+
+
+def _bucket_ranges(bucket, shard_passwords):
+    """Cuts a bucket into index ranges of about `shard_passwords` occurrences each."""
+    ends = np.cumsum(bucket.counts, dtype=np.int64)
+    cuts = np.searchsorted(ends, np.arange(shard_passwords, int(ends[-1]), shard_passwords)) + 1
+    bounds = np.unique(np.concatenate(([0], cuts, [len(bucket)])))
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+def _iter_bucket_range(bucket, start, stop, seed):
+    # The bucket is sorted with each password stored once, so its occurrences
+    # are expanded and shuffled here; otherwise duplicates would come out
+    # adjacent and the batches nearly in lexicographic order
+    indices = np.repeat(np.arange(start, stop), bucket.counts[start:stop].astype(np.int64))
+    np.random.default_rng(seed).shuffle(indices)
+    for index in indices.tolist():
+        yield bucket[index]
+
+
+def password_shards(sources, shard_bytes=SHARD_BYTES, rng=None):
+    """
+    Splits the dumps into independently readable shards.
+    :param rng: random.Random seeding the read order inside binary-dataset shards
+    :return: list of zero-argument callables, each returning an iterator of passwords
+    """
+    rng = rng or random.Random()
+    shards = []
+    for path in sources:
+        dataset = open_password_dataset(path)
+        if dataset is not None:
+            for length in dataset.lengths():
+                bucket = dataset.of_length(length)
+                shard_passwords = max(1, min(BUCKET_SHARD_PASSWORDS, shard_bytes // (length + 1)))
+                shards += [functools.partial(_iter_bucket_range, bucket, start, stop, rng.getrandbits(64))
+                           for start, stop in _bucket_ranges(bucket, shard_passwords)]
+        else:
+            shards += [functools.partial(iter_chunk_passwords, *chunk)
+                       for chunk in chunk_ranges(path, shard_bytes)]
+    return shards
+
+
+def interleave_shards(shards, open_shards=OPEN_SHARDS, rng=None):
+    """Reads the shards in random order, round-robin over `open_shards` at a time."""
+    rng = rng or random.Random()
+    pending = list(shards)
+    rng.shuffle(pending)
+    active = []
+    while pending or active:
+        while pending and len(active) < open_shards:
+            active.append(iter(pending.pop()()))
+        for reader in list(active):
+            password = next(reader, None)
+            if password is None:
+                active.remove(reader)
+            else:
+                yield password
+
+
+def shuffle_buffer(items, buffer_size=SHUFFLE_BUFFER, rng=None):
+    """
+    Approximate shuffle in bounded memory: each item replaces a random
+    element of a `buffer_size` buffer, which is emitted instead.
+    """
+    rng = rng or random.Random()
+    buffer = []
+    for item in items:
+        if len(buffer) < buffer_size:
+            buffer.append(item)
+            continue
+        index = rng.randrange(buffer_size)
+        yield buffer[index]
+        buffer[index] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def encode_batch(passwords, max_length=MAX_PASSWORD_LENGTH):
+    """
+    Encodes passwords as fixed-width feature rows without a per-character
+    Python loop: code points (capped at 255) scaled to [0, 1], zero-padded
+    and truncated to `max_length`.
+    :return: (features float32 (n, max_length), lengths int64 (n,))
+    """
+    codes = np.array(passwords, dtype=f"U{max_length}").view(np.uint32).reshape(len(passwords), max_length)
+    features = np.minimum(codes, 255).astype(np.float32)
+    features *= 1 / 255
+    lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=len(passwords))
+    return features, lengths
+
+
+def iter_batches(items, batch_size=BATCH_SIZE, max_length=MAX_PASSWORD_LENGTH):
+    """Groups passwords into batches and yields (passwords, features, lengths)."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield (batch,) + encode_batch(batch, max_length)
+            batch = []
+    if batch:
+        yield (batch,) + encode_batch(batch, max_length)
+
+
+_DONE = object()
+
+
+def prefetch(iterable, depth=PREFETCH_BATCHES):
+    """
+    Runs `iterable` on a background thread, keeping up to `depth` items
+    ready. Exceptions are re-raised in the consumer; closing the consumer
+    early stops the producer.
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_DONE)
+        except BaseException as err:
+            put(err)
+
+    thread = threading.Thread(target=produce, name="training-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = ready.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+def batch_pipeline(sources, batch_size=BATCH_SIZE, buffer_size=SHUFFLE_BUFFER, prefetch_batches=PREFETCH_BATCHES,
+                   max_length=MAX_PASSWORD_LENGTH, seed=None, shard_bytes=SHARD_BYTES):
+    """
+    One epoch over the dumps as shuffled, encoded mini-batches.
+    :param seed: makes shard order and shuffling reproducible
+    :return: iterator of (passwords, features, lengths)
+    """
+    rng = random.Random(seed)
+    passwords = shuffle_buffer(interleave_shards(password_shards(sources, shard_bytes, rng), rng=rng),
+                               buffer_size, rng)
+    batches = iter_batches(passwords, batch_size, max_length)
+    return prefetch(batches, prefetch_batches) if prefetch_batches else batches
@@ -1,6 +1,91 @@
 # validation.py
+"""
+Checks generated passwords against a list of common passwords.
+
+The list is loaded once into a frozen hash set (PatternIndex) shared by
+all requests and threads, so a check is one set lookup with no disk I/O.
+The file is only re-read when its modification time changes.
+"""
+
 import os
+import threading
+import time
+
 PATTERNS = os.path.join("validation", "common_patterns.txt")
+
+# Minimum delay between two mtime checks of the same file (seconds)
+RELOAD_CHECK_SECONDS = 1.0
+
+
+class PatternIndex:
+    """
+    Frozen set of the stripped lines of a patterns file, reloaded when the
+    file's mtime changes. Lookups never take the lock: a reload builds a new
+    frozenset and swaps the reference.
+    """
+
+    def __init__(self, patterns_file, check_interval=RELOAD_CHECK_SECONDS):
+        self.patterns_file = patterns_file
+        self.check_interval = check_interval
+        self._patterns = frozenset()
+        self._mtime = None  # None: never loaded or file missing
+        self._missing = False
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def patterns(self):
+        """Returns the current frozenset, reloading it first if the file changed."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._refresh()
+                    self._next_check = now + self.check_interval
+        return self._patterns
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.patterns_file).st_mtime_ns
+        except FileNotFoundError:
+            if not self._missing:
+                print(f"[WARNING] Patterns file not found: {self.patterns_file}")
+                # A missing file means no password is treated as common
+                self._patterns, self._mtime, self._missing = frozenset(), None, True
+            return
+        if mtime == self._mtime:
+            return
+        with open(self.patterns_file, "r", encoding="utf-8") as f:
+            self._patterns = frozenset(line.strip() for line in f)
+        self._mtime, self._missing = mtime, False
+        self.reloads += 1
+
+    def __contains__(self, password):
+        return password in self.patterns()
+
+    def validate_many(self, passwords):
+        """
+        :param passwords: iterable of passwords
+        :return: list of booleans, True where the password is common
+        """
+        patterns = self.patterns()
+        return [password in patterns for password in passwords]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_pattern_index(patterns_file=PATTERNS):
+    """Returns the shared PatternIndex of `patterns_file` (one per file)."""
+    key = os.path.abspath(patterns_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = PatternIndex(patterns_file)
+        return index
+
+
 def validate_password_against_common_patterns(password: str, patterns_file: str = PATTERNS) -> bool:
     """
     Checks if the given 'password' appears in the 'common_patterns.txt' file.
@@ -9,16 +94,16 @@ def validate_password_against_common_patterns(password: str, patterns_file: str
     :param patterns_file: Path to the patterns file containing one password per line.
     :return: True if 'password' is found in the patterns file (i.e. it's 'common'), otherwise False.
     """
-    try:
-        with open(patterns_file, "r", encoding="utf-8") as f:
-            for line in f:
-                # Strip whitespace and compare
-                if line.strip() == password:
-                    return True
-    except FileNotFoundError:
-        print(f"[WARNING] Patterns file not found: {patterns_file}")
-        # If file is missing, treat it as if the password isn't found.
-        # Or you could raise an exception instead.
-        return False
-
-    return False  # Not found in the list
+    # If the file is missing, treat it as if the password isn't found.
+    return password in get_pattern_index(patterns_file)
+
+
+def validate_many(passwords, patterns_file: str = PATTERNS):
+    """
+    Batch version of validate_password_against_common_patterns.
+
+    :param passwords: iterable of passwords
+    :param patterns_file: Path to the patterns file containing one password per line.
+    :return: list of booleans in input order, True where the password is common
+    """
+    return get_pattern_index(patterns_file).validate_many(passwords)
@@ -8,33 +8,63 @@ from qiskit.utils import algorithm_globals
 from qiskit.algorithms.optimizers import COBYLA
 import hashlib
 import random
+import itertools
 import pandas as pd
 import re
 from scipy.stats import entropy
 from cryptography.hazmat.primitives import hashes
 
+from bitbuffer import BitBuffer
+from password_dataset import open_password_dataset
+from parameter_shift import parameter_shift_gradient
+from password_codec import PASSWORD_CHARS, encode_passwords, decode_measurements
+
 # -------------------------------
 # 1. Load & Preprocess Password Data
 # -------------------------------
-def load_password_dataset(file_path):
+PASSWORD_LENGTH = 12
+PASSWORD_RE = re.compile(r"^[a-zA-Z0-9!@#$%^&*()]+$")
+
+def load_password_dataset(file_path, limit=None, compiled=True):
+    # Up to `limit` passwords, most common first (RockYou lists by popularity).
+    # The binary dataset (password_dataset.py) is used when it is up to date:
+    # only the length-12 bucket is touched and it is ordered by its counts, so
+    # the sample is the same head minus repeats. The text path keeps file order.
+    dataset = open_password_dataset(file_path) if compiled else None
+    if dataset is not None:
+        bucket = dataset.of_length(PASSWORD_LENGTH)
+        matrix = bucket.byte_matrix() if len(bucket) else None
+        if matrix is None:
+            keep = np.array([i for i, p in enumerate(bucket) if PASSWORD_RE.match(p)], dtype=np.int64)
+        else:
+            allowed = np.zeros(256, dtype=bool)
+            allowed[np.frombuffer(PASSWORD_CHARS.encode("ascii"), dtype=np.uint8)] = True
+            keep = np.flatnonzero(allowed[matrix].all(axis=1))
+        order = keep[np.argsort(-bucket.counts[keep].astype(np.int64), kind="stable")]
+        return [bucket[int(i)] for i in order[:limit]]
+
     with open(file_path, encoding="latin-1") as f:
-        passwords = f.readlines()
-    return [p.strip() for p in passwords if len(p.strip()) == 12 and re.match(r"^[a-zA-Z0-9!@#$%^&*()]+$", p)]
+        passwords = (p for p in (line.strip() for line in f)
+                     if len(p) == PASSWORD_LENGTH and PASSWORD_RE.match(p))
+        return list(itertools.islice(passwords, limit))
 
 # Example dataset (RockYou + Quantum Random)
-rockyou_passwords = load_password_dataset("rockyou.txt")[:5000]
+rockyou_passwords = load_password_dataset("rockyou.txt", limit=5000)
 quantum_random_passwords = ["4sXz@9!B5k&", "Wq2*Lp9vX#1", "Zy7&dF#X8Qp", "Pm@L$9vT2Q7", "Xp5&Z@Y8q3L"]
 final_passwords = rockyou_passwords + quantum_random_passwords
 
 # -------------------------------
 # 2. Quantum Encoding of Passwords
 # -------------------------------
-char_map = {char: format(idx, "06b") for idx, char in enumerate("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()")}
+charset = PASSWORD_CHARS
+char_map = {char: idx for idx, char in enumerate(charset)}
 
+# Codec: password_codec.py, 7 bits per character, lossless -> (N, 84) rows
 def password_to_qubits(password):
-    return [int(bit) for char in password for bit in char_map[char]]
+    # 7 bits per character, packed (see bitbuffer.py)
+    return BitBuffer.from_bits(encode_passwords([password], len(password))[0])
 
-quantum_data = np.array([password_to_qubits(pwd) for pwd in final_passwords])
+quantum_data = encode_passwords(final_passwords, PASSWORD_LENGTH)
 
 # -------------------------------
 # 3. Define QNN Architecture
@@ -74,36 +104,26 @@ qnn_model.fit(quantum_data, labels)
 # -------------------------------
 # 5. Parameter Shift Rule (Quantum Backpropagation)
 # -------------------------------
-def parameter_shift_grad(theta_value):
-    backend = Aer.get_backend('aer_simulator')
-
-    # Shifted circuits
-    qc_plus = qnn_circuit.bind_parameters({theta_value: theta_value + np.pi/2})
-    qc_minus = qnn_circuit.bind_parameters({theta_value: theta_value - np.pi/2})
-
-    # Execute both circuits
-    job_plus = execute(qc_plus, backend, shots=1024).result().get_counts()
-    job_minus = execute(qc_minus, backend, shots=1024).result().get_counts()
+def measured_one(bits):
+    # P(qubit 0 = 1), the expectation value the gradient is taken of
+    return bits[:, 0]
 
-    # Convert measurement outcomes to expectation values
-    exp_plus = job_plus.get('1', 0) / 1024
-    exp_minus = job_minus.get('1', 0) / 1024
-
-    # Compute gradient
-    grad = (exp_plus - exp_minus) / 2
-    return grad
+def parameter_shift_grad(parameter_values, shots=1024):
+    # Full gradient: all +/- pi/2 shifted circuits run as ONE batched Aer job,
+    # counts turned into expectation values with NumPy (see parameter_shift.py)
+    return parameter_shift_gradient(qnn_circuit, parameter_values, shots=shots, observable=measured_one)
 
 # -------------------------------
 # 6. Generate Secure Password Using QNN
 # -------------------------------
-def generate_secure_password():
+def generate_secure_passwords(count):
+    # One job with per-shot memory, decoded in one vectorized pass
     simulator = Aer.get_backend("aer_simulator")
-    result = execute(qnn_circuit, simulator, shots=1).result()
-    measured_password = list(result.get_counts().keys())[0]
+    result = execute(qnn_circuit, simulator, shots=count, memory=True).result()
+    return decode_measurements([shot.replace(" ", "") for shot in result.get_memory()])
 
-    # Convert back to characters
-    password = "".join([list(char_map.keys())[int(measured_password[i : i + 6], 2)] for i in range(0, len(measured_password), 6)])
-    return password
+def generate_secure_password():
+    return generate_secure_passwords(1)[0]
 
 secure_password = generate_secure_password()
 print("Generated Secure Password:", secure_password)